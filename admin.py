@@ -0,0 +1,153 @@
+import argparse
+import asyncio
+import concurrent.futures
+import json
+import os
+import socket
+import sys
+
+LOOPBACK_HOSTS = ('127.0.0.1', 'localhost', '::1')
+MAX_LINE = 4096
+
+
+def parse_admin_address(address):
+    """'unix:/path' -> ('unix', path); 'host:port', '[::1]:port' or ':port' ->
+    ('tcp', (host, port)), loopback only."""
+    if address.startswith('unix:'):
+        return 'unix', address[len('unix:'):]
+    host, _, port = address.rpartition(':')
+    if host.startswith('[') and host.endswith(']'):
+        host = host[1:-1]
+    host = host or '127.0.0.1'
+    if host not in LOOPBACK_HOSTS:
+        raise ValueError(f"Admin server only listens on localhost, not {host}")
+    return 'tcp', (host, int(port))
+
+
+class AdminServer:
+    """Line-delimited JSON control server that runs inside the game's event loop.
+
+    Connections only parse requests and queue them; `process()` is called from the
+    frame loop and executes at most `limit` queued commands per tick. A full queue
+    is answered with an error instead of growing.
+    """
+
+    def __init__(self, handler, address, max_pending=16):
+        self.handler = handler
+        self.kind, self.target = parse_admin_address(address)
+        self.pending = asyncio.Queue(max_pending)
+        self.server = None
+        self.handled = 0
+        self.rejected = 0
+
+    async def start(self):
+        if self.kind == 'unix':
+            if os.path.exists(self.target):
+                os.unlink(self.target)
+            self.server = await asyncio.start_unix_server(self.handle_client, self.target, limit=MAX_LINE)
+        else:
+            host, port = self.target
+            self.server = await asyncio.start_server(self.handle_client, host, port, limit=MAX_LINE)
+            self.target = self.server.sockets[0].getsockname()[:2]
+
+    async def handle_client(self, reader, writer):
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    await self.reply(writer, {'ok': False, 'error': "request too long"})
+                    break
+                if not line:
+                    break
+                await self.reply(writer, await self.submit(line))
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def submit(self, line):
+        try:
+            request = json.loads(line)
+        except ValueError:
+            return {'ok': False, 'error': "invalid JSON"}
+        if not isinstance(request, dict) or not isinstance(request.get('cmd'), str):
+            return {'ok': False, 'error': "expected an object with a 'cmd' string"}
+
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self.pending.put_nowait((request, future))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            return {'ok': False, 'error': "busy, try again"}
+        return await future
+
+    async def reply(self, writer, response):
+        writer.write(json.dumps(response).encode('utf-8') + b'\n')
+        await writer.drain()
+
+    def process(self, limit):
+        for _ in range(limit):
+            try:
+                request, future = self.pending.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            if future.cancelled():
+                continue
+            try:
+                result = self.handler(request)
+            except Exception as e:
+                result = {'ok': False, 'error': f"{type(e).__name__}: {e}"}
+            if isinstance(result, concurrent.futures.Future):
+                loop = asyncio.get_running_loop()
+                result.add_done_callback(
+                    lambda done, future=future: loop.call_soon_threadsafe(resolve, future, done))
+            else:
+                future.set_result(result)
+            self.handled += 1
+
+    async def close(self):
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+        if self.kind == 'unix' and os.path.exists(self.target):
+            os.unlink(self.target)
+
+
+def resolve(future, done):
+    if future.cancelled():
+        return
+    error = done.exception()
+    future.set_result({'ok': False, 'error': f"{type(error).__name__}: {error}"} if error else done.result())
+
+
+def send_command(address, request, timeout=5.0):
+    kind, target = parse_admin_address(address)
+    family = socket.AF_UNIX if kind == 'unix' else socket.AF_INET6 if ':' in target[0] else socket.AF_INET
+    with socket.socket(family, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(target)
+        sock.sendall(json.dumps(request).encode('utf-8') + b'\n')
+        with sock.makefile('rb') as reply:
+            return json.loads(reply.readline())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Send a command to a running game's admin socket.")
+    parser.add_argument('--address', default=os.environ.get('GAME_ADMIN', '127.0.0.1:8765'))
+    parser.add_argument('cmd', choices=('state', 'reset', 'mission', 'ping', 'gc', 'npcs', 'input'))
+    parser.add_argument('id', nargs='?', type=int, help="mission number for 'mission'")
+    args = parser.parse_args()
+
+    request = {'cmd': args.cmd}
+    if args.cmd == 'mission':
+        if args.id is None:
+            parser.error("'mission' needs a mission number")
+        request['id'] = args.id
+    response = send_command(args.address, request)
+    print(json.dumps(response, indent=2))
+    sys.exit(0 if response.get('ok') else 1)
+
+
+if __name__ == '__main__':
+    main()
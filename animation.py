@@ -0,0 +1,74 @@
+import bisect
+import itertools
+
+DIR_FRONT = 0
+DIR_BACK = 1
+DIR_LEFT = 2
+DIR_RIGHT = 3
+DIRECTION_COUNT = 4
+
+MOVE_DIRECTIONS = {'down': DIR_FRONT, 'up': DIR_BACK, 'left': DIR_LEFT, 'right': DIR_RIGHT}
+ACTION_SIDES = {'front': DIR_FRONT, 'behind': DIR_BACK, 'left': DIR_LEFT, 'right': DIR_RIGHT}
+
+CLIP_IDLE = 0
+CLIP_WALK = 1
+CLIP_WATERING = 2
+CLIP_CUT = 3
+
+ANIMATION_CLIPS = [
+    {
+        'name': 'idle',
+        'durations': (0.3, 0.3),
+        'keys': {DIR_FRONT: 'idle-front', DIR_BACK: 'idle-back', DIR_LEFT: 'idle-left', DIR_RIGHT: 'idle-right'},
+    },
+    {
+        'name': 'walk',
+        'durations': (0.3, 0.3),
+        'keys': {DIR_FRONT: 'walk-front', DIR_BACK: 'walk-back', DIR_LEFT: 'walk-left', DIR_RIGHT: 'walk-right'},
+    },
+    {
+        'name': 'watering',
+        'durations': (0.3, 0.3),
+        'keys': {DIR_LEFT: 'watering-left', DIR_RIGHT: 'watering-right'},
+    },
+    {
+        'name': 'cut',
+        'durations': (0.3, 0.3),
+        'keys': {DIR_FRONT: 'cut-front', DIR_BACK: 'cut-behind', DIR_LEFT: 'cut-left', DIR_RIGHT: 'cut-right'},
+    },
+]
+
+
+class AnimationTable:
+    def __init__(self, clips=ANIMATION_CLIPS):
+        self.clips = clips
+        self.frames = []
+
+    def build(self, sprites):
+        self.frames = []
+        for clip in self.clips:
+            count = len(clip['durations'])
+            by_direction = {}
+            for direction, prefix in clip['keys'].items():
+                by_direction[direction] = [sprites[f'{prefix}{i}'] for i in range(1, count + 1)]
+            fallback = next(iter(by_direction.values()))
+            self.frames.append([by_direction.get(d, fallback) for d in range(DIRECTION_COUNT)])
+
+    def frame(self, clip, direction, index):
+        return self.frames[clip][direction][index]
+
+
+class AnimationClock:
+    def __init__(self, clips=ANIMATION_CLIPS):
+        self.time = 0.0
+        self.rate = 1.0
+        self.cycles = []
+        for clip in clips:
+            ends = list(itertools.accumulate(clip['durations']))
+            self.cycles.append((ends, ends[-1]))
+        self.frame_index = [0] * len(clips)
+
+    def advance(self, dt):
+        self.time += dt * self.rate
+        for clip, (ends, cycle) in enumerate(self.cycles):
+            self.frame_index[clip] = bisect.bisect_right(ends, self.time % cycle)
@@ -0,0 +1,142 @@
+import ctypes
+import ctypes.util
+import os
+import queue
+import select
+import struct
+import sys
+import threading
+import time
+
+import pygame
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+INOTIFY_EVENT = struct.Struct('iIII')
+
+
+class InotifySource:
+    def __init__(self, directories):
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.directories = {}
+        for directory in directories:
+            wd = libc.inotify_add_watch(self.fd, os.fsencode(directory), IN_CLOSE_WRITE | IN_MOVED_TO)
+            if wd < 0:
+                os.close(self.fd)
+                raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {directory}")
+            self.directories[wd] = directory
+
+    def wait(self, timeout):
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return set()
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+
+        changed = set()
+        offset = 0
+        while offset + INOTIFY_EVENT.size <= len(data):
+            wd, _, _, length = INOTIFY_EVENT.unpack_from(data, offset)
+            offset += INOTIFY_EVENT.size
+            name = data[offset:offset + length].rstrip(b'\0')
+            offset += length
+            if wd in self.directories and name:
+                changed.add(os.path.join(self.directories[wd], os.fsdecode(name)))
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingSource:
+    def __init__(self, paths, interval=0.5):
+        self.paths = paths
+        self.interval = interval
+        self.mtimes = {path: self.stat(path) for path in paths}
+
+    def stat(self, path):
+        try:
+            st = os.stat(path)
+            return (st.st_mtime_ns, st.st_size)
+        except OSError:
+            return None
+
+    def wait(self, timeout):
+        time.sleep(min(timeout, self.interval))
+        changed = set()
+        for path in self.paths:
+            mtime = self.stat(path)
+            if mtime != self.mtimes[path]:
+                self.mtimes[path] = mtime
+                if mtime is not None:
+                    changed.add(path)
+        return changed
+
+    def close(self):
+        pass
+
+
+class AssetWatcher:
+    def __init__(self, registry, debounce=0.15):
+        self.kinds = {os.path.normpath(path): kind for path, kind in registry.items()}
+        self.debounce = debounce
+        self.ready = queue.Queue()
+        self.stop_event = threading.Event()
+
+        directories = sorted({os.path.dirname(path) or '.' for path in self.kinds})
+        directories = [d for d in directories if os.path.isdir(d)]
+        self.source = None
+        if sys.platform.startswith('linux'):
+            try:
+                self.source = InotifySource(directories)
+                self.mode = 'inotify'
+            except OSError as e:
+                print(f"inotify unavailable ({e}), polling assets instead")
+        if self.source is None:
+            self.source = PollingSource(list(self.kinds))
+            self.mode = 'polling'
+
+        self.thread = threading.Thread(target=self.watch_loop, name='asset-watcher', daemon=True)
+        self.thread.start()
+
+    def watch_loop(self):
+        while not self.stop_event.is_set():
+            changed = {os.path.normpath(p) for p in self.source.wait(0.25)}
+            changed &= self.kinds.keys()
+            if not changed:
+                continue
+            deadline = time.monotonic() + self.debounce
+            while time.monotonic() < deadline:
+                more = {os.path.normpath(p) for p in self.source.wait(deadline - time.monotonic())}
+                changed |= more & self.kinds.keys()
+            for path in sorted(changed):
+                self.load(path)
+
+    def load(self, path):
+        if self.kinds[path] != 'image':
+            self.ready.put((path, None))
+            return
+        try:
+            self.ready.put((path, pygame.image.load(path)))
+        except (pygame.error, OSError) as e:
+            print(f"Could not reload {path}: {e}")
+
+    def poll(self):
+        changes = []
+        while True:
+            try:
+                changes.append(self.ready.get_nowait())
+            except queue.Empty:
+                return changes
+
+    def close(self):
+        self.stop_event.set()
+        self.thread.join()
+        self.source.close()
@@ -0,0 +1,61 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+PHASES = ('import', 'init', 'assets', 'setup', 'first_frame')
+
+
+def run_child():
+    start = time.perf_counter()
+    import main
+    import_time = time.perf_counter() - start
+
+    game = main.Game()
+
+    start = time.perf_counter()
+    game.handle_events()
+    game.update(1 / main.FPS)
+    game.draw()
+    first_frame = time.perf_counter() - start
+
+    timings = {'import': import_time, 'first_frame': first_frame}
+    timings.update(game.startup_timings)
+    print(json.dumps(timings))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure game startup time per phase.")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--headless', action='store_true', help="use SDL dummy video/audio drivers")
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child()
+        return
+
+    env = dict(os.environ, GAME_SAVE_FILE='')
+    if args.headless:
+        env.update(SDL_VIDEODRIVER='dummy', SDL_AUDIODRIVER='dummy')
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    results = []
+    for _ in range(args.runs):
+        output = subprocess.run([sys.executable, os.path.abspath(__file__), '--child'],
+                                cwd=here, env=env, capture_output=True, text=True, check=True).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+
+    print(f"Startup over {args.runs} runs (median / min, ms):")
+    for phase in PHASES:
+        values = [r[phase] * 1000 for r in results]
+        print(f"  {phase:<12} {statistics.median(values):8.1f} / {min(values):8.1f}")
+    totals = [sum(r[p] for p in PHASES) * 1000 for r in results]
+    print(f"  {'total':<12} {statistics.median(totals):8.1f} / {min(totals):8.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+import collections
+import time
+
+import pygame
+
+from gcmonitor import percentile
+
+INPUT_EVENTS = (pygame.QUIT, pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP, pygame.MOUSEMOTION)
+
+DEFAULT_BINDINGS = {
+    'move_left': ('left', 'a'),
+    'move_right': ('right', 'd'),
+    'move_up': ('up', 'w'),
+    'move_down': ('down', 's'),
+    'interact': ('space', 'e'),
+    'minimap': ('m',),
+    'profiler': ('f9',),
+    'back': ('escape',),
+}
+
+
+def parse_bindings(text):
+    """`interact=f,space;minimap=tab` -> {'interact': ('f', 'space'), 'minimap': ('tab',)}."""
+    bindings = {}
+    for entry in filter(None, (part.strip() for part in text.split(';'))):
+        action, _, keys = entry.partition('=')
+        action = action.strip()
+        if action not in DEFAULT_BINDINGS:
+            raise ValueError(f"unknown action {action!r}")
+        bindings[action] = tuple(key.strip() for key in keys.split(',') if key.strip())
+    return bindings
+
+
+class ActionMap:
+    """Maps key names to game actions. Keys are pygame key names (`pygame.key.name`),
+    so bindings can come from settings and be changed at runtime with `rebind`."""
+
+    def __init__(self, bindings=None):
+        self.bindings = {}
+        self.actions = {}
+        for action, keys in {**DEFAULT_BINDINGS, **(bindings or {})}.items():
+            self.rebind(action, *keys)
+
+    def rebind(self, action, *keys):
+        codes = tuple(pygame.key.key_code(key) for key in keys)
+        for code in self.bindings.get(action, ()):
+            self.actions.pop(code, None)
+        self.bindings[action] = codes
+        for code in codes:
+            self.actions[code] = action
+
+    def action(self, event):
+        """The action a KEYDOWN event triggers, or None."""
+        return self.actions.get(event.key)
+
+    def held(self, keys, action):
+        return any(keys[code] for code in self.bindings[action])
+
+    def describe(self, action):
+        return ' atau '.join(pygame.key.name(code).upper() for code in self.bindings[action])
+
+
+class InputQueue:
+    """Reads the event queue once per frame.
+
+    Only the event types the game handles are let into SDL's queue, and a run of
+    MOUSEMOTION events collapses into one carrying the last position and the summed
+    `rel`, so dragging a clock hand costs one update per frame however fast the
+    mouse reports. Order relative to clicks and key presses is kept. Every event is
+    stamped with `input_time`, on the `perf_counter` clock: the event's own SDL
+    `timestamp` where pygame provides one, otherwise the moment it was read from the
+    queue. Each frame carries the stamp of the latest input the game has handled,
+    and `presented` records, once per stamp, how long that input took to reach the
+    screen.
+    """
+
+    def __init__(self, allowed=INPUT_EVENTS, window=600):
+        self.allowed = allowed
+        self.mouse_pos = (0, 0)
+        self.received = 0
+        self.delivered = 0
+        self.latencies = collections.deque(maxlen=window)
+        self.last_presented = None
+
+    def install(self):
+        pygame.event.set_blocked(None)
+        pygame.event.set_allowed(list(self.allowed))
+
+    def poll(self):
+        now = time.perf_counter()
+        ticks = pygame.time.get_ticks()
+        events = []
+        motion = None
+        for event in pygame.event.get():
+            self.received += 1
+            if event.type == pygame.MOUSEMOTION:
+                if motion is not None:
+                    rel = (motion.rel[0] + event.rel[0], motion.rel[1] + event.rel[1])
+                    event = pygame.event.Event(pygame.MOUSEMOTION, {**event.dict, 'rel': rel})
+                motion = event
+                continue
+            if motion is not None:
+                events.append(motion)
+                motion = None
+            events.append(event)
+        if motion is not None:
+            events.append(motion)
+
+        for event in events:
+            timestamp = getattr(event, 'timestamp', None)
+            event.input_time = now if timestamp is None else now - max(0, ticks - timestamp) / 1000.0
+            if hasattr(event, 'pos'):
+                self.mouse_pos = event.pos
+        self.delivered += len(events)
+        return events
+
+    def presented(self, input_time):
+        """Call right after a frame reaches the screen with the latest input it reflects."""
+        if input_time is None or input_time == self.last_presented:
+            return
+        self.last_presented = input_time
+        self.latencies.append(time.perf_counter() - input_time)
+
+    def report(self):
+        latencies = list(self.latencies)
+        return {
+            'events_received': self.received,
+            'events_delivered': self.delivered,
+            'latency_samples': len(latencies),
+            'latency_p50_ms': round(percentile(latencies, 0.5) * 1000, 2),
+            'latency_p95_ms': round(percentile(latencies, 0.95) * 1000, 2),
+            'latency_max_ms': round(max(latencies, default=0.0) * 1000, 2),
+        }
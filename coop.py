@@ -0,0 +1,312 @@
+import queue
+import socket
+import struct
+import threading
+import zlib
+
+from savegame import DIRECTIONS, snapshot_size
+
+MSG_HELLO = 1
+MSG_FULL = 2
+MSG_DELTA = 3
+MSG_INPUT = 4
+MSG_ACTION = 5
+MSG_CLOCK = 6
+MSG_RESET = 7
+MSG_LEAVE = 8
+
+FRAME = struct.Struct('<IB')
+MAX_FRAME = 64 * 1024 * 1024
+HELLO = struct.Struct('<BB')
+INPUT = struct.Struct('<IbbH')
+CLOCK = struct.Struct('<ff')
+PLAYER_ENTRY = struct.Struct('<BffBBI')
+
+CLIENT_MESSAGES = {MSG_INPUT: INPUT.size, MSG_ACTION: 0, MSG_CLOCK: CLOCK.size, MSG_RESET: 0}
+
+HOST_ID = 0
+MAX_CLIENTS = 8
+
+
+def parse_address(address, default_host='0.0.0.0'):
+    host, _, port = address.rpartition(':')
+    return host or default_host, int(port)
+
+
+def pack_players(players):
+    data = bytearray([len(players)])
+    for player_id, player in sorted(players.items()):
+        data += PLAYER_ENTRY.pack(player_id, player['x'], player['y'],
+                                  DIRECTIONS.index(player['direction']),
+                                  player['state'] == 'walking', player.get('last_seq', 0))
+    return bytes(data)
+
+
+def unpack_players(data, offset):
+    players = {}
+    for _ in range(data[offset]):
+        player_id, x, y, direction, walking, last_seq = PLAYER_ENTRY.unpack_from(data, offset + 1)
+        players[player_id] = {'x': x, 'y': y, 'direction': DIRECTIONS[direction],
+                              'state': 'walking' if walking else 'idle', 'last_seq': last_seq}
+        offset += PLAYER_ENTRY.size
+    return players
+
+
+def split_world(data):
+    """Split a world blob into its savegame snapshot and the player table offset."""
+    end = snapshot_size(data)
+    return data[:end], end
+
+
+def encode_delta(baseline, world):
+    """XOR the world against the last one the peer has and deflate the result.
+
+    Between ticks only a handful of bytes change (positions, a flag or two), so
+    the XOR is mostly zeros and compresses to a few bytes. A length change (a
+    player joined or left) falls back to a full snapshot.
+    """
+    if baseline is None or len(baseline) != len(world):
+        return MSG_FULL, zlib.compress(world)
+    size = len(world)
+    diff = int.from_bytes(baseline, 'little') ^ int.from_bytes(world, 'little')
+    return MSG_DELTA, zlib.compress(diff.to_bytes(size, 'little'))
+
+
+def decode_delta(baseline, kind, payload):
+    data = zlib.decompress(payload)
+    if kind == MSG_FULL:
+        return data
+    if baseline is None or len(baseline) != len(data):
+        raise ValueError("Delta does not match baseline")
+    size = len(data)
+    return (int.from_bytes(baseline, 'little') ^ int.from_bytes(data, 'little')).to_bytes(size, 'little')
+
+
+def send_frame(sock, kind, payload=b''):
+    if len(payload) > MAX_FRAME:
+        raise ValueError(f"Frame of {len(payload)} bytes exceeds the {MAX_FRAME} byte limit")
+    sock.sendall(FRAME.pack(len(payload), kind) + payload)
+    return FRAME.size + len(payload)
+
+
+def recv_exact(sock, size):
+    data = bytearray()
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("Connection closed")
+        data += chunk
+    return bytes(data)
+
+
+def recv_frame(sock):
+    length, kind = FRAME.unpack(recv_exact(sock, FRAME.size))
+    if length > MAX_FRAME:
+        raise ValueError(f"Frame of {length} bytes exceeds the {MAX_FRAME} byte limit")
+    return kind, recv_exact(sock, length) if length else b''
+
+
+class Peer:
+    """One connected client on the host: a reader thread feeding the shared inbox
+    and a writer thread that always sends the newest published world."""
+
+    def __init__(self, host, player_id, sock):
+        self.host = host
+        self.player_id = player_id
+        self.sock = sock
+        self.baseline = None
+        self.published = None
+        self.closed = False
+        self.bytes_sent = 0
+        self.snapshots_sent = 0
+        self.condition = threading.Condition()
+        self.reader = threading.Thread(target=self.read_loop, name=f'coop-read-{player_id}', daemon=True)
+        self.writer = threading.Thread(target=self.write_loop, name=f'coop-write-{player_id}', daemon=True)
+
+    def start(self):
+        self.reader.start()
+        self.writer.start()
+
+    def publish(self, world):
+        with self.condition:
+            self.published = world
+            self.condition.notify()
+
+    def read_loop(self):
+        try:
+            while True:
+                kind, payload = recv_frame(self.sock)
+                size = CLIENT_MESSAGES.get(kind)
+                if size is None or (len(payload) % size if size else payload):
+                    continue
+                self.host.inbox.put((self.player_id, kind, payload))
+        except (OSError, ConnectionError, ValueError, struct.error):
+            pass
+        self.close()
+        self.host.inbox.put((self.player_id, MSG_LEAVE, b''))
+
+    def write_loop(self):
+        try:
+            self.bytes_sent += send_frame(self.sock, MSG_HELLO, HELLO.pack(self.player_id, self.host.tick_rate))
+            while True:
+                with self.condition:
+                    while self.published is None and not self.closed:
+                        self.condition.wait()
+                    if self.closed:
+                        return
+                    world, self.published = self.published, None
+                if world == self.baseline:
+                    continue
+                kind, payload = encode_delta(self.baseline, world)
+                self.bytes_sent += send_frame(self.sock, kind, payload)
+                self.snapshots_sent += 1
+                self.baseline = world
+        except OSError:
+            self.close()
+        except Exception as e:
+            print(f"Could not send world to player {self.player_id}: {e}")
+            self.close()
+
+    def close(self):
+        with self.condition:
+            if self.closed:
+                return
+            self.closed = True
+            self.condition.notify()
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+
+
+class CoopHost:
+    def __init__(self, address, tick_rate=20):
+        self.tick_rate = tick_rate
+        self.inbox = queue.Queue()
+        self.peers = {}
+        self.lock = threading.Lock()
+        self.listener = socket.create_server(parse_address(address))
+        self.address = self.listener.getsockname()
+        self.thread = threading.Thread(target=self.accept_loop, name='coop-accept', daemon=True)
+        self.thread.start()
+
+    def accept_loop(self):
+        while True:
+            try:
+                sock, _ = self.listener.accept()
+            except OSError:
+                return
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            with self.lock:
+                free = [i for i in range(1, MAX_CLIENTS + 1) if i not in self.peers]
+                if not free:
+                    sock.close()
+                    continue
+                peer = Peer(self, free[0], sock)
+                self.peers[peer.player_id] = peer
+            self.inbox.put((peer.player_id, MSG_HELLO, b''))
+            peer.start()
+
+    def poll(self):
+        messages = []
+        while True:
+            try:
+                player_id, kind, payload = self.inbox.get_nowait()
+            except queue.Empty:
+                return messages
+            if kind == MSG_LEAVE:
+                with self.lock:
+                    self.peers.pop(player_id, None)
+            messages.append((player_id, kind, payload))
+
+    def publish(self, world):
+        with self.lock:
+            peers = list(self.peers.values())
+        for peer in peers:
+            peer.publish(world)
+
+    def stats(self):
+        with self.lock:
+            return {player_id: (peer.snapshots_sent, peer.bytes_sent) for player_id, peer in self.peers.items()}
+
+    def close(self):
+        self.listener.close()
+        with self.lock:
+            peers = list(self.peers.values())
+            self.peers.clear()
+        for peer in peers:
+            peer.close()
+
+
+class CoopClient:
+    def __init__(self, address, timeout=5.0):
+        self.sock = socket.create_connection(parse_address(address, 'localhost'), timeout=timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        kind, payload = recv_frame(self.sock)
+        if kind != MSG_HELLO:
+            raise ConnectionError("Host did not greet")
+        self.player_id, self.tick_rate = HELLO.unpack(payload)
+        self.sock.settimeout(None)
+
+        self.baseline = None
+        self.latest = None
+        self.connected = True
+        self.bytes_received = 0
+        self.lock = threading.Lock()
+        self.outbox = queue.Queue()
+        self.reader = threading.Thread(target=self.read_loop, name='coop-read', daemon=True)
+        self.writer = threading.Thread(target=self.write_loop, name='coop-write', daemon=True)
+        self.reader.start()
+        self.writer.start()
+
+    def read_loop(self):
+        try:
+            while True:
+                kind, payload = recv_frame(self.sock)
+                self.bytes_received += FRAME.size + len(payload)
+                if kind in (MSG_FULL, MSG_DELTA):
+                    self.baseline = decode_delta(self.baseline, kind, payload)
+                    with self.lock:
+                        self.latest = self.baseline
+        except (OSError, ConnectionError, ValueError, zlib.error, struct.error):
+            pass
+        self.connected = False
+
+    def write_loop(self):
+        try:
+            while True:
+                message = self.outbox.get()
+                if message is None:
+                    return
+                send_frame(self.sock, *message)
+        except OSError:
+            self.connected = False
+
+    def poll(self):
+        """Return the newest world blob received since the last call, or None."""
+        with self.lock:
+            world, self.latest = self.latest, None
+        return world
+
+    def send_inputs(self, inputs):
+        if inputs:
+            self.outbox.put((MSG_INPUT, b''.join(INPUT.pack(*entry) for entry in inputs)))
+
+    def send_action(self):
+        self.outbox.put((MSG_ACTION, b''))
+
+    def send_clock(self, hour_angle, minute_angle):
+        self.outbox.put((MSG_CLOCK, CLOCK.pack(hour_angle, minute_angle)))
+
+    def send_reset(self):
+        self.outbox.put((MSG_RESET, b''))
+
+    def close(self):
+        self.outbox.put(None)
+        self.writer.join(timeout=1.0)
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
@@ -0,0 +1,48 @@
+import functools
+
+SOURCES = ('player', 'entities', 'missions', 'display')
+
+
+class DerivedState:
+    """Caches values computed from game state until one of their sources changes.
+
+    Each source has a version counter that the game bumps whenever it mutates that
+    part of the state; a cached value is reused while the versions it was computed
+    under are unchanged.
+    """
+
+    def __init__(self, sources=SOURCES):
+        self.versions = dict.fromkeys(sources, 0)
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    def bump(self, *sources):
+        for source in sources:
+            self.versions[source] += 1
+
+    def get(self, key, sources, compute, *args):
+        stamp = tuple(self.versions[source] for source in sources)
+        entry = self.entries.get(key)
+        if entry is not None and entry[0] == stamp:
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        value = compute(*args)
+        self.entries[key] = (stamp, value)
+        return value
+
+    def clear(self):
+        self.entries.clear()
+
+
+def derived(*sources):
+    """Memoize a no-argument Game method in `self.derived_state` against `sources`."""
+    def decorator(method):
+        key = method.__name__
+
+        @functools.wraps(method)
+        def wrapper(self):
+            return self.derived_state.get(key, sources, method, self)
+        return wrapper
+    return decorator
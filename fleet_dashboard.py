@@ -0,0 +1,147 @@
+import argparse
+import html
+import json
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from heartbeat import HeartbeatError, unpack_heartbeat
+
+PAGE = """<!doctype html>
+<html><head><meta charset="utf-8"><meta http-equiv="refresh" content="{refresh}">
+<title>Little Cat Time Adventure - Kelas</title>
+<style>
+body {{ font-family: sans-serif; margin: 2em; }}
+table {{ border-collapse: collapse; }}
+th, td {{ border: 1px solid #999; padding: 4px 10px; text-align: left; }}
+tr.offline {{ color: #999; }}
+tr.idle {{ background: #fff3c4; }}
+tr.done {{ background: #d8f5d0; }}
+</style></head><body>
+<h1>Kiosk aktif: {online}/{total}</h1>
+<table>
+<tr><th>Kiosk</th><th>Misi</th><th>Selesai</th><th>Jam</th><th>Diam</th><th>Frame p95</th><th>Terakhir</th></tr>
+{rows}
+</table></body></html>
+"""
+
+
+class Fleet:
+    def __init__(self, stale_after=10.0, idle_after=60):
+        self.stale_after = stale_after
+        self.idle_after = idle_after
+        self.kiosks = {}
+        self.received = 0
+        self.rejected = 0
+        self.lock = threading.Lock()
+
+    def update(self, data, address):
+        try:
+            beat = unpack_heartbeat(data)
+        except HeartbeatError:
+            self.rejected += 1
+            return
+        beat['address'] = address[0]
+        beat['seen'] = time.time()
+        with self.lock:
+            self.kiosks[beat['kiosk']] = beat
+            self.received += 1
+
+    def summary(self):
+        now = time.time()
+        with self.lock:
+            kiosks = [dict(beat) for _, beat in sorted(self.kiosks.items())]
+        for beat in kiosks:
+            beat['age'] = round(now - beat.pop('seen'), 1)
+            if beat['age'] > self.stale_after:
+                beat['status'] = 'offline'
+            elif beat['mission'] == 0:
+                beat['status'] = 'done'
+            elif beat['idle'] >= self.idle_after:
+                beat['status'] = 'idle'
+            else:
+                beat['status'] = 'playing'
+        return {
+            'online': sum(1 for beat in kiosks if beat['status'] != 'offline'),
+            'total': len(kiosks),
+            'received': self.received,
+            'rejected': self.rejected,
+            'kiosks': kiosks,
+        }
+
+
+def render_page(summary, refresh):
+    rows = []
+    for beat in summary['kiosks']:
+        mission = "Semua selesai" if beat['mission'] == 0 else f"Misi {beat['mission']} (jam {beat['mission_hour']})"
+        rows.append(
+            f"<tr class=\"{beat['status']}\"><td>{html.escape(beat['kiosk'])}</td><td>{mission}</td>"
+            f"<td>{beat['completed']}/5</td><td>{beat['hour']:02d}:00</td><td>{beat['idle']} s</td>"
+            f"<td>{beat['frame_p95_ms']:.1f} ms</td><td>{beat['age']} s lalu</td></tr>"
+        )
+    return PAGE.format(refresh=refresh, online=summary['online'], total=summary['total'], rows='\n'.join(rows))
+
+
+def receive_loop(sock, fleet):
+    while True:
+        try:
+            data, address = sock.recvfrom(512)
+        except OSError:
+            return
+        fleet.update(data, address)
+
+
+def make_handler(fleet, refresh):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            summary = fleet.summary()
+            if self.path.startswith('/api'):
+                body = json.dumps(summary).encode('utf-8')
+                content_type = 'application/json'
+            elif self.path == '/':
+                body = render_page(summary, refresh).encode('utf-8')
+                content_type = 'text/html; charset=utf-8'
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Collect game heartbeats and serve a classroom summary.")
+    parser.add_argument('--udp', default='0.0.0.0:9999', help="address to receive heartbeats on")
+    parser.add_argument('--http', default='0.0.0.0:8080', help="address to serve the summary on")
+    parser.add_argument('--stale', type=float, default=10.0, help="seconds before a kiosk counts as offline")
+    parser.add_argument('--refresh', type=int, default=3, help="page auto-refresh in seconds")
+    args = parser.parse_args()
+
+    fleet = Fleet(stale_after=args.stale)
+
+    udp_host, _, udp_port = args.udp.rpartition(':')
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind((udp_host, int(udp_port)))
+    threading.Thread(target=receive_loop, args=(sock, fleet), name='heartbeat-receive', daemon=True).start()
+
+    http_host, _, http_port = args.http.rpartition(':')
+    server = ThreadingHTTPServer((http_host, int(http_port)), make_handler(fleet, args.refresh))
+    print(f"Listening for heartbeats on {args.udp}, summary at http://{args.http}/ (JSON at /api)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    server.server_close()
+    sock.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+import contextlib
+import ctypes
+
+import numpy as np
+import pygame
+
+
+class FrameCapture:
+    def __init__(self, surface, size=None):
+        self.surface = surface
+        self.target = None
+        self.frame = None
+        self.frame_source = None
+        if size is not None and tuple(size) != surface.get_size():
+            self.target = pygame.Surface(size, 0, surface)
+
+    @property
+    def shape(self):
+        width, height = self.source_surface().get_size()
+        return (height, width, 3)
+
+    def source_surface(self):
+        return self.target if self.target is not None else self.surface
+
+    def resize(self, size):
+        if size is None or tuple(size) == self.surface.get_size():
+            self.target = None
+        elif self.target is None or self.target.get_size() != tuple(size):
+            self.target = pygame.Surface(size, 0, self.surface)
+
+    def refresh(self):
+        if self.target is not None:
+            pygame.transform.scale(self.surface, self.target.get_size(), self.target)
+        return self.source_surface()
+
+    @contextlib.contextmanager
+    def view(self):
+        """Zero-copy, read-only (H, W, 3) view of the current frame.
+
+        The array aliases the screen (or the scaled target) and is built once per
+        surface, so repeated calls allocate nothing. The surface is locked only
+        inside the block; an array kept past it stays readable but follows
+        whatever is drawn next.
+        """
+        surface = self.refresh()
+        frame = self.frame_view(surface)
+        surface.lock()
+        try:
+            yield frame
+        finally:
+            surface.unlock()
+
+    def frame_view(self, surface):
+        if self.frame_source is not surface:
+            pixels = pygame.surfarray.pixels3d(surface)
+            try:
+                offset = pixels.__array_interface__['data'][0] - surface._pixels_address
+                shape, strides = pixels.shape, pixels.strides
+            finally:
+                del pixels
+            memory = (ctypes.c_uint8 * (surface.get_pitch() * surface.get_height())).from_address(
+                surface._pixels_address)
+            memory.surface = surface
+            frame = np.ndarray(shape, np.uint8, memory, offset, strides).transpose(1, 0, 2)
+            frame.flags.writeable = False
+            self.frame, self.frame_source = frame, surface
+        return self.frame
+
+    def capture(self, out=None):
+        if out is None:
+            out = np.empty(self.shape, dtype=np.uint8)
+        elif out.shape != self.shape or out.dtype != np.uint8:
+            raise ValueError(f"Output buffer must be uint8 with shape {self.shape}, got {out.dtype} {out.shape}")
+        pixels = pygame.surfarray.pixels3d(self.refresh())
+        try:
+            np.copyto(out, pixels.transpose(1, 0, 2))
+        finally:
+            del pixels
+        return out
@@ -0,0 +1,117 @@
+import numpy as np
+import pygame
+
+SPROUT = 0
+BUD = 1
+BLOOM = 2
+WILTED = 3
+
+WILTED_TINT = (170, 140, 90)
+
+
+def stage_sprites(bloom):
+    """Sprite for each stage index, all derived from the full-grown sprite."""
+    width, height = bloom.get_size()
+    sprites = []
+    for scale in (0.5, 0.75):
+        size = (max(1, int(width * scale)), max(1, int(height * scale)))
+        small = pygame.transform.scale(bloom, size)
+        sprite = bloom.copy()
+        sprite.fill(sprite.get_colorkey() or (0, 0, 0, 0))
+        sprite.blit(small, ((width - size[0]) // 2, height - size[1]))
+        sprites.append(sprite)
+    sprites.append(bloom)
+
+    wilted = bloom.copy()
+    if wilted.get_bitsize() == 8:
+        tint = [(r * WILTED_TINT[0] // 255, g * WILTED_TINT[1] // 255, b * WILTED_TINT[2] // 255)
+                for r, g, b in wilted.get_palette()]
+        wilted.set_palette(tint)
+    else:
+        wilted.fill(WILTED_TINT, special_flags=pygame.BLEND_RGB_MULT)
+    sprites.append(wilted)
+    return sprites
+
+
+class Garden:
+    """Growth state for every flower and bush of one scene, in parallel numpy arrays.
+
+    Times are in-game hours. A flower that goes `wilt_hours` without water wilts
+    and loses its `watered` flag; a hydrated flower climbs one stage every
+    `grow_hours` until it blooms, and watering a wilted one revives it one stage
+    lower. A picked bush grows its fruit back after `regrow_hours`. `advance`
+    updates all plants at once and only touches the dicts of plants whose visible
+    state changed; each flower's sprite index is kept in its `stage` key.
+    """
+
+    def __init__(self, flowers, bushes, now=0.0, wilt_hours=1.0, grow_hours=0.5, regrow_hours=1.0):
+        self.flowers = flowers
+        self.bushes = bushes
+        self.wilt_hours = wilt_hours
+        self.grow_hours = grow_hours
+        self.regrow_hours = regrow_hours
+        self.flower_slots = {id(flower): i for i, flower in enumerate(flowers)}
+        self.bush_slots = {id(bush): i for i, bush in enumerate(bushes)}
+
+        self.stage = np.full(len(flowers), BLOOM, dtype=np.int8)
+        self.growth = np.zeros(len(flowers), dtype=np.float32)
+        self.wilted = np.zeros(len(flowers), dtype=bool)
+        self.watered_at = np.full(len(flowers), now, dtype=np.float64)
+        self.picked_at = np.full(len(bushes), np.inf, dtype=np.float64)
+        self.sync(now)
+
+    def sync(self, now):
+        """Reset plant state from the entity dicts, e.g. after loading a save.
+
+        Each flower keeps the stage stored in its dict (bloom if it has none); a
+        wilted one revives to a bud. Flowers start hydrated with staggered
+        remaining time, so a large garden does not wilt all in the same tick.
+        """
+        stages = np.array([flower.get('stage', BLOOM) for flower in self.flowers], dtype=np.int8)
+        self.wilted[:] = stages == WILTED
+        self.stage[:] = np.where(self.wilted, BLOOM, stages)
+        self.growth[:] = 0
+        self.watered_at[:] = now - (np.arange(len(self.flowers)) * 0.618034 % 1.0) * self.wilt_hours / 2
+        for flower, stage in zip(self.flowers, stages.tolist()):
+            flower['stage'] = stage
+        self.picked_at[:] = [now if bush['picked'] else np.inf for bush in self.bushes]
+
+    def advance(self, now, hours):
+        """Move every plant forward by `hours`; returns how many entities changed."""
+        hydrated = now - self.watered_at < self.wilt_hours
+        growing = hydrated & ~self.wilted & (self.stage < BLOOM)
+        self.growth[growing] += hours / self.grow_hours
+        grown = growing & (self.growth >= 1.0)
+        self.stage[grown] += 1
+        self.growth[grown] = 0.0
+        wilting = ~hydrated & ~self.wilted
+        self.wilted |= wilting
+
+        changed = np.flatnonzero(grown | wilting)
+        for i in changed.tolist():
+            flower = self.flowers[i]
+            flower['stage'] = WILTED if self.wilted[i] else int(self.stage[i])
+            if self.wilted[i]:
+                flower['watered'] = False
+
+        regrown = np.flatnonzero(now - self.picked_at >= self.regrow_hours)
+        for i in regrown.tolist():
+            self.bushes[i]['picked'] = False
+        self.picked_at[regrown] = np.inf
+        return len(changed) + len(regrown)
+
+    def water(self, flower, now):
+        i = self.flower_slots.get(id(flower))
+        if i is None:
+            return
+        self.watered_at[i] = now
+        if self.wilted[i]:
+            self.wilted[i] = False
+            self.stage[i] = max(SPROUT, self.stage[i] - 1)
+            self.growth[i] = 0.0
+            flower['stage'] = int(self.stage[i])
+
+    def pick(self, bush, now):
+        i = self.bush_slots.get(id(bush))
+        if i is not None:
+            self.picked_at[i] = now
@@ -0,0 +1,164 @@
+import collections
+import gc
+import time
+
+Pause = collections.namedtuple('Pause', ['generation', 'duration', 'collected', 'in_frame'])
+FrameSample = collections.namedtuple('FrameSample', ['frame_time', 'gc_time', 'generations'])
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class GCMonitor:
+    """Times every cyclic GC pass through `gc.callbacks` and ties it to the frame it
+    landed in.
+
+    The game calls `begin_frame()` before a frame's work and `end_frame(frame_time)`
+    after it; pauses outside that window (for example collections run by
+    FrameCollector in frame slack) are counted as between frames.
+    """
+
+    def __init__(self, budget=1 / 60, window=3600):
+        self.budget = budget
+        self.pauses = collections.deque(maxlen=window)
+        self.frames = collections.deque(maxlen=window)
+        self.in_frame = False
+        self.started = None
+        self.frame_gc_time = 0.0
+        self.frame_generations = 0
+        self.installed = False
+
+    def install(self):
+        if not self.installed:
+            gc.callbacks.append(self.on_gc)
+            self.installed = True
+
+    def uninstall(self):
+        if self.installed:
+            gc.callbacks.remove(self.on_gc)
+            self.installed = False
+
+    def on_gc(self, phase, info):
+        if phase == 'start':
+            self.started = time.perf_counter()
+            return
+        if self.started is None:
+            return
+        duration = time.perf_counter() - self.started
+        self.started = None
+        self.pauses.append(Pause(info['generation'], duration, info['collected'], self.in_frame))
+        if self.in_frame:
+            self.frame_gc_time += duration
+            self.frame_generations |= 1 << info['generation']
+
+    def begin_frame(self):
+        self.in_frame = True
+        self.frame_gc_time = 0.0
+        self.frame_generations = 0
+
+    def end_frame(self, frame_time):
+        self.in_frame = False
+        generations = tuple(g for g in range(3) if self.frame_generations & (1 << g))
+        self.frames.append(FrameSample(frame_time, self.frame_gc_time, generations))
+
+    def report(self):
+        frames, pauses = list(self.frames), list(self.pauses)
+        frame_times = [sample.frame_time for sample in frames]
+        spikes = [sample for sample in frames if sample.frame_time > self.budget]
+        spikes_with_gc = [sample for sample in spikes if sample.generations]
+        excess = sum(sample.frame_time - self.budget for sample in spikes)
+
+        generations = {}
+        for generation in range(3):
+            durations = [pause.duration for pause in pauses if pause.generation == generation]
+            generations[generation] = {
+                'count': len(durations),
+                'in_frame': sum(1 for pause in pauses if pause.generation == generation and pause.in_frame),
+                'total_ms': round(sum(durations) * 1000, 2),
+                'p95_ms': round(percentile(durations, 0.95) * 1000, 3),
+                'max_ms': round(max(durations, default=0.0) * 1000, 3),
+            }
+
+        worst = sorted(frames, key=lambda sample: sample.frame_time, reverse=True)[:5]
+        return {
+            'frames': len(frame_times),
+            'frame_p50_ms': round(percentile(frame_times, 0.5) * 1000, 2),
+            'frame_p99_ms': round(percentile(frame_times, 0.99) * 1000, 2),
+            'frame_max_ms': round(max(frame_times, default=0.0) * 1000, 2),
+            'generations': generations,
+            'spike_frames': len(spikes),
+            'spike_frames_with_gc': len(spikes_with_gc),
+            'gc_share_of_overrun': round(min(1.0, sum(s.gc_time for s in spikes) / excess), 3) if excess else 0.0,
+            'worst_frames': [{'frame_ms': round(s.frame_time * 1000, 2), 'gc_ms': round(s.gc_time * 1000, 2),
+                              'generations': list(s.generations)} for s in worst],
+            'frozen_objects': gc.get_freeze_count(),
+        }
+
+
+def format_report(report):
+    lines = [f"GC report over {report['frames']} frames: "
+             f"p50 {report['frame_p50_ms']} ms, p99 {report['frame_p99_ms']} ms, max {report['frame_max_ms']} ms"]
+    for generation, stats in report['generations'].items():
+        lines.append(f"  gen {generation}: {stats['count']} pauses ({stats['in_frame']} mid-frame), "
+                     f"total {stats['total_ms']} ms, p95 {stats['p95_ms']} ms, max {stats['max_ms']} ms")
+    lines.append(f"  over-budget frames: {report['spike_frames']}, {report['spike_frames_with_gc']} with a GC pause, "
+                 f"GC share of overrun {report['gc_share_of_overrun']:.0%}")
+    lines.append(f"  frozen objects: {report['frozen_objects']}")
+    return '\n'.join(lines)
+
+
+class FrameCollector:
+    """Runs the cyclic GC between frames instead of whenever allocations cross a threshold.
+
+    `start()` runs one full collection and freezes everything still alive after
+    loading into the permanent generation, so later passes never rescan it.
+    Automatic collection is then disabled and
+    `collect(slack)` runs after each frame with the time left before the next one:
+    the youngest due generation is collected, and the oldest only when the slack is
+    large. Generations that stay overdue for `overdue` times their threshold are
+    collected regardless so memory cannot grow without bound during a busy stretch.
+    """
+
+    def __init__(self, min_slack=0.002, full_slack=0.008, overdue=10):
+        self.thresholds = gc.get_threshold()
+        self.min_slack = min_slack
+        self.full_slack = full_slack
+        self.overdue = overdue
+        self.collections = [0, 0, 0]
+        self.forced = 0
+        self.active = False
+
+    def start(self):
+        gc.collect()
+        gc.freeze()
+        gc.disable()
+        self.active = True
+
+    def stop(self):
+        if self.active:
+            gc.enable()
+            self.active = False
+
+    def collect(self, slack):
+        count0, count1, count2 = gc.get_count()
+        threshold0, threshold1, threshold2 = self.thresholds
+        if count0 < threshold0:
+            return None
+        forced = count0 >= threshold0 * self.overdue
+        if slack < self.min_slack and not forced:
+            return None
+
+        generation = 0
+        if count1 >= threshold1:
+            generation = 1
+            if count2 >= threshold2 and (slack >= self.full_slack or count2 >= threshold2 * self.overdue):
+                generation = 2
+        if slack < self.min_slack:
+            self.forced += 1
+        gc.collect(generation)
+        self.collections[generation] += 1
+        return generation
@@ -0,0 +1,92 @@
+import collections
+import socket
+import struct
+import time
+
+HEARTBEAT_MAGIC = b'CH'
+HEARTBEAT_VERSION = 1
+
+PACKET = struct.Struct('<2sB16sIBBBBHH')
+
+FIELDS = ('kiosk', 'seq', 'mission', 'mission_hour', 'completed', 'hour', 'idle', 'frame_p95_ms')
+
+
+class HeartbeatError(Exception):
+    pass
+
+
+def pack_heartbeat(kiosk, seq, mission, mission_hour, completed, hour, idle, frame_p95_ms):
+    return PACKET.pack(
+        HEARTBEAT_MAGIC, HEARTBEAT_VERSION, kiosk.encode('utf-8')[:16], seq & 0xFFFFFFFF,
+        mission, mission_hour, completed, hour,
+        min(int(idle), 0xFFFF), min(int(frame_p95_ms * 10), 0xFFFF),
+    )
+
+
+def unpack_heartbeat(data):
+    if len(data) != PACKET.size:
+        raise HeartbeatError(f"Heartbeat must be {PACKET.size} bytes, got {len(data)}")
+    magic, version, kiosk, seq, mission, mission_hour, completed, hour, idle, p95 = PACKET.unpack(data)
+    if magic != HEARTBEAT_MAGIC or version != HEARTBEAT_VERSION:
+        raise HeartbeatError("Not a heartbeat packet")
+    return {
+        'kiosk': kiosk.rstrip(b'\0').decode('utf-8', 'replace'),
+        'seq': seq,
+        'mission': mission,
+        'mission_hour': mission_hour,
+        'completed': completed,
+        'hour': hour,
+        'idle': idle,
+        'frame_p95_ms': p95 / 10,
+    }
+
+
+class HeartbeatSender:
+    """Sends one PACKET-sized datagram every `interval` seconds.
+
+    The socket is non-blocking and the destination is resolved once up front, so
+    a send never waits on the network; a missing aggregator just loses packets.
+    """
+
+    def __init__(self, address, kiosk, interval=2.0, window=240):
+        host, _, port = address.rpartition(':')
+        family, _, _, _, self.address = socket.getaddrinfo(host or 'localhost', int(port),
+                                                          type=socket.SOCK_DGRAM)[0]
+        self.sock = socket.socket(family, socket.SOCK_DGRAM)
+        self.sock.setblocking(False)
+        self.kiosk = kiosk or socket.gethostname()
+        self.interval = interval
+        self.frame_times = collections.deque(maxlen=window)
+        self.next_send = 0.0
+        self.seq = 0
+        self.sent = 0
+        self.failed = 0
+
+    def record_frame(self, frame_time):
+        self.frame_times.append(frame_time)
+
+    def frame_p95_ms(self):
+        if not self.frame_times:
+            return 0.0
+        ordered = sorted(self.frame_times)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000
+
+    def due(self, now=None):
+        now = time.monotonic() if now is None else now
+        if now < self.next_send:
+            return False
+        self.next_send = now + self.interval
+        return True
+
+    def send(self, mission, mission_hour, completed, hour, idle):
+        self.seq += 1
+        packet = pack_heartbeat(self.kiosk, self.seq, mission, mission_hour, completed, hour,
+                                idle, self.frame_p95_ms())
+        try:
+            self.sock.sendto(packet, self.address)
+            self.sent += 1
+        except OSError:
+            self.failed += 1
+
+    def close(self):
+        self.sock.close()
@@ -0,0 +1,62 @@
+import numpy as np
+import pygame
+
+HOUR_TINTS = [
+    (255, 255, 255),
+    (75, 85, 145),
+    (85, 90, 150),
+    (100, 100, 160),
+    (140, 120, 160),
+    (200, 150, 140),
+    (235, 200, 170),
+    (250, 235, 210),
+    (255, 255, 245),
+    (255, 255, 255),
+    (255, 255, 255),
+    (255, 250, 240),
+]
+
+
+def hour_bucket(hour_angle):
+    return round(hour_angle / 30) % 12
+
+
+class LightingCache:
+    def __init__(self, tints=HOUR_TINTS, max_entries=12):
+        self.tints = tints
+        self.max_entries = max_entries
+        self.light_maps = {}
+        self.builds = 0
+
+    def light_map(self, bucket, size):
+        key = (bucket, size)
+        if self.light_maps and next(iter(self.light_maps))[1] != size:
+            self.light_maps.clear()
+        if key not in self.light_maps:
+            while len(self.light_maps) >= self.max_entries:
+                del self.light_maps[next(iter(self.light_maps))]
+            self.light_maps[key] = self.build(bucket, size)
+        return self.light_maps[key]
+
+    def build(self, bucket, size):
+        self.builds += 1
+        tint = np.array(self.tints[bucket], dtype=np.float32)
+        if (tint >= 255).all():
+            return None
+
+        width, height = size
+        darkness = 1.0 - tint.mean() / 255.0
+        x = np.linspace(-1.0, 1.0, width, dtype=np.float32)[:, None]
+        y = np.linspace(-1.0, 1.0, height, dtype=np.float32)[None, :]
+        falloff = 1.0 - darkness * 0.6 * np.clip(x * x + y * y, 0.0, 1.0)
+        pixels = (falloff[..., None] * tint).clip(0, 255).astype(np.uint8)
+        return pygame.surfarray.make_surface(pixels).convert()
+
+    def apply(self, surface, hour_angle, rect=None):
+        rect = pygame.Rect(rect) if rect else surface.get_rect()
+        light_map = self.light_map(hour_bucket(hour_angle), rect.size)
+        if light_map is not None:
+            surface.blit(light_map, rect.topleft, special_flags=pygame.BLEND_RGB_MULT)
+
+    def clear(self):
+        self.light_maps.clear()
@@ -0,0 +1,70 @@
+import numpy as np
+import pygame
+
+ALPHA_THRESHOLD = 128
+
+
+def palettize(surface, alpha_threshold=ALPHA_THRESHOLD):
+    if surface.get_bitsize() == 8:
+        return surface
+
+    rgb = pygame.surfarray.array3d(surface)
+    packed = (rgb[..., 0].astype(np.uint32) << 16) | (rgb[..., 1].astype(np.uint32) << 8) | rgb[..., 2]
+
+    transparent = None
+    if surface.get_flags() & pygame.SRCALPHA:
+        transparent = pygame.surfarray.array_alpha(surface) < alpha_threshold
+        if not transparent.any():
+            transparent = None
+
+    opaque = packed if transparent is None else packed[~transparent]
+    colors, inverse = np.unique(opaque, return_inverse=True)
+    offset = 0 if transparent is None else 1
+    if len(colors) + offset > 256:
+        return surface
+
+    indices = np.zeros(packed.shape, dtype=np.uint8)
+    if transparent is None:
+        indices[...] = inverse.reshape(packed.shape) + offset
+    else:
+        indices[~transparent] = inverse.ravel() + offset
+
+    palette = [(0, 0, 0)] * offset + [((c >> 16) & 255, (c >> 8) & 255, c & 255) for c in colors.tolist()]
+    palette += [(0, 0, 0)] * (256 - len(palette))
+
+    result = pygame.Surface(surface.get_size(), 0, 8)
+    result.set_palette(palette)
+    pygame.surfarray.blit_array(result, indices)
+    if transparent is not None:
+        result.set_colorkey(0, pygame.RLEACCEL)
+    return result
+
+
+def surface_bytes(surface):
+    return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+
+def collect_surfaces(value, found):
+    if isinstance(value, pygame.Surface):
+        found.setdefault(id(value), value)
+    elif isinstance(value, dict):
+        for item in value.values():
+            collect_surfaces(item, found)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            collect_surfaces(item, found)
+    return found
+
+
+def surface_memory(sources):
+    report = {}
+    seen = set()
+    for name, value in sources.items():
+        total = 0
+        for key, surface in collect_surfaces(value, {}).items():
+            if key not in seen:
+                seen.add(key)
+                total += surface_bytes(surface)
+        if total:
+            report[name] = total
+    return report
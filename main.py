@@ -1,43 +1,76 @@
+import asyncio
 import pygame
 import sys
 import os
 import math
 import random
+import threading
+import time
 from pathlib import Path
 
-pygame.init()
+from admin import AdminServer
+from framecapture import FrameCapture
+from recorder import FrameRecorder
+import savegame
+from telemetry import Telemetry
+from heartbeat import HeartbeatSender
+from assetwatch import AssetWatcher
+import animation
+import controls
+import coop
+from derived import DerivedState, derived
+from garden import BLOOM, WILTED, Garden, stage_sprites
+from gcmonitor import FrameCollector, GCMonitor, format_report
+from lighting import LightingCache
+import quality
+import lowmem
+import minimap
+import npcs
+import worldgen
+from particles import ParticleSystem
+from profiler import SamplingProfiler
+from scenes import HOME_SCENE, OPPOSITE_EDGE, EntityIndex, SceneManager, generate_scene
+from simthread import RenderState, SimulationThread
+from settings import *
 
-SCREEN_WIDTH = 800
-SCREEN_HEIGHT = 600
-TILE_SIZE = 16
-SCALE = 2
-FPS = 60
+ACTION_STATE = (
+    'clock_ui_active',
+    'watering', 'watering_side', 'watering_timer',
+    'picking', 'picking_timer',
+    'cutting', 'cutting_side', 'cutting_timer',
+    'flower_watering', 'flower_watering_side', 'flower_watering_timer',
+    'mushroom_cutting', 'mushroom_cutting_side', 'mushroom_cutting_timer',
+)
 
-CLOCK_ICON_SIZE = 128
-CLOCK_DISPLAY_SIZE = 800
-CLOCK_CENTER_X = SCREEN_WIDTH // 2
-CLOCK_CENTER_Y = SCREEN_HEIGHT // 2
-
-WHITE = (255, 255, 255)
-BLACK = (0, 0, 0)
-GREEN = (51, 153, 51)
-BROWN = (128, 102, 77)
-BLUE = (51, 102, 204)
-GRAY = (128, 128, 128)
-RED = (200, 50, 50)
-DARK_BLUE = (30, 30, 100)
 
 class Game:
     def __init__(self):
+        start = time.perf_counter()
+        pygame.display.init()
         self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.FULLSCREEN)
         pygame.display.set_caption("Little Cat Time Adventure - Faiz")
         self.clock = pygame.time.Clock()
         self.running = True
+        self.fonts = {}
+        self.derived_state = DerivedState()
+        self.startup_timings = {'init': time.perf_counter() - start}
+        start = time.perf_counter()
         
-        pygame.mixer.init()
+        self.native_render = NATIVE_RENDER
+        self.low_memory = LOW_MEMORY
+        self.asset_scale = 1 if self.native_render else SCALE
+        self.world_buffer = None
+        self.upscale_target = None
         
         self.load_sprites()
-        self.load_map()
+        self.scene_manager = SceneManager(self.build_map, memory_cap=SCENE_CACHE_MB * 1024 * 1024)
+        self.npc_schedulers = {}
+        self.npc_frames = None
+        self.npc_frames_base = None
+        self.gardens = {}
+        self.garden_hours = 0.0
+        self.garden_dt = 0.0
+        self.enter_scene(HOME_SCENE)
         self.load_clock()
         self.load_sounds()
         
@@ -48,62 +81,38 @@ class Game:
             'width': 16,
             'height': 16,
             'direction': 'down',
-            'state': 'idle',
-            'animation_timer': 0,
-            'animation_frame': 0
+            'state': 'idle'
         }
         
         self.camera_x = 0
         self.camera_y = 0
+        self.set_render_scale(SCALE)
         
-        self.animation_speed = 0.3
         
         self.clock_ui_active = False
+        self.minimap_visible = MINIMAP
         self.hour_angle = 0
         self.minute_angle = 0
         self.dragging_hand = None
         self.clock_icon_rect = pygame.Rect(10, 10, CLOCK_ICON_SIZE, CLOCK_ICON_SIZE)
         
-        self.trees = [
-            {'x': 2, 'y': 50},
-            {'x': 100, 'y': 230},
-            {'x': 350, 'y': 150},
-            {'x': 350, 'y': 250},
-        ]
         self.load_tree()
         
-        self.bushes = [
-            {'x': 220, 'y': 270, 'picked': False},
-            {'x': 280, 'y': 270, 'picked': False},
-            {'x': 250, 'y': 270, 'picked': False},
-        ]
         self.load_bush()
         self.load_fruit()
         
-        self.trunks = [
-            {'x': 400, 'y': 100, 'cut': False},
-            {'x': 50, 'y': 150, 'cut': False},
-        ]
         self.load_trunk()
         
-        self.flowers = [
-            {'x': 120, 'y': 100, 'watered': False},
-            {'x': 120, 'y': 70, 'watered': False},
-            {'x': 150, 'y': 70, 'watered': False},
-            {'x': 150, 'y': 100, 'watered': False},
-            {'x': 180, 'y': 70, 'watered': False},
-            {'x': 180, 'y': 100, 'watered': False},
-        ]
         self.load_flower()
         
-        self.mushrooms = [
-            {'x': 160, 'y': 180, 'removed': False},
-            {'x': 450, 'y': 180, 'removed': False},
-            {'x': 20, 'y': 280, 'removed': False},
-            {'x': 350, 'y': 80, 'removed': False},
-        ]
         self.load_mushroom()
         
+        self.animations = animation.AnimationTable()
+        self.animations.build(self.sprites)
+        self.animation_clock = animation.AnimationClock()
+        self.animation_interval = 0.0
+        self.animation_dt = 0.0
+        
         self.watering = False
         self.watering_side = None
         self.watering_timer = 0
@@ -125,6 +134,8 @@ class Game:
         self.flower_watering_timer = 0
         self.flower_watering_duration = 1.0
         self.flowers_watered = 0
+        self.flower_variants = None
+        self.flower_variants_base = None
         
         self.mushroom_cutting = False
         self.mushroom_cutting_side = None
@@ -132,6 +143,18 @@ class Game:
         self.mushroom_cutting_duration = 1.5
         self.mushrooms_removed = 0
         
+        self.particles = ParticleSystem(PARTICLE_CAPACITY, self.asset_scale)
+        self.lighting_enabled = True
+        self.lighting = None
+        if DAY_NIGHT_LIGHTING:
+            self.lighting = LightingCache(max_entries=1 if self.low_memory else 12)
+        
+        if self.low_memory:
+            self.compact_assets()
+        self.startup_timings['assets'] = time.perf_counter() - start
+        start = time.perf_counter()
+        self.water_emit_accumulator = 0.0
+        
         self.missions = [
             {
                 'id': 1,
@@ -180,35 +203,81 @@ class Game:
         self.notification_timer = 0
         self.notification_duration = 3.0
         
+        self.frame_capture = None
+        self.simulation = None
+        
+        self.target_fps = FPS
+        self.alpha_overlays = True
+        self.quality_governor = None
+        self.quality_profile = None
+        self.gc_monitor = GCMonitor(1.0 / FPS) if GC_MONITOR else None
+        self.gc_collector = FrameCollector() if GC_FRAME_COLLECT else None
+        self.profiler = SamplingProfiler(PROFILE_DIR, PROFILE_INTERVAL, PROFILE_SAMPLES)
+        self.profiler.watch(threading.main_thread())
+        
+        self.telemetry = Telemetry(TELEMETRY_DIR, STUDENT_ID, flush_interval=0.5)
+        
+        self.last_input_time = time.monotonic()
+        self.input_time = None
+        self.controls = controls.InputQueue()
+        try:
+            self.actions = controls.ActionMap(controls.parse_bindings(KEY_BINDINGS))
+        except ValueError as e:
+            print(f"Ignoring GAME_KEYS={KEY_BINDINGS!r}: {e}")
+            self.actions = controls.ActionMap()
+        self.heartbeat = None
+        if HEARTBEAT_ADDR:
+            try:
+                self.heartbeat = HeartbeatSender(HEARTBEAT_ADDR, KIOSK_ID, HEARTBEAT_INTERVAL)
+            except (OSError, ValueError) as e:
+                print(f"Heartbeats disabled, bad address {HEARTBEAT_ADDR}: {e}")
+        self.clock_drag_start = None
+        
+        self.autosaver = None
+        if SAVE_FILE and not COOP_JOIN:
+            self.autosaver = savegame.Autosaver(SAVE_FILE)
+            self.load_snapshot()
+        
+        self.coop_host = None
+        self.coop_client = None
+        self.remote_players = {}
+        self.coop_tick = 1.0 / COOP_TICK_RATE
+        self.coop_accumulator = 0.0
+        self.input_seq = 0
+        self.pending_inputs = []
+        self.outgoing_inputs = []
+        self.pending_clock = None
+        if COOP_HOST:
+            self.coop_host = coop.CoopHost(COOP_HOST, COOP_TICK_RATE)
+            print(f"Hosting co-op game on port {self.coop_host.address[1]}...")
+        elif COOP_JOIN:
+            self.coop_client = coop.CoopClient(COOP_JOIN)
+            print(f"Joined co-op game at {COOP_JOIN} as player {self.coop_client.player_id}")
+        
+        self.asset_registry = self.build_asset_registry()
+        self.asset_watcher = None
+        if HOT_RELOAD:
+            self.asset_watcher = AssetWatcher({path: kind for path, (kind, _) in self.asset_registry.items()})
+            print(f"Watching char/ for asset changes ({self.asset_watcher.mode})...")
+        
+        self.recorder = None
+        if RECORD_DIR:
+            print(f"Recording session to {RECORD_DIR} ({RECORD_FORMAT})...")
+            self.recorder = FrameRecorder(self.screen, RECORD_DIR, RECORD_FORMAT,
+                                          RECORD_FPS, RECORD_DOWNSCALE)
+        
+        self.startup_timings['setup'] = time.perf_counter() - start
+    
     def load_sprites(self):
         self.sprites = {}
         sprite_folder = 'char'
         
-        sprite_mapping = {
-            'idle1.png': 'idle-front1',
-            'idle2.png': 'idle-front2',
-            'idle-back1.png': 'idle-back1',
-            'idle-back2.png': 'idle-back2',
-            'idle-left1.png': 'idle-left1',
-            'idle-left2.png': 'idle-left2',
-            'idle-right1.png': 'idle-right1',
-            'idle-right2.png': 'idle-right2',
-            'walk1.png': 'walk-front1',
-            'walk2.png': 'walk-front2',
-            'walk-back1.png': 'walk-back1',
-            'walk-back2.png': 'walk-back2',
-            'walk-left1.png': 'walk-left1',
-            'walk-left2.png': 'walk-left2',
-            'walk-right1.png': 'walk-right1',
-            'walk-right2.png': 'walk-right2'
-        }
-        
-        sprite_paths = {filename: os.path.join(sprite_folder, filename) for filename in sprite_mapping.keys()}
+        sprite_paths = {filename: os.path.join(sprite_folder, filename) for filename in SPRITE_MAPPING.keys()}
         all_exist = all(os.path.exists(path) for path in sprite_paths.values())
         
         if all_exist:
             print(f"Loading directional sprites from {sprite_folder}/ folder...")
-            for filename, sprite_name in sprite_mapping.items():
+            for filename, sprite_name in SPRITE_MAPPING.items():
                 sprite_path = sprite_paths[filename]
                 self.sprites[sprite_name] = pygame.image.load(sprite_path).convert_alpha()
         else:
@@ -218,11 +287,20 @@ class Game:
         for key in self.sprites:
             self.sprites[key] = pygame.transform.scale(
                 self.sprites[key], 
-                (16 * SCALE, 16 * SCALE)
+                self.sprite_size(16, 16)
             )
         
         self.load_watering_sprites()
     
+    def sprite_size(self, width, height):
+        return (width * self.asset_scale, height * self.asset_scale)
+    
+    def fit_sprite(self, surface, width, height):
+        size = self.sprite_size(width, height)
+        if surface.get_size() == size:
+            return surface
+        return pygame.transform.scale(surface, size)
+    
     def generate_sprites(self):
         sprite_size = 16
         
@@ -241,20 +319,17 @@ class Game:
     
     def load_watering_sprites(self):
         sprite_folder = 'char'
-        watering_files = ['watering-left1.png', 'watering-left2.png', 
-                         'watering-right1.png', 'watering-right2.png']
-        
-        sprite_paths = [os.path.join(sprite_folder, f) for f in watering_files]
+        sprite_paths = [os.path.join(sprite_folder, f) for f in WATERING_SPRITE_FILES]
         all_exist = all(os.path.exists(p) for p in sprite_paths)
         
         if all_exist:
             print(f"Loading watering sprites from {sprite_folder}/ folder...")
-            for sprite_file, sprite_path in zip(watering_files, sprite_paths):
+            for sprite_file, sprite_path in zip(WATERING_SPRITE_FILES, sprite_paths):
                 sprite_name = sprite_file.replace('.png', '')
                 self.sprites[sprite_name] = pygame.image.load(sprite_path).convert_alpha()
                 self.sprites[sprite_name] = pygame.transform.scale(
                     self.sprites[sprite_name], 
-                    (16 * SCALE, 16 * SCALE)
+                    self.sprite_size(16, 16)
                 )
         else:
             print("Generating watering sprites programmatically...")
@@ -268,13 +343,13 @@ class Game:
         pants = (77, 51, 26)
         water_can = (150, 150, 150)
         
-        wl1 = self.sprites['watering-left1'] = pygame.transform.scale(wl1, (16 * SCALE, 16 * SCALE))
+        wl1 = self.sprites['watering-left1'] = pygame.transform.scale(wl1, self.sprite_size(16, 16))
         
-        wl2 = self.sprites['watering-left2'] = pygame.transform.scale(wl2, (16 * SCALE, 16 * SCALE))
+        wl2 = self.sprites['watering-left2'] = pygame.transform.scale(wl2, self.sprite_size(16, 16))
         
-        wr1 = self.sprites['watering-right1'] = pygame.transform.scale(wr1, (16 * SCALE, 16 * SCALE))
+        wr1 = self.sprites['watering-right1'] = pygame.transform.scale(wr1, self.sprite_size(16, 16))
         
-        wr2 = self.sprites['watering-right2'] = pygame.transform.scale(wr2, (16 * SCALE, 16 * SCALE))
+        wr2 = self.sprites['watering-right2'] = pygame.transform.scale(wr2, self.sprite_size(16, 16))
     
     def load_bush(self):
         bush1_path = os.path.join('char', 'bush', 'bush1.png')
@@ -284,8 +359,8 @@ class Game:
             print(f"Loading bush sprites from char/bush/ folder...")
             self.bush1_sprite = pygame.image.load(bush1_path).convert_alpha()
             self.bush2_sprite = pygame.image.load(bush2_path).convert_alpha()
-            self.bush1_sprite = pygame.transform.scale(self.bush1_sprite, (64, 64))
-            self.bush2_sprite = pygame.transform.scale(self.bush2_sprite, (64, 64))
+            self.bush1_sprite = pygame.transform.scale(self.bush1_sprite, self.sprite_size(32, 32))
+            self.bush2_sprite = pygame.transform.scale(self.bush2_sprite, self.sprite_size(32, 32))
         else:
             print("Bush sprites not found, creating placeholders...")
             self.bush1_sprite = pygame.Surface((64, 64), pygame.SRCALPHA)
@@ -295,6 +370,9 @@ class Game:
             
             self.bush2_sprite = pygame.Surface((64, 64), pygame.SRCALPHA)
             pygame.draw.circle(self.bush2_sprite, (34, 139, 34), (32, 32), 30)
+            
+            self.bush1_sprite = self.fit_sprite(self.bush1_sprite, 32, 32)
+            self.bush2_sprite = self.fit_sprite(self.bush2_sprite, 32, 32)
     
     def load_fruit(self):
         fruit_path = os.path.join('char', 'fruit.png')
@@ -302,12 +380,13 @@ class Game:
         if os.path.exists(fruit_path):
             print(f"Loading fruit from {fruit_path}...")
             self.fruit_sprite = pygame.image.load(fruit_path).convert_alpha()
-            self.fruit_sprite = pygame.transform.scale(self.fruit_sprite, (32, 32))
+            self.fruit_sprite = pygame.transform.scale(self.fruit_sprite, self.sprite_size(16, 16))
         else:
             print("Fruit sprite not found, creating placeholder...")
             self.fruit_sprite = pygame.Surface((32, 32), pygame.SRCALPHA)
             pygame.draw.circle(self.fruit_sprite, (255, 100, 100), (16, 16), 14)
             pygame.draw.circle(self.fruit_sprite, (255, 0, 0), (16, 16), 12)
+            self.fruit_sprite = self.fit_sprite(self.fruit_sprite, 16, 16)
     
     def load_trunk(self):
         trunk_path = os.path.join('char', 'trunk.png')
@@ -315,36 +394,30 @@ class Game:
         if os.path.exists(trunk_path):
             print(f"Loading trunk from {trunk_path}...")
             self.trunk_sprite = pygame.image.load(trunk_path).convert_alpha()
-            self.trunk_sprite = pygame.transform.scale(self.trunk_sprite, (64, 64))
+            self.trunk_sprite = pygame.transform.scale(self.trunk_sprite, self.sprite_size(32, 32))
         else:
             print("Trunk sprite not found, creating placeholder...")
             self.trunk_sprite = pygame.Surface((64, 64), pygame.SRCALPHA)
             pygame.draw.rect(self.trunk_sprite, (101, 67, 33), (5, 20, 54, 24))
             pygame.draw.ellipse(self.trunk_sprite, (139, 90, 43), (0, 18, 20, 28))
             pygame.draw.ellipse(self.trunk_sprite, (139, 90, 43), (44, 18, 20, 28))
+            self.trunk_sprite = self.fit_sprite(self.trunk_sprite, 32, 32)
         
         self.load_cutting_sprites()
     
     def load_cutting_sprites(self):
         sprite_folder = 'char'
-        cutting_files = [
-            'cut-behind1.png', 'cut-behind2.png',
-            'cut-front1.png', 'cut-front2.png',
-            'cut-left1.png', 'cut-left2.png',
-            'cut-right1.png', 'cut-right2.png'
-        ]
-        
-        sprite_paths = [os.path.join(sprite_folder, f) for f in cutting_files]
+        sprite_paths = [os.path.join(sprite_folder, f) for f in CUTTING_SPRITE_FILES]
         all_exist = all(os.path.exists(p) for p in sprite_paths)
         
         if all_exist:
             print(f"Loading cutting sprites from {sprite_folder}/ folder...")
-            for sprite_file, sprite_path in zip(cutting_files, sprite_paths):
+            for sprite_file, sprite_path in zip(CUTTING_SPRITE_FILES, sprite_paths):
                 sprite_name = sprite_file.replace('.png', '')
                 self.sprites[sprite_name] = pygame.image.load(sprite_path).convert_alpha()
                 self.sprites[sprite_name] = pygame.transform.scale(
                     self.sprites[sprite_name], 
-                    (16 * SCALE, 16 * SCALE)
+                    self.sprite_size(16, 16)
                 )
         else:
             print("Generating cutting sprites programmatically...")
@@ -366,7 +439,7 @@ class Game:
             pygame.draw.rect(sprite, pants, (8, 11, 3, 5))
             offset = 1 if i == 2 else 0
             pygame.draw.rect(sprite, axe, (7 + offset, 0, 2, 4))
-            self.sprites[f'cut-behind{i}'] = pygame.transform.scale(sprite, (16 * SCALE, 16 * SCALE))
+            self.sprites[f'cut-behind{i}'] = pygame.transform.scale(sprite, self.sprite_size(16, 16))
         
         for i in range(1, 3):
             sprite = pygame.Surface((sprite_size, sprite_size), pygame.SRCALPHA)
@@ -376,7 +449,7 @@ class Game:
             pygame.draw.rect(sprite, pants, (8, 11, 3, 5))
             offset = 1 if i == 2 else 0
             pygame.draw.rect(sprite, axe, (7 + offset, 12, 2, 4))
-            self.sprites[f'cut-front{i}'] = pygame.transform.scale(sprite, (16 * SCALE, 16 * SCALE))
+            self.sprites[f'cut-front{i}'] = pygame.transform.scale(sprite, self.sprite_size(16, 16))
         
         for i in range(1, 3):
             sprite = pygame.Surface((sprite_size, sprite_size), pygame.SRCALPHA)
@@ -386,7 +459,7 @@ class Game:
             pygame.draw.rect(sprite, pants, (8, 11, 3, 5))
             offset = 1 if i == 2 else 0
             pygame.draw.rect(sprite, axe, (1, 6 + offset, 4, 2))
-            self.sprites[f'cut-left{i}'] = pygame.transform.scale(sprite, (16 * SCALE, 16 * SCALE))
+            self.sprites[f'cut-left{i}'] = pygame.transform.scale(sprite, self.sprite_size(16, 16))
         
         for i in range(1, 3):
             sprite = pygame.Surface((sprite_size, sprite_size), pygame.SRCALPHA)
@@ -396,7 +469,7 @@ class Game:
             pygame.draw.rect(sprite, pants, (8, 11, 3, 5))
             offset = 1 if i == 2 else 0
             pygame.draw.rect(sprite, axe, (11, 6 + offset, 4, 2))
-            self.sprites[f'cut-right{i}'] = pygame.transform.scale(sprite, (16 * SCALE, 16 * SCALE))
+            self.sprites[f'cut-right{i}'] = pygame.transform.scale(sprite, self.sprite_size(16, 16))
     
     def load_flower(self):
         flower_path = os.path.join('char', 'flower.png')
@@ -404,7 +477,7 @@ class Game:
         if os.path.exists(flower_path):
             print(f"Loading flower from {flower_path}...")
             self.flower_sprite = pygame.image.load(flower_path).convert_alpha()
-            self.flower_sprite = pygame.transform.scale(self.flower_sprite, (32, 64))
+            self.flower_sprite = pygame.transform.scale(self.flower_sprite, self.sprite_size(16, 32))
         else:
             print("Flower sprite not found, creating placeholder...")
             self.flower_sprite = pygame.Surface((32, 64), pygame.SRCALPHA)
@@ -416,6 +489,7 @@ class Game:
             pygame.draw.circle(self.flower_sprite, petal_color, (13, 18), 5)
             pygame.draw.circle(self.flower_sprite, petal_color, (19, 18), 5)
             pygame.draw.circle(self.flower_sprite, (255, 255, 0), (16, 14), 4)
+            self.flower_sprite = self.fit_sprite(self.flower_sprite, 16, 32)
     
     def load_mushroom(self):
         mushroom_path = os.path.join('char', 'mushroom.png')
@@ -423,7 +497,7 @@ class Game:
         if os.path.exists(mushroom_path):
             print(f"Loading mushroom from {mushroom_path}...")
             self.mushroom_sprite = pygame.image.load(mushroom_path).convert_alpha()
-            self.mushroom_sprite = pygame.transform.scale(self.mushroom_sprite, (32, 32))
+            self.mushroom_sprite = pygame.transform.scale(self.mushroom_sprite, self.sprite_size(16, 16))
         else:
             print("Mushroom sprite not found, creating placeholder...")
             self.mushroom_sprite = pygame.Surface((32, 32), pygame.SRCALPHA)
@@ -431,6 +505,7 @@ class Game:
             pygame.draw.circle(self.mushroom_sprite, (255, 255, 255), (12, 10), 3)
             pygame.draw.circle(self.mushroom_sprite, (255, 255, 255), (20, 12), 2)
             pygame.draw.rect(self.mushroom_sprite, (240, 220, 180), (12, 16, 8, 12))
+            self.mushroom_sprite = self.fit_sprite(self.mushroom_sprite, 16, 16)
     
     def load_tree(self):
         tree_path = os.path.join('char', 'tree1.png')
@@ -438,13 +513,14 @@ class Game:
         if os.path.exists(tree_path):
             print(f"Loading tree from {tree_path}...")
             self.tree_image = pygame.image.load(tree_path).convert_alpha()
-            self.tree_sprite = pygame.transform.scale(self.tree_image, (128, 128))
+            self.tree_sprite = pygame.transform.scale(self.tree_image, self.sprite_size(64, 64))
         else:
             print("Tree image not found, creating placeholder...")
             self.tree_sprite = pygame.Surface((128, 128), pygame.SRCALPHA)
             pygame.draw.rect(self.tree_sprite, (101, 67, 33), (24, 40, 16, 24))
             pygame.draw.circle(self.tree_sprite, (34, 139, 34), (32, 24), 24)
             pygame.draw.circle(self.tree_sprite, (46, 125, 50), (32, 24), 20)
+            self.tree_sprite = self.fit_sprite(self.tree_sprite, 64, 64)
     
     def load_clock(self):
         clock_path = os.path.join('char', 'clock.png')
@@ -477,12 +553,30 @@ class Game:
                              (clock_full_size//2, clock_full_size//2), 
                              clock_full_size//2 - 10)
     
+    def ensure_mixer(self):
+        if pygame.mixer.get_init():
+            return True
+        try:
+            pygame.mixer.init()
+        except pygame.error as e:
+            print(f"Audio unavailable: {e}")
+            return False
+        return True
+    
+    def get_font(self, size):
+        font = self.fonts.get(size)
+        if font is None:
+            if not pygame.font.get_init():
+                pygame.font.init()
+            font = self.fonts[size] = pygame.font.Font(None, size)
+        return font
+    
     def load_sounds(self):
         bgm_path = os.path.join('char', 'bgm.mp3')
         cut_path = os.path.join('char', 'cut.mp3')
         watering_path = os.path.join('char', 'watering.mp3')
         
-        if os.path.exists(bgm_path):
+        if os.path.exists(bgm_path) and self.ensure_mixer():
             print(f"Loading background music from {bgm_path}...")
             pygame.mixer.music.load(bgm_path)
             pygame.mixer.music.set_volume(0.5)
@@ -490,7 +584,7 @@ class Game:
         else:
             print("Background music not found")
         
-        if os.path.exists(cut_path):
+        if os.path.exists(cut_path) and self.ensure_mixer():
             print(f"Loading cut sound from {cut_path}...")
             self.cut_sound = pygame.mixer.Sound(cut_path)
             self.cut_sound.set_volume(0.6)
@@ -498,7 +592,7 @@ class Game:
             print("Cut sound not found")
             self.cut_sound = None
         
-        if os.path.exists(watering_path):
+        if os.path.exists(watering_path) and self.ensure_mixer():
             print(f"Loading watering sound from {watering_path}...")
             self.watering_sound = pygame.mixer.Sound(watering_path)
             self.watering_sound.set_volume(0.6)
@@ -506,85 +600,311 @@ class Game:
             print("Watering sound not found")
             self.watering_sound = None
     
-    def load_map(self):
-        map_file = os.path.join('char', 'backyard.png')
+    def build_map(self, scene):
+        if 'generate' in scene:
+            return self.build_generated_map(scene)
+        
+        map_file = next((path for path in scene['maps'] if os.path.exists(path)), None)
         
-        if os.path.exists(map_file):
+        if map_file:
             print(f"Loading map from {map_file}...")
-            self.map_image = pygame.image.load(map_file).convert()
-            self.map_width = self.map_image.get_width()
-            self.map_height = self.map_image.get_height()
-        elif os.path.exists('map.png'):
-            print("Loading map from map.png...")
-            self.map_image = pygame.image.load('map.png').convert()
-            self.map_width = self.map_image.get_width()
-            self.map_height = self.map_image.get_height()
+            map_image = pygame.image.load(map_file)
+            map_width = map_image.get_width()
+            map_height = map_image.get_height()
+            pyramid = minimap.load_pyramid(map_file, map_image)
+            if pyramid is None:
+                pyramid = minimap.build_pyramid(map_image)
+                minimap.save_pyramid(map_file, pyramid)
         else:
             print("Creating default map (30x20 tiles)...")
-            self.map_width = 30 * TILE_SIZE
-            self.map_height = 20 * TILE_SIZE
-            self.map_image = pygame.Surface((self.map_width, self.map_height))
-            
-            for y in range(0, self.map_height, TILE_SIZE):
-                for x in range(0, self.map_width, TILE_SIZE):
-                    if ((x // TILE_SIZE) + (y // TILE_SIZE)) % 2 == 0:
-                        color = (51, 153, 51)
-                    else:
-                        color = (41, 143, 41)
-                    pygame.draw.rect(self.map_image, color, (x, y, TILE_SIZE, TILE_SIZE))
-            
-            for i in range(20):
-                pygame.draw.rect(self.map_image, BROWN, 
-                                (3 * TILE_SIZE, i * TILE_SIZE, TILE_SIZE, TILE_SIZE))
-            
-            house_color = (139, 115, 85)
-            roof_color = (139, 69, 19)
-            pygame.draw.rect(self.map_image, house_color, 
-                           (10 * TILE_SIZE, 5 * TILE_SIZE, 8 * TILE_SIZE, 6 * TILE_SIZE))
-            pygame.draw.rect(self.map_image, roof_color, 
-                           (9 * TILE_SIZE, 4 * TILE_SIZE, 10 * TILE_SIZE, TILE_SIZE))
-        
-        self.map_surface = pygame.transform.scale(
-            self.map_image,
-            (self.map_width * SCALE, self.map_height * SCALE)
-        )
+            map_image = worldgen.default_world(scene['palette'], 30, 20, TILE_SIZE).render()
+            map_width = map_image.get_width()
+            map_height = map_image.get_height()
+            pyramid = minimap.build_pyramid(map_image)
+        
+        if self.asset_scale == 1:
+            map_surface = map_image
+        else:
+            map_surface = pygame.transform.scale(
+                map_image,
+                (map_width * self.asset_scale, map_height * self.asset_scale)
+            )
+        if self.low_memory:
+            map_surface = lowmem.palettize(map_surface)
+            map_image = None
+        return {'image': map_image, 'surface': map_surface, 'terrain': None, 'pyramid': self.trim_pyramid(pyramid),
+                'width': map_width, 'height': map_height, 'converted': False}
+    
+    def build_generated_map(self, scene):
+        world, layout = generate_scene(scene)
+        print(f"Creating generated map ({world.width}x{world.height} tiles, seed {world.seed})...")
+        view_size = (self.screen.get_width() // self.asset_scale, self.screen.get_height() // self.asset_scale)
+        terrain = worldgen.TerrainView(world, self.asset_scale, view_size, indexed=self.low_memory)
+        pyramid = minimap.build_pyramid(world.render(1))
+        return {'image': None, 'surface': terrain.surface, 'terrain': terrain, 'pyramid': self.trim_pyramid(pyramid),
+                'width': world.width * TILE_SIZE, 'height': world.height * TILE_SIZE, 'converted': True,
+                'entities': layout}
+    
+    def trim_pyramid(self, pyramid):
+        if not self.low_memory:
+            return pyramid
+        return [level for level in pyramid if max(level.get_size()) <= 2 * MINIMAP_SIZE] or pyramid[-1:]
+    
+    def enter_scene(self, name, edge=None):
+        scene_map, entities = self.scene_manager.enter(name)
+        if not scene_map['converted']:
+            if scene_map['surface'].get_bitsize() != 8:
+                scene_map['surface'] = scene_map['surface'].convert()
+            if self.asset_scale == 1 and scene_map['image'] is not None:
+                scene_map['image'] = scene_map['surface']
+            scene_map['converted'] = True
+        
+        self.scene_name = name
+        self.derived_state.bump('entities')
+        self.map_image = scene_map['image']
+        self.map_surface = scene_map['surface']
+        self.terrain = scene_map['terrain']
+        self.map_width = scene_map['width']
+        self.map_height = scene_map['height']
+        
+        self.trees = entities['trees']
+        self.bushes = entities['bushes']
+        self.trunks = entities['trunks']
+        self.flowers = entities['flowers']
+        self.mushrooms = entities['mushrooms']
+        self.entity_index = EntityIndex(entities)
+        self.minimap = minimap.Minimap(scene_map['pyramid'], (self.map_width, self.map_height), MINIMAP_SIZE)
+        self.npc_scheduler = self.scene_npcs(name)
+        self.scene_garden(name, entities)
+        
+        if edge == 'left':
+            self.player['x'] = 1
+        elif edge == 'right':
+            self.player['x'] = self.map_width - self.player['width'] - 1
+        elif edge == 'top':
+            self.player['y'] = 1
+        elif edge == 'bottom':
+            self.player['y'] = self.map_height - self.player['height'] - 1
+        if edge:
+            self.derived_state.bump('player')
+            self.update_camera()
+    
+    def check_scene_exit(self, dx, dy):
+        edge = None
+        if dx < 0 and self.player['x'] <= 0:
+            edge = 'left'
+        elif dx > 0 and self.player['x'] >= self.map_width - self.player['width']:
+            edge = 'right'
+        elif dy < 0 and self.player['y'] <= 0:
+            edge = 'top'
+        elif dy > 0 and self.player['y'] >= self.map_height - self.player['height']:
+            edge = 'bottom'
+        if edge is None:
+            return
+        
+        scene_exit = self.scene_manager.find_exit(self.scene_name, edge)
+        if scene_exit:
+            self.particles.clear()
+            self.enter_scene(scene_exit['to'], OPPOSITE_EDGE[edge])
+            self.telemetry.emit('scene_change', scene=self.scene_name)
+            self.autosave()
+    
+    def compact_assets(self):
+        print("Low-memory mode: converting sprites to 8-bit palettized surfaces...")
+        before = sum(self.surface_memory_report().values())
+        
+        for key in self.sprites:
+            self.sprites[key] = lowmem.palettize(self.sprites[key])
+        for attribute in ('bush1_sprite', 'bush2_sprite', 'fruit_sprite', 'trunk_sprite',
+                          'flower_sprite', 'mushroom_sprite', 'tree_sprite', 'clock_display', 'clock_icon'):
+            setattr(self, attribute, lowmem.palettize(getattr(self, attribute)))
+        self.animations.build(self.sprites)
+        
+        self.clock_image = None
+        self.tree_image = None
+        
+        after = sum(self.surface_memory_report().values())
+        print(f"Surface memory: {before / 1048576:.1f} MB -> {after / 1048576:.1f} MB")
+    
+    def compact_surface(self, surface):
+        """Palettize a freshly loaded surface in low-memory mode, as compact_assets does at startup."""
+        return lowmem.palettize(surface) if self.low_memory else surface
+    
+    def surface_memory_report(self):
+        sources = {name: value for name, value in vars(self).items()
+                   if name not in ('screen', 'upscale_target', 'frame_capture', 'recorder')}
+        sources['scene_cache'] = list(self.scene_manager.maps.values())
+        if self.lighting:
+            sources['light_maps'] = list(self.lighting.light_maps.values())
+        sources['particles'] = self.particles.sprites
+        return lowmem.surface_memory(sources)
+    
+    def build_asset_registry(self):
+        registry = {}
+        
+        def sprite(name):
+            def apply(image):
+                self.sprites[name] = self.compact_surface(
+                    pygame.transform.scale(image.convert_alpha(), self.sprite_size(16, 16)))
+                self.animations.build(self.sprites)
+            return apply
+        
+        def scaled(attribute, size):
+            def apply(image):
+                setattr(self, attribute, self.compact_surface(pygame.transform.scale(image.convert_alpha(), size)))
+            return apply
+        
+        def sound(attribute):
+            def apply(path):
+                if not self.ensure_mixer():
+                    return
+                new_sound = pygame.mixer.Sound(path)
+                new_sound.set_volume(0.6)
+                setattr(self, attribute, new_sound)
+            return apply
+        
+        for filename, sprite_name in SPRITE_MAPPING.items():
+            registry[os.path.join('char', filename)] = ('image', sprite(sprite_name))
+        for filename in WATERING_SPRITE_FILES + CUTTING_SPRITE_FILES:
+            registry[os.path.join('char', filename)] = ('image', sprite(filename.replace('.png', '')))
+        
+        registry[os.path.join('char', 'bush', 'bush1.png')] = ('image', scaled('bush1_sprite', self.sprite_size(32, 32)))
+        registry[os.path.join('char', 'bush', 'bush2.png')] = ('image', scaled('bush2_sprite', self.sprite_size(32, 32)))
+        registry[os.path.join('char', 'fruit.png')] = ('image', scaled('fruit_sprite', self.sprite_size(16, 16)))
+        registry[os.path.join('char', 'trunk.png')] = ('image', scaled('trunk_sprite', self.sprite_size(32, 32)))
+        registry[os.path.join('char', 'flower.png')] = ('image', scaled('flower_sprite', self.sprite_size(16, 32)))
+        registry[os.path.join('char', 'mushroom.png')] = ('image', scaled('mushroom_sprite', self.sprite_size(16, 16)))
+        registry[os.path.join('char', 'tree1.png')] = ('image', scaled('tree_sprite', self.sprite_size(64, 64)))
+        registry[os.path.join('char', 'clock.png')] = ('image', self.apply_clock_image)
+        for name, scene in self.scene_manager.scenes.items():
+            for map_path in scene['maps']:
+                registry[os.path.normpath(map_path)] = ('image', self.scene_map_reloader(name))
+        registry[os.path.join('char', 'cut.mp3')] = ('sound', sound('cut_sound'))
+        registry[os.path.join('char', 'watering.mp3')] = ('sound', sound('watering_sound'))
+        registry[os.path.join('char', 'bgm.mp3')] = ('sound', self.apply_music)
+        return registry
+    
+    def apply_clock_image(self, image):
+        self.clock_image = image.convert_alpha()
+        self.clock_icon = pygame.transform.scale(self.clock_image, (CLOCK_ICON_SIZE, CLOCK_ICON_SIZE))
+        clock_full_size = (CLOCK_DISPLAY_SIZE // 2 + 10) * 2
+        self.clock_display = pygame.transform.scale(self.clock_image, (clock_full_size, clock_full_size))
+        self.clock_icon = self.compact_surface(self.clock_icon)
+        self.clock_display = self.compact_surface(self.clock_display)
+        if self.low_memory:
+            self.clock_image = None
+    
+    def scene_map_reloader(self, name):
+        def apply(image):
+            self.scene_manager.invalidate(name)
+            if self.scene_name == name:
+                self.enter_scene(name)
+                self.update_camera()
+        return apply
+    
+    def apply_music(self, path):
+        if not self.ensure_mixer():
+            return
+        pygame.mixer.music.load(path)
+        pygame.mixer.music.set_volume(0.5)
+        pygame.mixer.music.play(-1)
+    
+    def apply_asset_changes(self):
+        for path, payload in self.asset_watcher.poll():
+            if self.simulation:
+                self.simulation.submit(self.apply_asset_change, path, payload)
+            else:
+                self.apply_asset_change(path, payload)
+    
+    def apply_asset_change(self, path, payload):
+        kind, apply = self.asset_registry[path]
+        try:
+            apply(payload if kind == 'image' else path)
+        except pygame.error as e:
+            print(f"Could not reload {path}: {e}")
+            return
+        print(f"Reloaded {path}")
     
     def handle_events(self):
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                self.running = False
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_ESCAPE:
-                    if self.clock_ui_active:
-                        self.clock_ui_active = False
-                    else:
-                        self.running = False
-                elif event.key == pygame.K_SPACE or event.key == pygame.K_e:
-                    if not self.clock_ui_active and not self.watering and not self.picking and not self.cutting and not self.flower_watering and not self.mushroom_cutting:
-                        if self.is_near_bush():
-                            self.check_picking_action()
-                        elif self.is_near_trunk():
-                            self.check_cutting_action()
-                        elif self.is_near_mushroom():
-                            self.check_mushroom_cutting_action()
-                        elif self.is_near_flower():
-                            self.check_flower_watering_action()
-                        else:
-                            self.check_watering_action()
-            elif event.type == pygame.MOUSEBUTTONDOWN:
-                if event.button == 1:
-                    mouse_pos = pygame.mouse.get_pos()
-                    self.handle_mouse_click(mouse_pos)
-            elif event.type == pygame.MOUSEBUTTONUP:
-                if event.button == 1:
-                    self.dragging_hand = None
-            elif event.type == pygame.MOUSEMOTION:
+        for event in self.controls.poll():
+            self.handle_event(event)
+    
+    def handle_event(self, event):
+        if event.type in (pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN, pygame.MOUSEMOTION):
+            self.last_input_time = time.monotonic()
+            if hasattr(event, 'input_time'):
+                self.input_time = event.input_time
+        if event.type == pygame.QUIT:
+            self.running = False
+        elif event.type == pygame.KEYDOWN:
+            action = self.actions.action(event)
+            if action == 'back':
+                if self.clock_ui_active:
+                    self.clock_ui_active = False
+                else:
+                    self.running = False
+            elif action == 'interact':
+                if self.perform_action() and self.coop_client:
+                    self.coop_client.send_action()
+            elif action == 'minimap':
+                self.minimap_visible = not self.minimap_visible
+            elif action == 'profiler':
+                self.toggle_profiler()
+        elif event.type == pygame.MOUSEBUTTONDOWN:
+            if event.button == 1:
+                self.handle_mouse_click(event.pos)
+        elif event.type == pygame.MOUSEBUTTONUP:
+            if event.button == 1:
                 if self.dragging_hand:
-                    mouse_pos = pygame.mouse.get_pos()
-                    self.update_hand_angle(mouse_pos)
+                    self.telemetry.emit('clock_set', hand=self.dragging_hand,
+                                        duration=round(time.perf_counter() - self.clock_drag_start, 3),
+                                        hour=self.get_clock_hour(),
+                                        hour_angle=round(self.hour_angle, 1),
+                                        minute_angle=round(self.minute_angle, 1))
+                    self.autosave()
+                    if self.coop_client:
+                        self.send_clock()
+                self.dragging_hand = None
+        elif event.type == pygame.MOUSEMOTION:
+            if self.dragging_hand:
+                self.update_hand_angle(event.pos)
+    
+    def toggle_profiler(self):
+        if self.profiler.running:
+            self.profiler.stop(wait=False)
+            self.notification_text = f"Profiler berhenti, profil disimpan di {PROFILE_DIR}/"
+        else:
+            self.profiler.start()
+            self.notification_text = "Profiler aktif (F9 untuk berhenti)"
+        self.notification_timer = 0
+    
+    def perform_action(self):
+        if self.clock_ui_active or self.watering or self.picking or self.cutting or self.flower_watering or self.mushroom_cutting:
+            return None
+        
+        if self.is_near_bush():
+            action = 'pick_fruit'
+            self.check_picking_action()
+        elif self.is_near_trunk():
+            action = 'cut_trunk'
+            self.check_cutting_action()
+        elif self.is_near_mushroom():
+            action = 'remove_mushroom'
+            self.check_mushroom_cutting_action()
+        elif self.is_near_flower():
+            action = 'water_flower'
+            self.check_flower_watering_action()
+        else:
+            action = 'water_tree'
+            self.check_watering_action()
+        self.telemetry.emit('action_attempt', action=action, hour=self.get_clock_hour(),
+                            x=round(self.player['x']), y=round(self.player['y']))
+        return action
     
     def handle_mouse_click(self, pos):
         if self.all_missions_completed() and self.play_again_button_rect.collidepoint(pos):
+            if self.coop_client:
+                self.coop_client.send_reset()
             self.reset_game()
             return
         
@@ -613,10 +933,17 @@ class Game:
                     self.dragging_hand = 'hour'
                 elif minute_diff < 20:
                     self.dragging_hand = 'minute'
+                self.clock_drag_start = time.perf_counter()
     
+    @derived('missions')
     def all_missions_completed(self):
         return all(mission['completed'] for mission in self.missions)
     
+    @derived('missions')
+    def completed_count(self):
+        return sum(1 for m in self.missions if m['completed'])
+    
+    @derived('missions')
     def get_current_mission(self):
         for mission in self.missions:
             if not mission['completed']:
@@ -629,6 +956,16 @@ class Game:
             return False
         return mission_title_keyword.lower() in current['title'].lower()
     
+    def complete_mission(self, mission):
+        mission['completed'] = True
+        self.derived_state.bump('missions')
+        self.notification_text = f"MISI SELESAI: {mission['title']}!"
+        self.notification_timer = 0
+        self.telemetry.emit('mission_complete', f"Misi selesai: {mission['title']}!",
+                            mission=mission['id'], required_hour=mission['required_hour'],
+                            title=mission['title'],
+                            completed=self.completed_count())
+    
     def reset_game(self):
         self.player['x'] = 240
         self.player['y'] = 160
@@ -642,17 +979,10 @@ class Game:
         self.minute_angle = 0
         self.clock_ui_active = False
         
-        for bush in self.bushes:
-            bush['picked'] = False
-        
-        for trunk in self.trunks:
-            trunk['cut'] = False
-        
-        for flower in self.flowers:
-            flower['watered'] = False
-        
-        for mushroom in self.mushrooms:
-            mushroom['removed'] = False
+        self.scene_manager.reset_entities()
+        self.gardens.clear()
+        self.enter_scene(HOME_SCENE)
+        self.particles.clear()
         
         self.fruits_picked = 0
         self.trunks_cut = 0
@@ -670,12 +1000,90 @@ class Game:
         random.shuffle(self.missions)
         for i, mission in enumerate(self.missions, 1):
             mission['id'] = i
+        self.derived_state.bump('player', 'missions')
         
         self.notification_text = ""
         self.notification_timer = 0
         
-        print("\n=== Game Restarted ===")
-        print("Missions randomized!")
+        self.autosave()
+        self.telemetry.emit('game_reset', "\n=== Game Restarted ===\nMissions randomized!")
+    
+    def snapshot_state(self, scenes=None):
+        state = {
+            'player': self.player,
+            'scene': self.scene_name,
+            'hour_angle': self.hour_angle,
+            'minute_angle': self.minute_angle,
+            'missions': [(m['required_hour'], m['completed']) for m in self.missions],
+            'fruits_picked': self.fruits_picked,
+            'trunks_cut': self.trunks_cut,
+            'flowers_watered': self.flowers_watered,
+            'mushrooms_removed': self.mushrooms_removed,
+            'scenes': {},
+        }
+        for name, entities in self.scene_manager.generated():
+            if scenes is not None and name not in scenes:
+                continue
+            scene = {group: [entity[flag] for entity in entities[group]] for group, flag in savegame.ENTITY_GROUPS}
+            scene['stages'] = [flower.get('stage', BLOOM) for flower in entities['flowers']]
+            state['scenes'][name] = scene
+        return state
+    
+    def restore_state(self, state):
+        self.player['x'] = state['player']['x']
+        self.player['y'] = state['player']['y']
+        self.player['direction'] = state['player']['direction']
+        self.derived_state.bump('player')
+        self.restore_world(state)
+        for garden in self.gardens.values():
+            garden.sync(self.garden_hours)
+    
+    def restore_world(self, state):
+        self.hour_angle = state['hour_angle']
+        self.minute_angle = state['minute_angle']
+        
+        for name in savegame.COUNTERS:
+            setattr(self, name, state[name])
+        
+        for name, scene in state['scenes'].items():
+            name = HOME_SCENE if name is None else name
+            if name not in self.scene_manager.scenes:
+                continue
+            entities = self.scene_manager.entities(name)
+            for group, flag in savegame.ENTITY_GROUPS:
+                if len(scene[group]) == len(entities[group]):
+                    for entity, value in zip(entities[group], scene[group]):
+                        entity[flag] = value
+            if len(scene.get('stages', ())) == len(entities['flowers']):
+                for flower, stage in zip(entities['flowers'], scene['stages']):
+                    flower['stage'] = stage
+        
+        if state['scene'] in self.scene_manager.scenes and state['scene'] != self.scene_name:
+            self.enter_scene(state['scene'])
+        
+        by_hour = {m['required_hour']: m for m in self.missions}
+        saved_hours = [hour for hour, _ in state['missions']]
+        if sorted(saved_hours) == sorted(by_hour):
+            self.missions = [by_hour[hour] for hour in saved_hours]
+            for i, (mission, (_, completed)) in enumerate(zip(self.missions, state['missions']), 1):
+                mission['id'] = i
+                mission['completed'] = completed
+        self.derived_state.bump('entities', 'missions')
+    
+    def autosave(self):
+        if self.autosaver:
+            self.autosaver.save(savegame.pack_snapshot(self.snapshot_state()))
+    
+    def load_snapshot(self):
+        if not SAVE_FILE or not os.path.exists(SAVE_FILE):
+            return
+        try:
+            state = savegame.read_snapshot(SAVE_FILE)
+        except (OSError, savegame.SnapshotError) as e:
+            print(f"Could not load save file {SAVE_FILE}: {e}")
+            return
+        print(f"Restoring progress from {SAVE_FILE}...")
+        self.restore_state(state)
     
     def angle_difference(self, a1, a2):
         diff = a1 - a2
@@ -704,15 +1112,20 @@ class Game:
             angle_diff = 360 - angle_diff
         return angle_diff <= 15
     
+    def get_clock_hour(self):
+        hour = round(self.hour_angle / 30) % 12
+        return 12 if hour == 0 else hour
+    
     def is_minute_at_12(self):
         angle_diff = min(abs(self.minute_angle - 0), abs(self.minute_angle - 360))
         return angle_diff <= 15
     
+    @derived('player', 'entities')
     def is_near_tree(self):
         player_x = self.player['x']
         player_y = self.player['y']
         
-        for tree in self.trees:
+        for tree in self.entity_index.near('trees', player_x, player_y, 70):
             dx = tree['x'] - player_x
             dy = tree['y'] - player_y
             distance = math.sqrt(dx**2 + dy**2)
@@ -721,11 +1134,12 @@ class Game:
                 return True
         return False
     
+    @derived('player', 'entities')
     def is_near_bush(self):
         player_x = self.player['x']
         player_y = self.player['y']
         
-        for bush in self.bushes:
+        for bush in self.entity_index.near('bushes', player_x, player_y, 50):
             if not bush['picked']:
                 dx = bush['x'] - player_x
                 dy = bush['y'] - player_y
@@ -735,11 +1149,12 @@ class Game:
                     return True
         return False
     
+    @derived('player', 'entities')
     def is_near_trunk(self):
         player_x = self.player['x']
         player_y = self.player['y']
         
-        for trunk in self.trunks:
+        for trunk in self.entity_index.near('trunks', player_x, player_y, 50):
             if not trunk['cut']:
                 dx = trunk['x'] - player_x
                 dy = trunk['y'] - player_y
@@ -749,11 +1164,12 @@ class Game:
                     return True
         return False
     
+    @derived('player', 'entities')
     def is_near_flower(self):
         player_x = self.player['x']
         player_y = self.player['y']
         
-        for flower in self.flowers:
+        for flower in self.entity_index.near('flowers', player_x, player_y, 40):
             if not flower['watered']:
                 dx = flower['x'] - player_x
                 dy = flower['y'] - player_y
@@ -763,11 +1179,12 @@ class Game:
                     return True
         return False
     
+    @derived('player', 'entities')
     def is_near_mushroom(self):
         player_x = self.player['x']
         player_y = self.player['y']
         
-        for mushroom in self.mushrooms:
+        for mushroom in self.entity_index.near('mushrooms', player_x, player_y, 40):
             if not mushroom['removed']:
                 dx = mushroom['x'] - player_x
                 dy = mushroom['y'] - player_y
@@ -784,7 +1201,7 @@ class Game:
         player_top = new_y
         player_bottom = new_y + player_size
         
-        for trunk in self.trunks:
+        for trunk in self.entity_index.query('trunks', new_x - 25, new_y - 25, player_right, player_bottom):
             if not trunk['cut']:
                 trunk_size = 25
                 trunk_left = trunk['x']
@@ -799,7 +1216,7 @@ class Game:
     
     def check_watering_action(self):
         if not self.can_do_mission_type('pohon'):
-            print("Ini bukan misi yang aktif sekarang!")
+            self.telemetry.emit('wrong_mission', "Ini bukan misi yang aktif sekarang!", action='water_tree')
             return
         
         mission = self.get_current_mission()
@@ -807,16 +1224,19 @@ class Game:
             return
         
         if not self.is_clock_set_to_hour(mission['required_hour']):
-            print(f"Set jam ke {mission['required_hour']:02d}:00 terlebih dahulu!")
+            self.telemetry.emit('wrong_hour', f"Set jam ke {mission['required_hour']:02d}:00 terlebih dahulu!",
+                                action='water_tree', hour=self.get_clock_hour(),
+                                required_hour=mission['required_hour'])
             return
         if not self.is_minute_at_12():
-            print("Set jarum menit ke angka 12 terlebih dahulu!")
+            self.telemetry.emit('wrong_minute', "Set jarum menit ke angka 12 terlebih dahulu!",
+                                action='water_tree', minute_angle=round(self.minute_angle, 1))
             return
         
         player_x = self.player['x']
         player_y = self.player['y']
         
-        for tree in self.trees:
+        for tree in self.entity_index.near('trees', player_x, player_y, 70):
             dx = tree['x'] - player_x
             dy = tree['y'] - player_y
             distance = math.sqrt(dx**2 + dy**2)
@@ -834,16 +1254,14 @@ class Game:
                     self.watering_sound.play()
                 
                 if not mission['completed']:
-                    mission['completed'] = True
-                    self.notification_text = f"MISI SELESAI: {mission['title']}!"
-                    self.notification_timer = 0
-                    print(f"Misi selesai: {mission['title']}!")
+                    self.complete_mission(mission)
                 
+                self.autosave()
                 return
     
     def check_picking_action(self):
         if not self.can_do_mission_type('buah'):
-            print("Ini bukan misi yang aktif sekarang!")
+            self.telemetry.emit('wrong_mission', "Ini bukan misi yang aktif sekarang!", action='pick_fruit')
             return
         
         mission = self.get_current_mission()
@@ -851,16 +1269,19 @@ class Game:
             return
         
         if not self.is_clock_set_to_hour(mission['required_hour']):
-            print(f"Set jam ke {mission['required_hour']:02d}:00 terlebih dahulu!")
+            self.telemetry.emit('wrong_hour', f"Set jam ke {mission['required_hour']:02d}:00 terlebih dahulu!",
+                                action='pick_fruit', hour=self.get_clock_hour(),
+                                required_hour=mission['required_hour'])
             return
         if not self.is_minute_at_12():
-            print("Set jarum menit ke angka 12 terlebih dahulu!")
+            self.telemetry.emit('wrong_minute', "Set jarum menit ke angka 12 terlebih dahulu!",
+                                action='pick_fruit', minute_angle=round(self.minute_angle, 1))
             return
         
         player_x = self.player['x']
         player_y = self.player['y']
         
-        for bush in self.bushes:
+        for bush in self.entity_index.near('bushes', player_x, player_y, 50):
             if not bush['picked']:
                 dx = bush['x'] - player_x
                 dy = bush['y'] - player_y
@@ -868,22 +1289,22 @@ class Game:
                 
                 if distance < 50:
                     bush['picked'] = True
+                    self.gardens[self.scene_name].pick(bush, self.garden_hours)
+                    self.derived_state.bump('entities')
                     self.picking = True
                     self.picking_timer = 0
                     self.fruits_picked += 1
                     
                     if self.fruits_picked >= 3:
                         if not mission['completed']:
-                            mission['completed'] = True
-                            self.notification_text = f"MISI SELESAI: {mission['title']}!"
-                            self.notification_timer = 0
-                            print(f"Misi selesai: {mission['title']}!")
+                            self.complete_mission(mission)
                     
+                    self.autosave()
                     return
     
     def check_cutting_action(self):
         if not self.can_do_mission_type('kayu'):
-            print("Ini bukan misi yang aktif sekarang!")
+            self.telemetry.emit('wrong_mission', "Ini bukan misi yang aktif sekarang!", action='cut_trunk')
             return
         
         mission = self.get_current_mission()
@@ -891,16 +1312,19 @@ class Game:
             return
         
         if not self.is_clock_set_to_hour(mission['required_hour']):
-            print(f"Set jam ke {mission['required_hour']:02d}:00 terlebih dahulu!")
+            self.telemetry.emit('wrong_hour', f"Set jam ke {mission['required_hour']:02d}:00 terlebih dahulu!",
+                                action='cut_trunk', hour=self.get_clock_hour(),
+                                required_hour=mission['required_hour'])
             return
         if not self.is_minute_at_12():
-            print("Set jarum menit ke angka 12 terlebih dahulu!")
+            self.telemetry.emit('wrong_minute', "Set jarum menit ke angka 12 terlebih dahulu!",
+                                action='cut_trunk', minute_angle=round(self.minute_angle, 1))
             return
         
         player_x = self.player['x']
         player_y = self.player['y']
         
-        for trunk in self.trunks:
+        for trunk in self.entity_index.near('trunks', player_x, player_y, 50):
             if not trunk['cut']:
                 dx = trunk['x'] - player_x
                 dy = trunk['y'] - player_y
@@ -919,6 +1343,8 @@ class Game:
                             self.cutting_side = 'front'
                     
                     trunk['cut'] = True
+                    self.derived_state.bump('entities')
+                    self.particles.emit('wood', trunk['x'] + 12, trunk['y'] + 12, 40)
                     
                     if self.cut_sound:
                         self.cut_sound.play()
@@ -929,16 +1355,15 @@ class Game:
                     
                     if self.trunks_cut >= 2:
                         if not mission['completed']:
-                            mission['completed'] = True
-                            self.notification_text = f"MISI SELESAI: {mission['title']}!"
-                            self.notification_timer = 0
-                            print(f"Misi selesai: {mission['title']}!")
+                            self.complete_mission(mission)
                     
+                    self.autosave()
                     return
     
     def check_flower_watering_action(self):
         if not self.can_do_mission_type('bunga'):
-            print("Ini bukan misi yang aktif sekarang!")
+            if not self.revive_flower():
+                self.telemetry.emit('wrong_mission', "Ini bukan misi yang aktif sekarang!", action='water_flower')
             return
         
         mission = self.get_current_mission()
@@ -946,13 +1371,15 @@ class Game:
             return
         
         if not self.is_clock_set_to_hour(mission['required_hour']):
-            print(f"Set jam ke {mission['required_hour']:02d}:00 terlebih dahulu!")
+            self.telemetry.emit('wrong_hour', f"Set jam ke {mission['required_hour']:02d}:00 terlebih dahulu!",
+                                action='water_flower', hour=self.get_clock_hour(),
+                                required_hour=mission['required_hour'])
             return
         
         player_x = self.player['x']
         player_y = self.player['y']
         
-        for flower in self.flowers:
+        for flower in self.entity_index.near('flowers', player_x, player_y, 40):
             if not flower['watered']:
                 dx = flower['x'] - player_x
                 dy = flower['y'] - player_y
@@ -965,6 +1392,8 @@ class Game:
                         self.flower_watering_side = 'right'
                     
                     flower['watered'] = True
+                    self.gardens[self.scene_name].water(flower, self.garden_hours)
+                    self.derived_state.bump('entities')
                     
                     if self.watering_sound:
                         self.watering_sound.play()
@@ -975,16 +1404,32 @@ class Game:
                     
                     if self.flowers_watered >= 1:
                         if not mission['completed']:
-                            mission['completed'] = True
-                            self.notification_text = f"MISI SELESAI: {mission['title']}!"
-                            self.notification_timer = 0
-                            print(f"Misi selesai: {mission['title']}!")
+                            self.complete_mission(mission)
                     
+                    self.autosave()
                     return
     
+    def revive_flower(self):
+        player_x = self.player['x']
+        player_y = self.player['y']
+        
+        for flower in self.entity_index.near('flowers', player_x, player_y, 40):
+            if flower['stage'] == WILTED and math.hypot(flower['x'] - player_x, flower['y'] - player_y) < 40:
+                self.flower_watering_side = 'left' if flower['x'] < player_x else 'right'
+                self.gardens[self.scene_name].water(flower, self.garden_hours)
+                self.derived_state.bump('entities')
+                
+                if self.watering_sound:
+                    self.watering_sound.play()
+                
+                self.flower_watering = True
+                self.flower_watering_timer = 0
+                return True
+        return False
+    
     def check_mushroom_cutting_action(self):
         if not self.can_do_mission_type('jamur'):
-            print("Ini bukan misi yang aktif sekarang!")
+            self.telemetry.emit('wrong_mission', "Ini bukan misi yang aktif sekarang!", action='remove_mushroom')
             return
         
         mission = self.get_current_mission()
@@ -992,13 +1437,15 @@ class Game:
             return
         
         if not self.is_clock_set_to_hour(mission['required_hour']):
-            print(f"Set jam ke {mission['required_hour']:02d}:00 terlebih dahulu!")
+            self.telemetry.emit('wrong_hour', f"Set jam ke {mission['required_hour']:02d}:00 terlebih dahulu!",
+                                action='remove_mushroom', hour=self.get_clock_hour(),
+                                required_hour=mission['required_hour'])
             return
         
         player_x = self.player['x']
         player_y = self.player['y']
         
-        for mushroom in self.mushrooms:
+        for mushroom in self.entity_index.near('mushrooms', player_x, player_y, 40):
             if not mushroom['removed']:
                 dx = mushroom['x'] - player_x
                 dy = mushroom['y'] - player_y
@@ -1017,6 +1464,8 @@ class Game:
                             self.mushroom_cutting_side = 'front'
                     
                     mushroom['removed'] = True
+                    self.derived_state.bump('entities')
+                    self.particles.emit('spore', mushroom['x'] + 8, mushroom['y'] + 6, 30)
                     
                     if self.cut_sound:
                         self.cut_sound.play()
@@ -1025,28 +1474,32 @@ class Game:
                     self.mushroom_cutting_timer = 0
                     self.mushrooms_removed += 1
                     
-                    if self.mushrooms_removed >= len(self.mushrooms):
+                    if all(m['removed'] for m in self.scene_manager.entities(HOME_SCENE)['mushrooms']):
                         if not mission['completed']:
-                            mission['completed'] = True
-                            self.notification_text = f"MISI SELESAI: {mission['title']}!"
-                            self.notification_timer = 0
-                            print(f"Misi selesai: {mission['title']}!")
+                            self.complete_mission(mission)
                     
+                    self.autosave()
                     return
     
     def update(self, dt):
         if self.notification_timer < self.notification_duration:
             self.notification_timer += dt
         
+        if not self.clock_ui_active:
+            self.animation_dt += dt
+            if self.animation_dt >= self.animation_interval:
+                self.animation_clock.advance(self.animation_dt)
+                self.animation_dt = 0.0
+        self.particles.update(dt)
+        
+        if self.watering or self.flower_watering:
+            self.emit_water(dt)
+        
         if self.mushroom_cutting:
             self.mushroom_cutting_timer += dt
             if self.mushroom_cutting_timer >= self.mushroom_cutting_duration:
                 self.mushroom_cutting = False
                 self.mushroom_cutting_timer = 0
-            self.player['animation_timer'] += dt
-            if self.player['animation_timer'] >= self.animation_speed:
-                self.player['animation_timer'] = 0
-                self.player['animation_frame'] = (self.player['animation_frame'] + 1) % 2
             return
         
         if self.flower_watering:
@@ -1054,10 +1507,6 @@ class Game:
             if self.flower_watering_timer >= self.flower_watering_duration:
                 self.flower_watering = False
                 self.flower_watering_timer = 0
-            self.player['animation_timer'] += dt
-            if self.player['animation_timer'] >= self.animation_speed:
-                self.player['animation_timer'] = 0
-                self.player['animation_frame'] = (self.player['animation_frame'] + 1) % 2
             return
         
         if self.picking:
@@ -1071,10 +1520,6 @@ class Game:
             if self.cutting_timer >= self.cutting_duration:
                 self.cutting = False
                 self.cutting_timer = 0
-            self.player['animation_timer'] += dt
-            if self.player['animation_timer'] >= self.animation_speed:
-                self.player['animation_timer'] = 0
-                self.player['animation_frame'] = (self.player['animation_frame'] + 1) % 2
             return
         
         if self.watering:
@@ -1082,305 +1527,779 @@ class Game:
             if self.watering_timer >= self.watering_duration:
                 self.watering = False
                 self.watering_timer = 0
-            self.player['animation_timer'] += dt
-            if self.player['animation_timer'] >= self.animation_speed:
-                self.player['animation_timer'] = 0
-                self.player['animation_frame'] = (self.player['animation_frame'] + 1) % 2
             return
         
         if not self.clock_ui_active:
-            keys = pygame.key.get_pressed()
-            moving = False
-            dx, dy = 0, 0
-            
-            if keys[pygame.K_RIGHT] or keys[pygame.K_d]:
-                dx = self.player['speed'] * dt
-                self.player['direction'] = 'right'
-                moving = True
-            elif keys[pygame.K_LEFT] or keys[pygame.K_a]:
-                dx = -self.player['speed'] * dt
-                self.player['direction'] = 'left'
-                moving = True
+            dir_x, dir_y = self.read_movement()
+            if self.coop_client:
+                dt = self.record_input(dir_x, dir_y, dt)
             
-            if keys[pygame.K_DOWN] or keys[pygame.K_s]:
-                dy = self.player['speed'] * dt
-                self.player['direction'] = 'down'
-                moving = True
-            elif keys[pygame.K_UP] or keys[pygame.K_w]:
-                dy = -self.player['speed'] * dt
-                self.player['direction'] = 'up'
-                moving = True
-            
-            if moving:
-                new_x = self.player['x'] + dx
-                new_y = self.player['y'] + dy
-                
-                if not self.check_trunk_collision(new_x, new_y):
-                    self.player['x'] = new_x
-                    self.player['y'] = new_y
-                    self.player['state'] = 'walking'
-                else:
-                    if dx != 0 and not self.check_trunk_collision(self.player['x'] + dx, self.player['y']):
-                        self.player['x'] += dx
-                        self.player['state'] = 'walking'
-                    elif dy != 0 and not self.check_trunk_collision(self.player['x'], self.player['y'] + dy):
-                        self.player['y'] += dy
-                        self.player['state'] = 'walking'
-                    else:
-                        self.player['state'] = 'idle'
-            else:
-                self.player['state'] = 'idle'
+            dx, dy, moving = self.move_actor(self.player, dir_x, dir_y, dt)
             
-            self.player['x'] = max(0, min(self.player['x'], 
-                                         self.map_width - self.player['width']))
-            self.player['y'] = max(0, min(self.player['y'], 
-                                         self.map_height - self.player['height']))
+            if moving and not self.coop_client:
+                self.check_scene_exit(dx, dy)
             
-            self.player['animation_timer'] += dt
-            if self.player['animation_timer'] >= self.animation_speed:
-                self.player['animation_timer'] = 0
-                self.player['animation_frame'] = (self.player['animation_frame'] + 1) % 2
             
-            self.camera_x = self.player['x'] - (SCREEN_WIDTH // (2 * SCALE)) + self.player['width'] // 2
-            self.camera_y = self.player['y'] - (SCREEN_HEIGHT // (2 * SCALE)) + self.player['height'] // 2
+            self.update_camera()
+    
+    def step(self, dt):
+        self.update(dt)
+        self.update_npcs(dt)
+        if not self.coop_client:
+            self.update_gardens(dt)
+        if self.coop_host or self.coop_client:
+            self.update_coop(dt)
+    
+    def scene_garden(self, name, entities):
+        if name not in self.gardens:
+            self.gardens[name] = Garden(entities['flowers'], entities['bushes'], self.garden_hours,
+                                        GARDEN_WILT_HOURS, GARDEN_GROW_HOURS, GARDEN_REGROW_HOURS)
+        return self.gardens[name]
+    
+    def update_gardens(self, dt):
+        self.garden_dt += dt
+        if self.garden_dt < GARDEN_TICK:
+            return
+        hours = self.garden_dt * GARDEN_HOURS_PER_SECOND
+        self.garden_hours += hours
+        self.garden_dt = 0.0
+        if sum(garden.advance(self.garden_hours, hours) for garden in self.gardens.values()):
+            self.derived_state.bump('entities')
+    
+    def scene_npcs(self, name):
+        if name not in self.npc_schedulers:
+            rng = random.Random(f'{WORLD_SEED}:{name}')
+            blocked = None
+            if self.terrain:
+                world = self.terrain.world
+                blocked = lambda x, y: world.tile_at(x, y) == worldgen.WATER
+            tiles = (self.map_width // TILE_SIZE) * (self.map_height // TILE_SIZE)
+            cats = npcs.spawn(rng, round(tiles * NPC_DENSITY / 1000), self.map_width, self.map_height, blocked)
+            bounds = (self.map_width, self.map_height)
+            self.npc_schedulers[name] = npcs.LODScheduler(
+                cats, lambda npc, dt: npcs.wander(npc, dt, rng, bounds, blocked))
+        return self.npc_schedulers[name]
+    
+    def update_npcs(self, dt):
+        target = self.world_buffer if self.world_buffer is not None else self.screen
+        self.npc_scheduler.update(dt, self.camera_x, self.camera_y,
+                                  target.get_width() / self.asset_scale, target.get_height() / self.asset_scale)
+    
+    def npc_animation_frames(self):
+        if self.npc_frames_base is not self.animations.frames:
+            self.npc_frames = npcs.tinted_frames(self.animations.frames)
+            self.npc_frames_base = self.animations.frames
+        return self.npc_frames
+    
+    def flower_stage_sprites(self):
+        if self.flower_variants_base is not self.flower_sprite:
+            self.flower_variants = stage_sprites(self.flower_sprite)
+            self.flower_variants_base = self.flower_sprite
+        return self.flower_variants
+    
+    def read_movement(self):
+        keys = pygame.key.get_pressed()
+        dir_x, dir_y = 0, 0
+        
+        if self.actions.held(keys, 'move_right'):
+            dir_x = 1
+        elif self.actions.held(keys, 'move_left'):
+            dir_x = -1
+        
+        if self.actions.held(keys, 'move_down'):
+            dir_y = 1
+        elif self.actions.held(keys, 'move_up'):
+            dir_y = -1
+        return dir_x, dir_y
+    
+    def move_actor(self, actor, dir_x, dir_y, dt):
+        dx = dir_x * actor['speed'] * dt
+        dy = dir_y * actor['speed'] * dt
+        moving = dir_x != 0 or dir_y != 0
+        start_x, start_y = actor['x'], actor['y']
+        
+        if dir_x:
+            actor['direction'] = 'right' if dir_x > 0 else 'left'
+        if dir_y:
+            actor['direction'] = 'down' if dir_y > 0 else 'up'
+        
+        if moving:
+            new_x = actor['x'] + dx
+            new_y = actor['y'] + dy
             
-            self.camera_x = max(0, min(self.camera_x, self.map_width - SCREEN_WIDTH // SCALE))
-            self.camera_y = max(0, min(self.camera_y, self.map_height - SCREEN_HEIGHT // SCALE))
+            if not self.check_trunk_collision(new_x, new_y):
+                actor['x'] = new_x
+                actor['y'] = new_y
+                actor['state'] = 'walking'
+            else:
+                if dx != 0 and not self.check_trunk_collision(actor['x'] + dx, actor['y']):
+                    actor['x'] += dx
+                    actor['state'] = 'walking'
+                elif dy != 0 and not self.check_trunk_collision(actor['x'], actor['y'] + dy):
+                    actor['y'] += dy
+                    actor['state'] = 'walking'
+                else:
+                    actor['state'] = 'idle'
+        else:
+            actor['state'] = 'idle'
+        
+        actor['x'] = max(0, min(actor['x'], self.map_width - actor['width']))
+        actor['y'] = max(0, min(actor['y'], self.map_height - actor['height']))
+        if actor is self.player and (actor['x'], actor['y']) != (start_x, start_y):
+            self.derived_state.bump('player')
+        return dx, dy, moving
     
-    def draw(self):
-        self.screen.fill(BLACK)
+    def record_input(self, dir_x, dir_y, dt):
+        self.input_seq += 1
+        entry = (self.input_seq, dir_x, dir_y, round(min(dt, self.coop_tick) * 1000))
+        self.pending_inputs.append(entry)
+        self.outgoing_inputs.append(entry)
+        return entry[3] / 1000.0
+    
+    def send_clock(self):
+        self.coop_client.send_clock(self.hour_angle, self.minute_angle)
+        self.pending_clock = (self.hour_angle, self.minute_angle, time.perf_counter() + 1.0)
+    
+    def update_coop(self, dt):
+        if self.coop_host:
+            self.process_coop_messages()
+        elif self.coop_client:
+            world = self.coop_client.poll()
+            if world is not None:
+                self.apply_coop_world(world)
+            if not self.coop_client.connected:
+                self.coop_client.close()
+                self.coop_client = None
+                self.remote_players.clear()
+                self.notification_text = "Koneksi ke host terputus"
+                self.notification_timer = 0
+                return
         
-        map_x = -self.camera_x * SCALE
-        map_y = -self.camera_y * SCALE
-        self.screen.blit(self.map_surface, (map_x, map_y))
+        smoothing = min(1.0, dt * 15)
+        for avatar in self.remote_players.values():
+            avatar['draw_x'] += (avatar['x'] - avatar['draw_x']) * smoothing
+            avatar['draw_y'] += (avatar['y'] - avatar['draw_y']) * smoothing
         
-        state = self.player['state']
-        direction = self.player['direction']
-        frame = self.player['animation_frame'] + 1
+        self.coop_accumulator += dt
+        if self.coop_accumulator < self.coop_tick:
+            return
+        self.coop_accumulator = min(self.coop_accumulator - self.coop_tick, self.coop_tick)
+        
+        if self.coop_host:
+            players = dict(self.remote_players)
+            players[coop.HOST_ID] = self.player
+            world = savegame.pack_snapshot(self.snapshot_state([self.scene_name]))
+            self.coop_host.publish(world + coop.pack_players(players))
+        else:
+            self.coop_client.send_inputs(self.outgoing_inputs)
+            self.outgoing_inputs = []
+            if self.dragging_hand:
+                self.send_clock()
+    
+    def process_coop_messages(self):
+        for player_id, kind, payload in self.coop_host.poll():
+            if kind == coop.MSG_HELLO:
+                self.remote_players[player_id] = {
+                    'x': self.player['x'], 'y': self.player['y'],
+                    'draw_x': self.player['x'], 'draw_y': self.player['y'],
+                    'speed': self.player['speed'], 'width': self.player['width'],
+                    'height': self.player['height'], 'direction': 'down', 'state': 'idle', 'last_seq': 0,
+                }
+                self.telemetry.emit('coop_join', f"Pemain {player_id} bergabung!", player=player_id)
+                continue
+            if kind == coop.MSG_LEAVE:
+                if self.remote_players.pop(player_id, None):
+                    self.telemetry.emit('coop_leave', f"Pemain {player_id} keluar", player=player_id)
+                continue
+            
+            actor = self.remote_players.get(player_id)
+            if actor is None:
+                continue
+            if kind == coop.MSG_INPUT:
+                for seq, dir_x, dir_y, dt_ms in coop.INPUT.iter_unpack(payload):
+                    self.move_actor(actor, dir_x, dir_y, min(dt_ms / 1000.0, self.coop_tick))
+                    actor['last_seq'] = seq
+            elif kind == coop.MSG_ACTION:
+                self.perform_remote_action(actor)
+            elif kind == coop.MSG_CLOCK:
+                self.hour_angle, self.minute_angle = coop.CLOCK.unpack(payload)
+            elif kind == coop.MSG_RESET:
+                if self.all_missions_completed():
+                    self.reset_game()
+    
+    def perform_remote_action(self, actor):
+        saved = {name: getattr(self, name) for name in ACTION_STATE}
+        local_player = self.player
+        for name in ('clock_ui_active', 'watering', 'picking', 'cutting', 'flower_watering', 'mushroom_cutting'):
+            setattr(self, name, False)
+        self.player = actor
+        self.derived_state.bump('player')
+        try:
+            self.perform_action()
+        finally:
+            self.player = local_player
+            self.derived_state.bump('player')
+            for name, value in saved.items():
+                setattr(self, name, value)
+    
+    def apply_coop_world(self, world):
+        snapshot, offset = coop.split_world(world)
+        state = savegame.unpack_snapshot(snapshot)
+        players = coop.unpack_players(world, offset)
+        
+        completed = {m['required_hour'] for m in self.missions if m['completed']}
+        local_clock = (self.hour_angle, self.minute_angle)
+        self.restore_world(state)
+        
+        if self.pending_clock:
+            hour_angle, minute_angle, deadline = self.pending_clock
+            if (abs(self.hour_angle - hour_angle) < 0.01 and abs(self.minute_angle - minute_angle) < 0.01
+                    or time.perf_counter() > deadline):
+                self.pending_clock = None
+        if self.dragging_hand or self.pending_clock:
+            self.hour_angle, self.minute_angle = local_clock
         
-        dir_map = {'down': 'front', 'up': 'back', 'left': 'left', 'right': 'right'}
-        sprite_dir = dir_map.get(direction, 'front')
+        for mission in self.missions:
+            if mission['completed'] and mission['required_hour'] not in completed:
+                self.notification_text = f"MISI SELESAI: {mission['title']}!"
+                self.notification_timer = 0
+        
+        own = players.pop(self.coop_client.player_id, None)
+        if own is not None:
+            self.pending_inputs = [entry for entry in self.pending_inputs if entry[0] > own['last_seq']]
+            self.player['x'] = own['x']
+            self.player['y'] = own['y']
+            for seq, dir_x, dir_y, dt_ms in self.pending_inputs:
+                self.move_actor(self.player, dir_x, dir_y, dt_ms / 1000.0)
+            self.derived_state.bump('player')
+        
+        for player_id in list(self.remote_players):
+            if player_id not in players:
+                del self.remote_players[player_id]
+        for player_id, player in players.items():
+            avatar = self.remote_players.setdefault(player_id, {'draw_x': player['x'], 'draw_y': player['y']})
+            avatar.update(player)
+    
+    def emit_water(self, dt):
+        side = self.watering_side if self.watering else self.flower_watering_side
+        self.water_emit_accumulator += WATER_PARTICLES_PER_SECOND * dt
+        count = int(self.water_emit_accumulator)
+        if count == 0:
+            return
+        self.water_emit_accumulator -= count
         
-        if state == 'idle':
-            sprite_key = f'idle-{sprite_dir}{frame}'
+        if side == 'left':
+            x, angle = self.player['x'] - 2, math.pi - 0.3
         else:
-            sprite_key = f'walk-{sprite_dir}{frame}'
+            x, angle = self.player['x'] + self.player['width'] + 2, 0.3
+        self.particles.emit('water', x, self.player['y'] + 8, count, angle)
+    
+    def update_camera(self):
+        self.camera_x = self.player['x'] - self.view_width // 2 + self.player['width'] // 2
+        self.camera_y = self.player['y'] - self.view_height // 2 + self.player['height'] // 2
         
-        player_screen_x = (self.player['x'] - self.camera_x) * SCALE
-        player_screen_y = (self.player['y'] - self.camera_y) * SCALE
+        self.camera_x = max(0, min(self.camera_x, self.map_width - self.view_width))
+        self.camera_y = max(0, min(self.camera_y, self.map_height - self.view_height))
+    
+    def draw(self):
+        self.render(self.capture_render_state())
+    
+    def capture_render_state(self):
+        ws = self.asset_scale
+        if self.input_time is not None and self.input_time == self.controls.last_presented:
+            self.input_time = None
         
         if self.mushroom_cutting:
-            frame = self.player['animation_frame'] + 1
-            sprite_key = f'cut-{self.mushroom_cutting_side}{frame}'
+            clip = animation.CLIP_CUT
+            direction = animation.ACTION_SIDES[self.mushroom_cutting_side]
         elif self.flower_watering:
-            frame = self.player['animation_frame'] + 1
-            sprite_key = f'watering-{self.flower_watering_side}{frame}'
+            clip = animation.CLIP_WATERING
+            direction = animation.ACTION_SIDES[self.flower_watering_side]
         elif self.watering:
-            frame = self.player['animation_frame'] + 1
-            sprite_key = f'watering-{self.watering_side}{frame}'
+            clip = animation.CLIP_WATERING
+            direction = animation.ACTION_SIDES[self.watering_side]
         elif self.cutting:
-            frame = self.player['animation_frame'] + 1
-            sprite_key = f'cut-{self.cutting_side}{frame}'
+            clip = animation.CLIP_CUT
+            direction = animation.ACTION_SIDES[self.cutting_side]
+        else:
+            clip = animation.CLIP_IDLE if self.player['state'] == 'idle' else animation.CLIP_WALK
+            direction = animation.MOVE_DIRECTIONS.get(self.player['direction'], animation.DIR_FRONT)
+        player_sprite = self.animations.frame(clip, direction, self.animation_clock.frame_index[clip])
+        
+        player_screen_x = (self.player['x'] - self.camera_x) * ws
+        player_screen_y = (self.player['y'] - self.camera_y) * ws
         
         entities = []
         
         entities.append({
             'type': 'player',
             'y': self.player['y'] + 16,
-            'sprite': self.sprites[sprite_key],
+            'sprite': player_sprite,
             'x': player_screen_x,
             'screen_y': player_screen_y
         })
         
-        for tree in self.trees:
+        for avatar in self.remote_players.values():
+            avatar_clip = animation.CLIP_WALK if avatar['state'] == 'walking' else animation.CLIP_IDLE
+            avatar_direction = animation.MOVE_DIRECTIONS.get(avatar['direction'], animation.DIR_FRONT)
+            entities.append({
+                'type': 'player',
+                'y': avatar['draw_y'] + 16,
+                'sprite': self.animations.frame(avatar_clip, avatar_direction,
+                                                self.animation_clock.frame_index[avatar_clip]),
+                'x': (avatar['draw_x'] - self.camera_x) * ws,
+                'screen_y': (avatar['draw_y'] - self.camera_y) * ws
+            })
+        
+        npc_frames = self.npc_animation_frames()
+        for npc in self.npc_scheduler.visible:
+            npc_clip = animation.CLIP_WALK if npc['state'] == 'walking' else animation.CLIP_IDLE
+            npc_direction = animation.MOVE_DIRECTIONS[npc['direction']]
+            entities.append({
+                'type': 'npc',
+                'y': npc['y'] + 16,
+                'sprite': npc_frames[npc['tint']][npc_clip][npc_direction][self.animation_clock.frame_index[npc_clip]],
+                'x': (npc['x'] - self.camera_x) * ws,
+                'screen_y': (npc['y'] - self.camera_y) * ws
+            })
+        
+        target = self.world_buffer if self.world_buffer is not None else self.screen
+        visible_width, visible_height = target.get_width() / ws, target.get_height() / ws
+        visible = (self.camera_x - 64, self.camera_y - 64,
+                   self.camera_x + visible_width, self.camera_y + visible_height)
+        for tree in self.entity_index.query('trees', *visible):
             entities.append({
                 'type': 'tree',
                 'y': tree['y'] + 64,
                 'sprite': self.tree_sprite,
-                'x': (tree['x'] - self.camera_x) * SCALE,
-                'screen_y': (tree['y'] - self.camera_y) * SCALE
+                'x': (tree['x'] - self.camera_x) * ws,
+                'screen_y': (tree['y'] - self.camera_y) * ws
             })
         
-        for trunk in self.trunks:
+        for trunk in self.entity_index.query('trunks', *visible):
             if not trunk['cut']:
                 entities.append({
                     'type': 'trunk',
                     'y': trunk['y'] + 32,
                     'sprite': self.trunk_sprite,
-                    'x': (trunk['x'] - self.camera_x) * SCALE,
-                    'screen_y': (trunk['y'] - self.camera_y) * SCALE
+                    'x': (trunk['x'] - self.camera_x) * ws,
+                    'screen_y': (trunk['y'] - self.camera_y) * ws
                 })
         
-        for bush in self.bushes:
+        for bush in self.entity_index.query('bushes', *visible):
             bush_sprite = self.bush2_sprite if bush['picked'] else self.bush1_sprite
             entities.append({
                 'type': 'bush',
                 'y': bush['y'] + 32,
                 'sprite': bush_sprite,
-                'x': (bush['x'] - self.camera_x) * SCALE,
-                'screen_y': (bush['y'] - self.camera_y) * SCALE
+                'x': (bush['x'] - self.camera_x) * ws,
+                'screen_y': (bush['y'] - self.camera_y) * ws
             })
         
-        for flower in self.flowers:
+        flower_sprites = self.flower_stage_sprites()
+        for flower in self.entity_index.query('flowers', *visible):
             entities.append({
                 'type': 'flower',
                 'y': flower['y'] + 16,
-                'sprite': self.flower_sprite,
-                'x': (flower['x'] - self.camera_x) * SCALE,
-                'screen_y': (flower['y'] - self.camera_y) * SCALE
+                'sprite': flower_sprites[flower['stage']],
+                'x': (flower['x'] - self.camera_x) * ws,
+                'screen_y': (flower['y'] - self.camera_y) * ws
             })
         
-        for mushroom in self.mushrooms:
+        for mushroom in self.entity_index.query('mushrooms', *visible):
             if not mushroom['removed']:
                 entities.append({
                     'type': 'mushroom',
                     'y': mushroom['y'] + 16,
                     'sprite': self.mushroom_sprite,
-                    'x': (mushroom['x'] - self.camera_x) * SCALE,
-                    'screen_y': (mushroom['y'] - self.camera_y) * SCALE
+                    'x': (mushroom['x'] - self.camera_x) * ws,
+                    'screen_y': (mushroom['y'] - self.camera_y) * ws
                 })
         
         entities.sort(key=lambda e: e['y'])
         
-        for entity in entities:
-            self.screen.blit(entity['sprite'], (entity['x'], entity['screen_y']))
+        world_blits = [(entity['sprite'], (entity['x'], entity['screen_y'])) for entity in entities]
         
         if self.picking:
-            fruit_x = player_screen_x + 8
-            fruit_y = player_screen_y - 40
-            self.screen.blit(self.fruit_sprite, (fruit_x, fruit_y))
+            fruit_x = player_screen_x + 4 * ws
+            fruit_y = player_screen_y - 20 * ws
+            world_blits.append((self.fruit_sprite, (fruit_x, fruit_y)))
+        
+        prompt = None
+        if not self.watering and not self.picking and not self.cutting and not self.flower_watering and not self.mushroom_cutting and not self.clock_ui_active:
+            text = self.prompt_text()
+            if text:
+                prompt = self.derived_state.get(('prompt', text), ('display',), self.render_prompt, text)
+        
+        notification = None
+        if self.notification_timer < self.notification_duration and self.notification_text:
+            notification = self.derived_state.get(('notification', self.notification_text), ('display',),
+                                                  self.render_notification, self.notification_text)
+        
+        if self.terrain:
+            map_surface, map_pos = self.terrain.window(self.camera_x, self.camera_y,
+                                                       visible_width, visible_height)
+        else:
+            map_surface, map_pos = self.map_surface, (-self.camera_x * ws, -self.camera_y * ws)
+        
+        minimap_state = None
+        if self.minimap_visible and not self.clock_ui_active:
+            players = [self.minimap.to_minimap(self.player['x'], self.player['y'])]
+            players.extend(self.minimap.to_minimap(avatar['draw_x'], avatar['draw_y'])
+                           for avatar in self.remote_players.values())
+            view_x, view_y = self.minimap.to_minimap(self.camera_x, self.camera_y)
+            view = pygame.Rect(view_x, view_y, max(2, int(visible_width * self.minimap.scale)),
+                               max(2, int(visible_height * self.minimap.scale)))
+            minimap_state = (self.render_minimap(), players, view)
+        
+        return RenderState(
+            map_surface=map_surface,
+            map_pos=map_pos,
+            world_blits=tuple(world_blits),
+            particle_blits=tuple(self.particles.blit_list(self.camera_x, self.camera_y, ws,
+                                                          (self.view_width * ws, self.view_height * ws))),
+            lighting=self.lighting_enabled,
+            hour_angle=self.hour_angle,
+            minute_angle=self.minute_angle,
+            mission_box=self.render_mission_box(),
+            play_again_text=self.render_button_text() if self.all_missions_completed() else None,
+            clock_ui=self.render_clock_overlay() if self.clock_ui_active else None,
+            prompt=prompt,
+            notification=notification,
+            minimap=minimap_state,
+            input_time=self.input_time,
+            world_buffer=self.world_buffer,
+            upscale_target=self.upscale_target,
+        )
+    
+    def render(self, state):
+        world = state.world_buffer if state.world_buffer is not None else self.screen
+        
+        self.screen.fill(BLACK)
+        if world is not self.screen:
+            world.fill(BLACK)
+        
+        world.blit(state.map_surface, state.map_pos)
+        world.blits(state.world_blits, doreturn=False)
+        world.blits(state.particle_blits, doreturn=False)
+        
+        if self.lighting and state.lighting:
+            self.lighting.apply(world, state.hour_angle)
+        
+        if world is not self.screen:
+            pygame.transform.scale(world, state.upscale_target.get_size(), state.upscale_target)
         
         self.screen.blit(self.clock_icon, (10, 10))
         
-        self.draw_mission_box()
+        self.draw_mission_box(state)
         
-        if self.clock_ui_active:
-            self.draw_clock_ui()
+        if state.minimap:
+            self.draw_minimap(state.minimap)
+        
+        if state.clock_ui:
+            self.draw_clock_ui(state)
         
-        self.draw_watering_prompt()
+        if state.prompt:
+            self.screen.blit(state.prompt, state.prompt.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT - 40)))
         
-        self.draw_notification()
+        if state.notification:
+            self.screen.blit(state.notification,
+                             state.notification.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 100)))
         
         pygame.display.flip()
+        self.controls.presented(state.input_time)
+    
+    def set_render_scale(self, scale):
+        if not self.native_render and scale != self.asset_scale:
+            return False
+        self.render_scale = scale
+        self.view_width = SCREEN_WIDTH // scale
+        self.view_height = SCREEN_HEIGHT // scale
+        if self.native_render:
+            self.world_buffer = pygame.Surface((self.view_width, self.view_height)).convert()
+            upscale_rect = pygame.Rect(0, 0, self.view_width * scale, self.view_height * scale)
+            upscale_rect.center = (SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)
+            self.upscale_target = self.screen.subsurface(upscale_rect)
+        self.update_camera()
+        return True
+    
+    def overlay_alpha(self, alpha):
+        return alpha if self.alpha_overlays else None
+    
+    def apply_quality(self, settings):
+        self.set_render_scale(settings['render_scale'])
+        self.alpha_overlays = settings['overlay_alpha']
+        self.lighting_enabled = settings['lighting']
+        self.animation_interval = 1.0 / settings['animation_hz'] if settings['animation_hz'] else 0.0
+        self.target_fps = settings['fps']
+        if self.gc_monitor:
+            self.gc_monitor.budget = 1.0 / self.target_fps
+        self.derived_state.bump('display')
+    
+    def measure_frame(self, settings):
+        self.apply_quality(settings)
+        start = time.perf_counter()
+        self.update(0.0)
+        self.draw()
+        return time.perf_counter() - start
+    
+    def init_quality(self):
+        if QUALITY == 'off':
+            return
+        
+        if QUALITY == 'auto':
+            self.quality_profile = quality.load_profile(QUALITY_PROFILE)
+            if self.quality_profile is None:
+                print("Calibrating graphics quality...")
+                self.quality_profile = quality.calibrate(self.measure_frame)
+                quality.save_profile(QUALITY_PROFILE, self.quality_profile)
+            level = quality.LEVEL_INDEX[self.quality_profile['level']]
+            min_level = quality.LEVEL_INDEX[QUALITY_MIN]
+            max_level = quality.LEVEL_INDEX[QUALITY_MAX]
+        else:
+            level = min_level = max_level = quality.LEVEL_INDEX[QUALITY]
+        
+        self.quality_governor = quality.QualityGovernor(level, min_level=min_level, max_level=max_level)
+        self.apply_quality(self.quality_governor.settings)
+        print(f"Graphics quality: {self.quality_governor.settings['name']}")
+    
+    def record_frame_time(self, frame_time):
+        if not self.quality_governor.record(frame_time):
+            return
+        settings = self.quality_governor.settings
+        if self.simulation:
+            self.simulation.submit(self.apply_quality, settings)
+        else:
+            self.apply_quality(settings)
+        self.telemetry.emit('quality_change', f"Graphics quality: {settings['name']}",
+                            level=settings['name'], frame_ms=round(self.quality_governor.last_p90 * 1000, 2))
+    
+    def send_heartbeat(self):
+        mission = self.get_current_mission()
+        self.heartbeat.send(mission['id'] if mission else 0,
+                            mission['required_hour'] if mission else 0,
+                            self.completed_count(),
+                            self.get_clock_hour(),
+                            time.monotonic() - self.last_input_time)
+    
+    def admin_command(self, request):
+        command = request['cmd']
+        if command == 'ping':
+            return {'ok': True}
+        if command == 'state':
+            return {'ok': True, 'state': self.admin_state()}
+        if command == 'reset':
+            self.reset_game()
+            self.telemetry.emit('admin_reset')
+            return {'ok': True}
+        if command == 'mission':
+            mission_id = request.get('id')
+            if not isinstance(mission_id, int) or not 1 <= mission_id <= len(self.missions):
+                return {'ok': False, 'error': f"mission id must be 1-{len(self.missions)}"}
+            self.jump_to_mission(mission_id)
+            return {'ok': True, 'state': self.admin_state()}
+        if command == 'gc':
+            if not self.gc_monitor:
+                return {'ok': False, 'error': "GC monitoring is off, start with GAME_GC_MONITOR=1"}
+            return {'ok': True, 'gc': self.gc_monitor.report()}
+        if command == 'input':
+            return {'ok': True, 'input': self.controls.report()}
+        if command == 'npcs':
+            return {'ok': True, 'npcs': self.npc_stats()}
+        return {'ok': False, 'error': f"unknown command {command!r}"}
+    
+    def npc_stats(self):
+        stats = self.npc_scheduler.stats()
+        stats['other_scenes_frozen'] = sum(len(scheduler.npcs) for name, scheduler in self.npc_schedulers.items()
+                                           if name != self.scene_name)
+        return stats
     
-    def draw_mission_box(self):
-        current_mission = None
+    def admin_state(self):
+        mission = self.get_current_mission()
+        return {
+            'scene': self.scene_name,
+            'player': {'x': round(self.player['x'], 1), 'y': round(self.player['y'], 1)},
+            'hour': self.get_clock_hour(),
+            'minute_angle': round(self.minute_angle, 1),
+            'current_mission': mission['id'] if mission else None,
+            'completed': self.completed_count(),
+            'missions': [{'id': m['id'], 'title': m['title'], 'completed': m['completed']} for m in self.missions],
+            'idle': round(time.monotonic() - self.last_input_time, 1),
+            'fps': round(self.clock.get_fps(), 1),
+        }
+    
+    def jump_to_mission(self, mission_id):
         for mission in self.missions:
-            if not mission['completed']:
-                current_mission = mission
-                break
+            mission['completed'] = mission['id'] < mission_id
+        self.derived_state.bump('missions')
+        self.notification_text = f"MISI {mission_id}: {self.get_current_mission()['title']}"
+        self.notification_timer = 0
+        self.autosave()
+        self.telemetry.emit('admin_jump', mission=mission_id)
+    
+    def get_frame_capture(self, size=None):
+        if self.frame_capture is None:
+            self.frame_capture = FrameCapture(self.screen, size)
+        else:
+            self.frame_capture.resize(size)
+        return self.frame_capture
+    
+    def frame_view(self, size=None):
+        return self.get_frame_capture(size).view()
+    
+    def capture_frame(self, out=None, size=None):
+        return self.get_frame_capture(size).capture(out)
+    
+    def draw_mission_box(self, state):
+        self.screen.blit(state.mission_box, (150, 10))
+        
+        if state.play_again_text:
+            mouse_pos = self.controls.mouse_pos
+            button_color = (100, 200, 100) if self.play_again_button_rect.collidepoint(mouse_pos) else (50, 150, 50)
+            pygame.draw.rect(self.screen, button_color, self.play_again_button_rect)
+            pygame.draw.rect(self.screen, WHITE, self.play_again_button_rect, 3)
+            
+            button_text_rect = state.play_again_text.get_rect(center=self.play_again_button_rect.center)
+            self.screen.blit(state.play_again_text, button_text_rect)
+    
+    def draw_minimap(self, minimap_state):
+        surface, players, view = minimap_state
+        x = SCREEN_WIDTH - surface.get_width() - 10
+        y = 10
+        self.screen.blit(surface, (x, y))
+        pygame.draw.rect(self.screen, WHITE, (x - 1, y - 1, surface.get_width() + 2, surface.get_height() + 2), 1)
+        pygame.draw.rect(self.screen, WHITE, view.move(x, y), 1)
+        for index, (player_x, player_y) in enumerate(players):
+            pygame.draw.rect(self.screen, RED if index == 0 else BLUE, (x + player_x - 2, y + player_y - 2, 4, 4))
+    
+    @derived('entities', 'missions', 'display')
+    def render_minimap(self):
+        return self.minimap.render(self.mission_targets(), MINIMAP_MARKER_COLOR)
+    
+    def mission_targets(self):
+        mission = self.get_current_mission()
+        if mission is None:
+            return []
+        for keyword, (kind, done_flag) in MISSION_TARGETS.items():
+            if keyword in mission['title'].lower():
+                return [(entity['x'], entity['y']) for entity in getattr(self, kind)
+                        if done_flag is None or not entity[done_flag]]
+        return []
+    
+    @derived()
+    def render_button_text(self):
+        button_font = self.get_font(36)
+        return button_font.render("Main Lagi", True, WHITE)
+    
+    @derived('missions', 'display')
+    def render_mission_box(self):
+        current_mission = self.get_current_mission()
         
         if current_mission is None:
-            mission_bg = pygame.Surface((300, 120))
-            mission_bg.set_alpha(200)
-            mission_bg.fill((40, 40, 60))
-            self.screen.blit(mission_bg, (150, 10))
+            box = pygame.Surface((300, 120), pygame.SRCALPHA)
+            box.fill((40, 40, 60, self.overlay_alpha(200) or 255))
             
-            pygame.draw.rect(self.screen, (0, 255, 0), (150, 10, 300, 120), 2)
+            pygame.draw.rect(box, (0, 255, 0), box.get_rect(), 2)
             
-            font_title = pygame.font.Font(None, 32)
+            font_title = self.get_font(32)
             title_surface = font_title.render("SEMUA MISI SELESAI!", True, (0, 255, 0))
-            title_rect = title_surface.get_rect(center=(300, 50))
-            self.screen.blit(title_surface, title_rect)
+            title_rect = title_surface.get_rect(center=(150, 40))
+            box.blit(title_surface, title_rect)
             
-            font_subtitle = pygame.font.Font(None, 24)
+            font_subtitle = self.get_font(24)
             subtitle_surface = font_subtitle.render("Udah paham materinya?", True, (255, 215, 0))
-            subtitle_rect = subtitle_surface.get_rect(center=(300, 85))
-            self.screen.blit(subtitle_surface, subtitle_rect)
-            
-            mouse_pos = pygame.mouse.get_pos()
-            button_color = (100, 200, 100) if self.play_again_button_rect.collidepoint(mouse_pos) else (50, 150, 50)
-            pygame.draw.rect(self.screen, button_color, self.play_again_button_rect)
-            pygame.draw.rect(self.screen, WHITE, self.play_again_button_rect, 3)
-            
-            button_font = pygame.font.Font(None, 36)
-            button_text = button_font.render("Main Lagi", True, WHITE)
-            button_text_rect = button_text.get_rect(center=self.play_again_button_rect.center)
-            self.screen.blit(button_text, button_text_rect)
-            
-            return
+            subtitle_rect = subtitle_surface.get_rect(center=(150, 75))
+            box.blit(subtitle_surface, subtitle_rect)
+            return box
         
-        mission_bg = pygame.Surface((300, 140))
-        mission_bg.set_alpha(200)
-        mission_bg.fill((40, 40, 60))
-        self.screen.blit(mission_bg, (150, 10))
+        box = pygame.Surface((300, 140), pygame.SRCALPHA)
+        box.fill((40, 40, 60, self.overlay_alpha(200) or 255))
         
-        pygame.draw.rect(self.screen, WHITE, (150, 10, 300, 140), 2)
+        pygame.draw.rect(box, WHITE, box.get_rect(), 2)
         
-        font_title = pygame.font.Font(None, 28)
+        font_title = self.get_font(28)
         title_text = f"MISI {current_mission['id']}/5"
         title_surface = font_title.render(title_text, True, (255, 215, 0))
-        self.screen.blit(title_surface, (160, 20))
+        box.blit(title_surface, (10, 10))
         
-        font_mission = pygame.font.Font(None, 24)
+        font_mission = self.get_font(24)
         mission_surface = font_mission.render(current_mission['title'], True, WHITE)
-        self.screen.blit(mission_surface, (160, 55))
+        box.blit(mission_surface, (10, 45))
         
-        font_desc = pygame.font.Font(None, 20)
+        font_desc = self.get_font(20)
         desc_surface = font_desc.render(current_mission['description'], True, (180, 180, 180))
-        self.screen.blit(desc_surface, (160, 85))
+        box.blit(desc_surface, (10, 75))
         
-        completed_count = sum(1 for m in self.missions if m['completed'])
-        progress_text = f"Selesai: {completed_count}/5"
+        progress_text = f"Selesai: {self.completed_count()}/5"
         progress_surface = font_desc.render(progress_text, True, (100, 200, 100))
-        self.screen.blit(progress_surface, (160, 115))
+        box.blit(progress_surface, (10, 105))
+        return box
     
-    def draw_notification(self):
-        if self.notification_timer < self.notification_duration and self.notification_text:
-            font = pygame.font.Font(None, 36)
-            text_surface = font.render(self.notification_text, True, (0, 255, 0))
-            text_rect = text_surface.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 100))
-            
-            bg_rect = text_rect.inflate(40, 20)
-            bg_surface = pygame.Surface((bg_rect.width, bg_rect.height))
-            bg_surface.set_alpha(200)
-            bg_surface.fill((20, 20, 40))
-            self.screen.blit(bg_surface, bg_rect.topleft)
-            
-            pygame.draw.rect(self.screen, (0, 255, 0), bg_rect, 3)
-            
-            self.screen.blit(text_surface, text_rect)
+    def render_notification(self, text):
+        font = self.get_font(36)
+        text_surface = font.render(text, True, (0, 255, 0))
+        
+        notification = pygame.Surface(text_surface.get_rect().inflate(40, 20).size, pygame.SRCALPHA)
+        notification.fill((20, 20, 40, self.overlay_alpha(200) or 255))
+        
+        pygame.draw.rect(notification, (0, 255, 0), notification.get_rect(), 3)
+        
+        notification.blit(text_surface, text_surface.get_rect(center=notification.get_rect().center))
+        return notification
     
-    def draw_watering_prompt(self):
-        if not self.watering and not self.picking and not self.cutting and not self.flower_watering and not self.mushroom_cutting and not self.clock_ui_active:
-            text = None
-            
-            if self.is_near_bush():
-                text = "Tekan E untuk memetik buah"
-            elif self.is_near_trunk():
-                text = "Tekan E untuk singkirkan kayu"
-            elif self.is_near_mushroom():
-                text = "Tekan E untuk singkirkan jamur"
-            elif self.is_near_flower():
-                text = "Tekan E untuk menyiram bunga"
-            elif self.is_near_tree():
-                text = "Tekan E untuk menyiram pohon"
-            
-            if text:
-                font = pygame.font.Font(None, 28)
-                text_surface = font.render(text, True, WHITE)
-                text_rect = text_surface.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT - 40))
-                
-                bg_rect = text_rect.inflate(30, 15)
-                bg_surface = pygame.Surface((bg_rect.width, bg_rect.height))
-                bg_surface.set_alpha(180)
-                bg_surface.fill((40, 40, 60))
-                self.screen.blit(bg_surface, bg_rect.topleft)
-                
-                pygame.draw.rect(self.screen, (100, 150, 255), bg_rect, 2)
-                
-                self.screen.blit(text_surface, text_rect)
+    @derived('player', 'entities')
+    def prompt_text(self):
+        if self.is_near_bush():
+            return "Tekan E untuk memetik buah"
+        elif self.is_near_trunk():
+            return "Tekan E untuk singkirkan kayu"
+        elif self.is_near_mushroom():
+            return "Tekan E untuk singkirkan jamur"
+        elif self.is_near_flower():
+            return "Tekan E untuk menyiram bunga"
+        elif self.is_near_tree():
+            return "Tekan E untuk menyiram pohon"
+        return None
     
-    def draw_clock_ui(self):
+    def render_prompt(self, text):
+        font = self.get_font(28)
+        text_surface = font.render(text, True, WHITE)
+        
+        prompt = pygame.Surface(text_surface.get_rect().inflate(30, 15).size, pygame.SRCALPHA)
+        prompt.fill((40, 40, 60, self.overlay_alpha(180) or 255))
+        
+        pygame.draw.rect(prompt, (100, 150, 255), prompt.get_rect(), 2)
+        
+        prompt.blit(text_surface, text_surface.get_rect(center=prompt.get_rect().center))
+        return prompt
+    
+    @derived('display')
+    def render_clock_overlay(self):
         overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-        overlay.set_alpha(180)
+        overlay.set_alpha(self.overlay_alpha(180))
         overlay.fill(BLACK)
+        
+        font = self.get_font(28)
+        instructions = [
+            "Klik dan drag jarum untuk mengubah waktu",
+            "Klik pusat jam atau tekan ESC untuk keluar"
+        ]
+        y_offset = CLOCK_CENTER_Y + CLOCK_DISPLAY_SIZE // 2 + 30
+        text_blits = []
+        for text in instructions:
+            surface = font.render(text, True, WHITE)
+            text_rect = surface.get_rect(center=(SCREEN_WIDTH // 2, y_offset))
+            text_blits.append((surface, text_rect))
+            y_offset += 35
+        return overlay, tuple(text_blits)
+    
+    def draw_clock_ui(self, state):
+        overlay, text_blits = state.clock_ui
         self.screen.blit(overlay, (0, 0))
         
         cx, cy = CLOCK_CENTER_X, CLOCK_CENTER_Y
         clock_radius = CLOCK_DISPLAY_SIZE // 2 + 10
         
-        clock_full_size = clock_radius * 2
         clock_x = cx - clock_radius
         clock_y = cy - clock_radius
         self.screen.blit(self.clock_display, (clock_x, clock_y))
@@ -1397,13 +2316,13 @@ class Game:
             
             pygame.draw.line(self.screen, BLACK, (x1, y1), (x2, y2), 3)
         
-        minute_angle_rad = math.radians(self.minute_angle - 90)
+        minute_angle_rad = math.radians(state.minute_angle - 90)
         minute_length = CLOCK_DISPLAY_SIZE // 2 - 250
         minute_x = cx + math.cos(minute_angle_rad) * minute_length
         minute_y = cy + math.sin(minute_angle_rad) * minute_length
         pygame.draw.line(self.screen, DARK_BLUE, (cx, cy), (minute_x, minute_y), 4)
         
-        hour_angle_rad = math.radians(self.hour_angle - 90)
+        hour_angle_rad = math.radians(state.hour_angle - 90)
         hour_length = CLOCK_DISPLAY_SIZE // 2 - 320
         hour_x = cx + math.cos(hour_angle_rad) * hour_length
         hour_y = cy + math.sin(hour_angle_rad) * hour_length
@@ -1412,38 +2331,143 @@ class Game:
         pygame.draw.circle(self.screen, BLACK, (cx, cy), 12)
         pygame.draw.circle(self.screen, WHITE, (cx, cy), 8)
         
-        font = pygame.font.Font(None, 28)
-        instructions = [
-            "Klik dan drag jarum untuk mengubah waktu",
-            "Klik pusat jam atau tekan ESC untuk keluar"
-        ]
-        y_offset = cy + CLOCK_DISPLAY_SIZE // 2 + 30
-        for text in instructions:
-            surface = font.render(text, True, WHITE)
-            text_rect = surface.get_rect(center=(SCREEN_WIDTH // 2, y_offset))
-            self.screen.blit(surface, text_rect)
-            y_offset += 35
+        self.screen.blits(text_blits, doreturn=False)
     
-    def run(self):
+    def start_session(self):
         print("\n=== Game Started ===")
         print("Controls:")
-        print("  Arrow Keys atau WASD - Move")
-        print("  SPASI atau E - Water tree (when near)")
+        moves = ', '.join(self.actions.describe(action) for action in ('move_up', 'move_left', 'move_down', 'move_right'))
+        print(f"  {moves} - Move")
+        print(f"  {self.actions.describe('interact')} - Water tree (when near)")
         print("  Click Clock Icon - Buka UI jam")
         print("  Drag Clock Hands - Set Waktu")
-        print("  ESC - Close Clock / Quit")
+        print(f"  {self.actions.describe('minimap')} - Minimap")
+        print(f"  {self.actions.describe('profiler')} - Profiler")
+        print(f"  {self.actions.describe('back')} - Close Clock / Quit")
         print("========================\n")
         
-        while self.running:
-            dt = self.clock.tick(FPS) / 1000.0
-            
+        self.controls.install()
+        self.init_quality()
+        
+        if self.gc_monitor:
+            self.gc_monitor.install()
+        if self.gc_collector:
+            self.gc_collector.start()
+        
+        if THREADED_SIM:
+            self.simulation = SimulationThread(self, SIM_RATE)
+            self.simulation.start()
+            self.profiler.watch(self.simulation.thread)
+        
+        if PROFILE:
+            self.profiler.start()
+    
+    def frame(self, dt):
+        frame_start = time.perf_counter()
+        if self.gc_monitor:
+            self.gc_monitor.begin_frame()
+        if self.simulation:
+            self.simulation.post_events(self.controls.poll())
+            self.render(self.simulation.latest())
+        else:
             self.handle_events()
-            self.update(dt)
+            self.step(dt)
             self.draw()
+        frame_time = time.perf_counter() - frame_start
+        if self.gc_monitor:
+            self.gc_monitor.end_frame(frame_time)
+        if self.quality_governor:
+            self.record_frame_time(frame_time)
+        if self.heartbeat:
+            self.heartbeat.record_frame(frame_time)
+            if self.heartbeat.due():
+                self.send_heartbeat()
+        
+        if self.recorder:
+            self.recorder.submit()
+        
+        if self.asset_watcher:
+            self.apply_asset_changes()
+        
+        if self.gc_collector:
+            self.gc_collector.collect(1.0 / self.target_fps - (time.perf_counter() - frame_start))
+    
+    def run(self):
+        self.start_session()
         
-        pygame.quit()
+        while self.running:
+            dt = self.clock.tick(self.target_fps) / 1000.0
+            self.frame(dt)
+        
+        self.shutdown()
         sys.exit()
+    
+    async def run_async(self):
+        self.start_session()
+        
+        admin = None
+        if ADMIN_ADDRESS:
+            handler = self.admin_command
+            if self.simulation:
+                handler = lambda request: self.simulation.submit(self.admin_command, request)
+            admin = AdminServer(handler, ADMIN_ADDRESS)
+            await admin.start()
+            print(f"Admin commands on {ADMIN_ADDRESS}")
+        
+        next_frame = time.perf_counter()
+        try:
+            while self.running:
+                dt = self.clock.tick() / 1000.0
+                self.frame(dt)
+                if admin:
+                    admin.process(ADMIN_COMMANDS_PER_TICK)
+                
+                next_frame = max(next_frame + 1.0 / self.target_fps, time.perf_counter() - 0.1)
+                await asyncio.sleep(max(0.0, next_frame - time.perf_counter()))
+        finally:
+            if admin:
+                await admin.close()
+            self.shutdown()
+    
+    def shutdown(self):
+        if self.simulation:
+            self.simulation.stop()
+        self.profiler.stop()
+        input_report = self.controls.report()
+        if input_report['latency_samples']:
+            print(f"Input: {input_report['events_received']} events, {input_report['events_delivered']} after coalescing; "
+                  f"input-to-present p50 {input_report['latency_p50_ms']} ms, p95 {input_report['latency_p95_ms']} ms, "
+                  f"max {input_report['latency_max_ms']} ms")
+        if self.gc_collector:
+            self.gc_collector.stop()
+        if self.gc_monitor:
+            self.gc_monitor.uninstall()
+            print(format_report(self.gc_monitor.report()))
+        if self.asset_watcher:
+            self.asset_watcher.close()
+        if self.recorder:
+            self.recorder.close()
+        if self.autosaver:
+            self.autosaver.close()
+        if self.coop_host:
+            for player_id, (snapshots, sent) in self.coop_host.stats().items():
+                print(f"Co-op player {player_id}: {snapshots} snapshots, {sent / max(snapshots, 1):.1f} bytes each")
+            self.coop_host.close()
+        if self.coop_client:
+            self.coop_client.close()
+        if self.heartbeat:
+            self.heartbeat.close()
+        if self.quality_profile:
+            self.quality_profile['level'] = self.quality_governor.settings['name']
+            quality.save_profile(QUALITY_PROFILE, self.quality_profile)
+        self.telemetry.close()
+        self.scene_manager.close()
+        
+        pygame.quit()
 
 if __name__ == '__main__':
     game = Game()
-    game.run()
+    if ASYNC_LOOP:
+        asyncio.run(game.run_async())
+    else:
+        game.run()
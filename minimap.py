@@ -0,0 +1,105 @@
+import os
+
+import numpy as np
+import pygame
+
+MIN_LEVEL_SIZE = 32
+
+
+def build_pyramid(surface, min_size=MIN_LEVEL_SIZE):
+    """`surface` followed by successively halved copies of it, down to `min_size` pixels."""
+    if surface.get_bitsize() < 24:
+        surface = surface.convert(24)
+    levels = [surface]
+    for size in level_sizes(surface.get_size(), min_size):
+        levels.append(pygame.transform.smoothscale(levels[-1], size))
+    return levels
+
+
+def level_sizes(size, min_size=MIN_LEVEL_SIZE):
+    width, height = size
+    sizes = []
+    while max(width, height) > min_size:
+        width, height = max(1, width // 2), max(1, height // 2)
+        sizes.append((width, height))
+    return sizes
+
+
+def pyramid_path(map_path):
+    return os.path.splitext(map_path)[0] + '.pyramid.png'
+
+
+def load_pyramid(map_path, map_image, min_size=MIN_LEVEL_SIZE):
+    """Read the levels cached next to `map_path`; None if missing, stale or the wrong shape."""
+    path = pyramid_path(map_path)
+    sizes = level_sizes(map_image.get_size(), min_size)
+    try:
+        if os.path.getmtime(path) < os.path.getmtime(map_path):
+            return None
+        atlas = pygame.image.load(path)
+    except (OSError, pygame.error):
+        return None
+    if not sizes or atlas.get_size() != (sum(w for w, _ in sizes), sizes[0][1]):
+        return None
+
+    levels = [map_image if map_image.get_bitsize() >= 24 else map_image.convert(24)]
+    x = 0
+    for width, height in sizes:
+        levels.append(atlas.subsurface((x, 0, width, height)).copy())
+        x += width
+    return levels
+
+
+def save_pyramid(map_path, levels):
+    """Store the downsampled levels side by side in one PNG; the first level is the map
+    itself. Failures (read-only installs) are ignored."""
+    levels = levels[1:]
+    if not levels:
+        return
+    path = pyramid_path(map_path)
+    atlas = pygame.Surface((sum(level.get_width() for level in levels), levels[0].get_height()))
+    x = 0
+    for level in levels:
+        atlas.blit(level, (x, 0))
+        x += level.get_width()
+    temp_path = path[:-len('.png')] + '.tmp.png'
+    try:
+        pygame.image.save(atlas, temp_path)
+        os.replace(temp_path, path)
+    except (OSError, pygame.error):
+        pass
+
+
+class Minimap:
+    """Whole-map overview scaled once from the closest pyramid level.
+
+    `render` stamps objective markers onto a copy of the base image; the game caches
+    that surface until the entities or missions change, so a frame only blits it.
+    """
+
+    def __init__(self, pyramid, map_size, box_size):
+        map_width, map_height = map_size
+        self.scale = min(box_size / map_width, box_size / map_height)
+        size = (max(1, round(map_width * self.scale)), max(1, round(map_height * self.scale)))
+        source = next((level for level in reversed(pyramid)
+                       if level.get_width() >= size[0] and level.get_height() >= size[1]), pyramid[0])
+        self.base = pygame.transform.smoothscale(source, size).convert()
+        self.size = size
+
+    def to_minimap(self, x, y):
+        return int(x * self.scale), int(y * self.scale)
+
+    def render(self, markers, color, radius=1):
+        surface = self.base.copy()
+        if not markers:
+            return surface
+        points = (np.asarray(markers, dtype=np.float64) * self.scale).astype(np.int32)
+        pixels = pygame.surfarray.pixels3d(surface)
+        width, height = self.size
+        for dx in range(-radius, radius + 1):
+            for dy in range(-radius, radius + 1):
+                xs = np.clip(points[:, 0] + dx, 0, width - 1)
+                ys = np.clip(points[:, 1] + dy, 0, height - 1)
+                pixels[xs, ys] = color
+        del pixels
+        return surface
@@ -0,0 +1,183 @@
+import pygame
+
+NEAR = 0
+MID = 1
+FAR = 2
+FROZEN = 3
+TIER_NAMES = ('near', 'mid', 'far', 'frozen')
+
+CAT_TINTS = ((255, 190, 120), (190, 190, 205), (140, 120, 110))
+
+# (dir_x, dir_y, facing); resting keeps the previous facing.
+WANDER_MOVES = ((0, 0, None), (0, 0, None), (1, 0, 'right'), (-1, 0, 'left'), (0, 1, 'down'), (0, -1, 'up'))
+
+
+def spawn(rng, count, map_width, map_height, blocked=None, size=16, speed=40):
+    """Scatter `count` wandering cats over the map, skipping spots where `blocked(x, y)`
+    is true for their feet."""
+    npcs = []
+    for _ in range(count * 4):
+        if len(npcs) == count:
+            break
+        x = rng.uniform(0, map_width - size)
+        y = rng.uniform(0, map_height - size)
+        if blocked and blocked(x + size / 2, y + size - 1):
+            continue
+        npcs.append({
+            'x': x,
+            'y': y,
+            'width': size,
+            'height': size,
+            'speed': speed * rng.uniform(0.6, 1.2),
+            'direction': 'down',
+            'state': 'idle',
+            'move': (0, 0),
+            'timer': rng.uniform(0.5, 3.0),
+            'tint': rng.randrange(len(CAT_TINTS)),
+            'updated_at': 0.0,
+        })
+    return npcs
+
+
+def wander(npc, dt, rng, bounds, blocked=None):
+    """Advance one NPC by `dt` seconds, however long: it walks or rests in straight
+    segments and picks a new one whenever the current segment's timer runs out, so a
+    single long step ends where many short ones would have."""
+    width, height = bounds
+    while dt > 0:
+        step = min(dt, npc['timer'])
+        dir_x, dir_y = npc['move']
+        if dir_x or dir_y:
+            x = max(0, min(npc['x'] + dir_x * npc['speed'] * step, width - npc['width']))
+            y = max(0, min(npc['y'] + dir_y * npc['speed'] * step, height - npc['height']))
+            if blocked and blocked(x + npc['width'] / 2, y + npc['height'] - 1):
+                npc['timer'] = step
+            else:
+                npc['x'], npc['y'] = x, y
+        npc['timer'] -= step
+        dt -= step
+        if npc['timer'] <= 0:
+            dir_x, dir_y, facing = rng.choice(WANDER_MOVES)
+            npc['move'] = (dir_x, dir_y)
+            npc['state'] = 'walking' if facing else 'idle'
+            npc['direction'] = facing or npc['direction']
+            npc['timer'] = rng.uniform(0.5, 3.0)
+
+
+def tinted(surface, color):
+    surface = surface.copy()
+    if surface.get_bitsize() == 8:
+        surface.set_palette([(r * color[0] // 255, g * color[1] // 255, b * color[2] // 255)
+                             for r, g, b in surface.get_palette()])
+    else:
+        surface.fill(color, special_flags=pygame.BLEND_RGB_MULT)
+    return surface
+
+
+def tinted_frames(frames, tints=CAT_TINTS):
+    """One copy of an AnimationTable's frames per coat color, indexed [tint][clip][direction][frame]."""
+    return [[[[tinted(frame, tint) for frame in direction] for direction in clip] for clip in frames]
+            for tint in tints]
+
+
+class LODScheduler:
+    """Updates a scene's NPCs less often the farther they are from the camera.
+
+    The map is cut into square regions of `region` pixels. Regions within
+    `far_range` view sizes of the camera are loaded; NPCs anywhere else are frozen
+    and not visited at all, so a tick costs the same however many NPCs the rest of
+    the map holds. In loaded regions an NPC overlapping the view (plus
+    `near_margin`) is updated every tick, one within `mid_range` view sizes every
+    `mid_interval` ticks and the rest every `far_interval` ticks, staggered by slot
+    so each tick handles an even share. Every update gets the time since that
+    NPC's last one, so slow tiers cover the same ground in fewer, longer steps. A
+    region's clock restarts when it loads again; nothing happens there while it is
+    frozen.
+    """
+
+    def __init__(self, npcs, step, region=256, near_margin=32, mid_range=0.5, far_range=1.5,
+                 mid_interval=4, far_interval=16):
+        self.npcs = npcs
+        self.step = step
+        self.region = region
+        self.near_margin = near_margin
+        self.mid_range = mid_range
+        self.far_range = far_range
+        self.intervals = (1, mid_interval, far_interval)
+        self.regions = {}
+        for slot, npc in enumerate(npcs):
+            npc['slot'] = slot
+            self.regions.setdefault(self.region_of(npc), []).append(npc)
+        self.loaded = set()
+        self.time = 0.0
+        self.ticks = 0
+        self.visible = []
+        self.population = [0, 0, 0, len(npcs)]
+        self.updates = [0, 0, 0, 0]
+        self.total_updates = [0, 0, 0, 0]
+
+    def region_of(self, npc):
+        return int(npc['x']) // self.region, int(npc['y']) // self.region
+
+    def update(self, dt, camera_x, camera_y, view_width, view_height):
+        self.time += dt
+        self.ticks += 1
+        now, tick = self.time, self.ticks
+        margin = self.near_margin
+        near = (camera_x - margin, camera_y - margin, camera_x + view_width + margin, camera_y + view_height + margin)
+        mid_x, mid_y = view_width * self.mid_range, view_height * self.mid_range
+        mid = (camera_x - mid_x, camera_y - mid_y, camera_x + view_width + mid_x, camera_y + view_height + mid_y)
+        far_x, far_y = view_width * self.far_range, view_height * self.far_range
+        size = self.region
+        loaded = {(rx, ry)
+                  for rx in range(int(camera_x - far_x) // size, int(camera_x + view_width + far_x) // size + 1)
+                  for ry in range(int(camera_y - far_y) // size, int(camera_y + view_height + far_y) // size + 1)}
+
+        population = [0, 0, 0, 0]
+        updates = [0, 0, 0, 0]
+        visible = []
+        moved = []
+        for key in loaded:
+            bucket = self.regions.get(key)
+            if not bucket:
+                continue
+            thawed = key not in self.loaded
+            for npc in bucket:
+                if thawed:
+                    npc['updated_at'] = now - dt
+                x, y = npc['x'], npc['y']
+                if x + npc['width'] >= near[0] and x <= near[2] and y + npc['height'] >= near[1] and y <= near[3]:
+                    tier = NEAR
+                    visible.append(npc)
+                elif mid[0] <= x <= mid[2] and mid[1] <= y <= mid[3]:
+                    tier = MID
+                else:
+                    tier = FAR
+                population[tier] += 1
+                if (tick + npc['slot']) % self.intervals[tier]:
+                    continue
+                self.step(npc, now - npc['updated_at'])
+                npc['updated_at'] = now
+                updates[tier] += 1
+                if self.region_of(npc) != key:
+                    moved.append((key, npc))
+
+        for key, npc in moved:
+            self.regions[key].remove(npc)
+            self.regions.setdefault(self.region_of(npc), []).append(npc)
+        population[FROZEN] = len(self.npcs) - sum(population)
+        self.loaded = loaded
+        self.visible = visible
+        self.population = population
+        self.updates = updates
+        for tier, count in enumerate(updates):
+            self.total_updates[tier] += count
+
+    def stats(self):
+        return {
+            'ticks': self.ticks,
+            'npcs': len(self.npcs),
+            'tiers': {name: {'npcs': self.population[tier], 'updates': self.updates[tier],
+                             'total_updates': self.total_updates[tier]}
+                      for tier, name in enumerate(TIER_NAMES)},
+        }
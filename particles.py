@@ -0,0 +1,131 @@
+import numpy as np
+import pygame
+
+FADE_STAGES = 4
+
+PARTICLE_KINDS = [
+    {
+        'name': 'water',
+        'color': (90, 160, 255),
+        'size': 2,
+        'life': (0.4, 0.8),
+        'speed': (40, 90),
+        'spread': 0.5,
+        'gravity': 220,
+    },
+    {
+        'name': 'wood',
+        'color': (150, 100, 50),
+        'size': 2,
+        'life': (0.5, 0.9),
+        'speed': (50, 110),
+        'spread': np.pi,
+        'gravity': 260,
+    },
+    {
+        'name': 'spore',
+        'color': (235, 225, 170),
+        'size': 1,
+        'life': (1.0, 1.8),
+        'speed': (8, 25),
+        'spread': np.pi,
+        'gravity': -12,
+    },
+]
+KIND_INDEX = {kind['name']: i for i, kind in enumerate(PARTICLE_KINDS)}
+
+
+class ParticleSystem:
+    def __init__(self, capacity=4096, scale=1, seed=None):
+        self.capacity = capacity
+        self.rng = np.random.default_rng(seed)
+
+        self.pos = np.zeros((capacity, 2), dtype=np.float32)
+        self.vel = np.zeros((capacity, 2), dtype=np.float32)
+        self.life = np.zeros(capacity, dtype=np.float32)
+        self.max_life = np.ones(capacity, dtype=np.float32)
+        self.kind = np.zeros(capacity, dtype=np.int8)
+        self.alive = np.zeros(capacity, dtype=bool)
+
+        self.gravity = np.array([kind['gravity'] for kind in PARTICLE_KINDS], dtype=np.float32)
+        self.emitted = 0
+        self.dropped = 0
+        self.build_sprites(scale)
+
+    def build_sprites(self, scale):
+        self.scale = scale
+        self.sprites = []
+        for kind in PARTICLE_KINDS:
+            size = kind['size'] * scale
+            stages = []
+            for stage in range(FADE_STAGES):
+                sprite = pygame.Surface((size, size), pygame.SRCALPHA)
+                alpha = 255 * (stage + 1) // FADE_STAGES
+                sprite.fill((*kind['color'], alpha))
+                stages.append(sprite)
+            self.sprites.append(stages)
+
+    def emit(self, name, x, y, count, angle=-np.pi / 2):
+        free = np.flatnonzero(~self.alive)[:count]
+        self.dropped += count - len(free)
+        n = len(free)
+        if n == 0:
+            return
+        kind = PARTICLE_KINDS[KIND_INDEX[name]]
+
+        theta = angle + self.rng.uniform(-kind['spread'], kind['spread'], n)
+        speed = self.rng.uniform(*kind['speed'], n)
+        life = self.rng.uniform(*kind['life'], n)
+
+        self.pos[free, 0] = x + self.rng.uniform(-2, 2, n)
+        self.pos[free, 1] = y + self.rng.uniform(-2, 2, n)
+        self.vel[free, 0] = np.cos(theta) * speed
+        self.vel[free, 1] = np.sin(theta) * speed
+        self.life[free] = life
+        self.max_life[free] = life
+        self.kind[free] = KIND_INDEX[name]
+        self.alive[free] = True
+        self.emitted += n
+
+    def update(self, dt):
+        active = np.flatnonzero(self.alive)
+        if len(active) == 0:
+            return
+        self.vel[active, 1] += self.gravity[self.kind[active]] * dt
+        self.pos[active] += self.vel[active] * dt
+        self.life[active] -= dt
+        self.alive[active] = self.life[active] > 0
+
+    def clear(self):
+        self.alive[:] = False
+
+    @property
+    def count(self):
+        return int(np.count_nonzero(self.alive))
+
+    def blit_list(self, camera_x, camera_y, scale, size):
+        active = np.flatnonzero(self.alive)
+        if len(active) == 0:
+            return []
+        if scale != self.scale:
+            self.build_sprites(scale)
+
+        screen_x = ((self.pos[active, 0] - camera_x) * scale).astype(np.int32)
+        screen_y = ((self.pos[active, 1] - camera_y) * scale).astype(np.int32)
+        width, height = size
+        visible = (screen_x >= 0) & (screen_x < width) & (screen_y >= 0) & (screen_y < height)
+        if not visible.any():
+            return []
+
+        active = active[visible]
+        stage = np.minimum((self.life[active] / self.max_life[active] * FADE_STAGES).astype(np.int32),
+                           FADE_STAGES - 1)
+        sprites = self.sprites
+        return [(sprites[k][s], (x, y)) for k, s, x, y in zip(
+            self.kind[active].tolist(), stage.tolist(),
+            screen_x[visible].tolist(), screen_y[visible].tolist())]
+
+    def draw(self, surface, camera_x, camera_y, scale):
+        blits = self.blit_list(camera_x, camera_y, scale, surface.get_size())
+        if blits:
+            surface.blits(blits, doreturn=False)
@@ -0,0 +1,114 @@
+import collections
+import os
+import sys
+import threading
+import time
+
+
+class SamplingProfiler:
+    """Statistical profiler: a background thread reads the Python stack of every
+    watched thread through `sys._current_frames()` each `interval` seconds.
+
+    The game's own threads are never traced or interrupted, so the cost is one
+    stack walk per sample and the profiler can stay on for a whole session. Only
+    the last `max_samples` stacks are kept. When sampling stops the buffer is
+    written in the collapsed-stack format read by flamegraph.pl, speedscope and
+    similar tools: one `thread;caller;...;callee count` line per distinct stack.
+    """
+
+    def __init__(self, directory, interval=0.01, max_samples=30000):
+        self.directory = directory
+        self.interval = interval
+        self.samples = collections.deque(maxlen=max_samples)
+        self.labels = {}
+        self.threads = {}
+        self.thread = None
+        self.stopping = threading.Event()
+        self.started = 0.0
+        self.sample_time = 0.0
+
+    @property
+    def running(self):
+        return self.thread is not None and not self.stopping.is_set()
+
+    def watch(self, thread):
+        self.threads[thread.ident] = thread.name
+
+    def start(self):
+        if self.running:
+            return
+        if self.thread:
+            self.thread.join()
+        self.samples.clear()
+        self.sample_time = 0.0
+        self.started = time.perf_counter()
+        self.stopping.clear()
+        self.thread = threading.Thread(target=self.loop, name='sampling-profiler', daemon=True)
+        self.thread.start()
+
+    def stop(self, wait=True):
+        """Stop sampling; the sampler thread writes its buffer on the way out."""
+        if not self.thread:
+            return
+        self.stopping.set()
+        if wait:
+            self.thread.join()
+            self.thread = None
+
+    def label(self, code):
+        label = self.labels.get(code)
+        if label is None:
+            name = getattr(code, 'co_qualname', code.co_name)
+            label = self.labels[code] = f"{os.path.basename(code.co_filename)}:{name}"
+        return label
+
+    def sample(self):
+        frames = sys._current_frames()
+        for ident, name in list(self.threads.items()):
+            frame = frames.get(ident)
+            stack = []
+            while frame is not None:
+                stack.append(self.label(frame.f_code))
+                frame = frame.f_back
+            if stack:
+                stack.append(name)
+                stack.reverse()
+                self.samples.append(tuple(stack))
+
+    def loop(self):
+        next_sample = time.perf_counter()
+        while not self.stopping.wait(max(0.0, next_sample - time.perf_counter())):
+            start = time.perf_counter()
+            self.sample()
+            self.sample_time += time.perf_counter() - start
+            next_sample = max(next_sample + self.interval, start)
+        path = self.write()
+        if path:
+            print(f"Profile: {len(self.samples)} samples written to {path} "
+                  f"(sampler overhead {self.overhead():.2%})")
+
+    def overhead(self):
+        elapsed = time.perf_counter() - self.started
+        return self.sample_time / elapsed if elapsed > 0 else 0.0
+
+    def write(self):
+        """Fold the buffered stacks into a `.folded` file; returns its path, or None
+        if nothing was sampled or the directory is not writable."""
+        counts = collections.Counter(list(self.samples))
+        if not counts:
+            return None
+        stamp = time.strftime('%Y%m%d-%H%M%S')
+        path = os.path.join(self.directory, f'profile-{stamp}.folded')
+        suffix = 1
+        while os.path.exists(path):
+            suffix += 1
+            path = os.path.join(self.directory, f'profile-{stamp}-{suffix}.folded')
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(path, 'w') as f:
+                for stack, count in counts.most_common():
+                    f.write(f"{';'.join(stack)} {count}\n")
+        except OSError as e:
+            print(f"Could not write profile to {path}: {e}")
+            return None
+        return path
@@ -0,0 +1,150 @@
+import json
+import os
+import time
+
+QUALITY_LEVELS = [
+    {
+        'name': 'low',
+        'render_scale': 3,
+        'overlay_alpha': False,
+        'lighting': False,
+        'animation_hz': 8,
+        'fps': 30,
+    },
+    {
+        'name': 'medium',
+        'render_scale': 2,
+        'overlay_alpha': False,
+        'lighting': True,
+        'animation_hz': 15,
+        'fps': 30,
+    },
+    {
+        'name': 'high',
+        'render_scale': 2,
+        'overlay_alpha': True,
+        'lighting': True,
+        'animation_hz': 0,
+        'fps': 60,
+    },
+]
+LEVEL_INDEX = {level['name']: i for i, level in enumerate(QUALITY_LEVELS)}
+
+PROFILE_VERSION = 1
+
+
+def frame_budget(level):
+    return 1.0 / level['fps']
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def calibrate(measure, levels=QUALITY_LEVELS, frames=20, headroom=0.7):
+    """Run `measure(level)` for each level from best to worst and keep the first
+    whose 90th percentile frame time fits `headroom` of that level's budget."""
+    frame_ms = {}
+    chosen = 0
+    for index in range(len(levels) - 1, -1, -1):
+        level = levels[index]
+        samples = [measure(level) for _ in range(frames)]
+        p90 = percentile(samples, 0.9)
+        frame_ms[level['name']] = round(p90 * 1000, 2)
+        if p90 <= frame_budget(level) * headroom:
+            chosen = index
+            break
+    return {
+        'version': PROFILE_VERSION,
+        'level': levels[chosen]['name'],
+        'frame_ms': frame_ms,
+        'calibrated_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+
+
+def load_profile(path):
+    try:
+        with open(path) as f:
+            profile = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if profile.get('version') != PROFILE_VERSION or profile.get('level') not in LEVEL_INDEX:
+        return None
+    return profile
+
+
+def save_profile(path, profile):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(profile, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+class QualityGovernor:
+    """Steps quality between `min_level` and `max_level` from measured frame time.
+
+    Frame times are gathered into windows; a window's 90th percentile is compared
+    with the current level's budget. Dropping needs `down_windows` slow windows in
+    a row, raising needs `up_windows` fast windows measured against the *next*
+    level's budget, and no change happens within `cooldown` windows of the last one.
+    """
+
+    def __init__(self, level, levels=QUALITY_LEVELS, min_level=0, max_level=None,
+                 window=30, down_ratio=0.9, up_ratio=0.5, down_windows=2, up_windows=6, cooldown=4):
+        self.levels = levels
+        self.min_level = min_level
+        self.max_level = len(levels) - 1 if max_level is None else max_level
+        self.level = max(self.min_level, min(level, self.max_level))
+        self.window = window
+        self.down_ratio = down_ratio
+        self.up_ratio = up_ratio
+        self.down_windows = down_windows
+        self.up_windows = up_windows
+        self.cooldown = cooldown
+
+        self.samples = []
+        self.slow_streak = 0
+        self.fast_streak = 0
+        self.cooldown_left = 0
+        self.last_p90 = 0.0
+        self.changes = 0
+
+    @property
+    def settings(self):
+        return self.levels[self.level]
+
+    def record(self, frame_time):
+        """Add one frame's update+draw time; returns True when the level changed."""
+        self.samples.append(frame_time)
+        if len(self.samples) < self.window:
+            return False
+        self.last_p90 = percentile(self.samples, 0.9)
+        self.samples.clear()
+
+        if self.cooldown_left:
+            self.cooldown_left -= 1
+            return False
+
+        if self.last_p90 > frame_budget(self.settings) * self.down_ratio:
+            self.slow_streak += 1
+            self.fast_streak = 0
+        elif (self.level < self.max_level and
+              self.last_p90 < frame_budget(self.levels[self.level + 1]) * self.up_ratio):
+            self.fast_streak += 1
+            self.slow_streak = 0
+        else:
+            self.slow_streak = self.fast_streak = 0
+
+        if self.slow_streak >= self.down_windows and self.level > self.min_level:
+            return self.step(-1)
+        if self.fast_streak >= self.up_windows:
+            return self.step(1)
+        return False
+
+    def step(self, delta):
+        self.level += delta
+        self.slow_streak = self.fast_streak = 0
+        self.cooldown_left = self.cooldown
+        self.changes += 1
+        return True
@@ -0,0 +1,106 @@
+import os
+import queue
+import threading
+import time
+
+import numpy as np
+import pygame
+
+from framecapture import FrameCapture
+
+
+class FrameRecorder:
+    def __init__(self, surface, directory, fmt='png', fps=15, downscale=1, ring_size=8):
+        if fmt not in ('png', 'raw'):
+            raise ValueError(f"Unknown recording format: {fmt}")
+
+        width, height = surface.get_size()
+        size = (width // downscale, height // downscale) if downscale > 1 else None
+        self.capture = FrameCapture(surface, size)
+        self.directory = directory
+        self.fmt = fmt
+        self.interval = 1.0 / fps if fps > 0 else 0
+
+        self.buffers = [np.empty(self.capture.shape, dtype=np.uint8) for _ in range(ring_size)]
+        self.free_slots = queue.Queue()
+        for index in range(ring_size):
+            self.free_slots.put(index)
+        self.pending = queue.Queue()
+
+        self.frames_submitted = 0
+        self.frames_written = 0
+        self.frames_dropped = 0
+        self.error = None
+        self.start_time = time.perf_counter()
+        self.next_capture_time = self.start_time
+
+        os.makedirs(directory, exist_ok=True)
+        self.index_file = open(os.path.join(directory, 'frames.csv'), 'w')
+        self.index_file.write("frame,time\n")
+        self.raw_file = None
+        if fmt == 'raw':
+            self.raw_file = open(os.path.join(directory, 'session.rgb24'), 'wb')
+            self.write_raw_info(fps)
+
+        self.thread = threading.Thread(target=self.writer_loop, name='frame-recorder', daemon=True)
+        self.thread.start()
+
+    def write_raw_info(self, fps):
+        height, width, _ = self.capture.shape
+        with open(os.path.join(self.directory, 'session.txt'), 'w') as f:
+            f.write(f"width={width}\nheight={height}\npixel_format=rgb24\nfps={fps}\n")
+            f.write(f"ffmpeg -f rawvideo -pixel_format rgb24 -video_size {width}x{height} "
+                    f"-framerate {fps} -i session.rgb24 session.mp4\n")
+
+    def submit(self):
+        if self.error:
+            return False
+        now = time.perf_counter()
+        if now < self.next_capture_time:
+            return False
+        self.next_capture_time += self.interval
+        if self.next_capture_time < now:
+            self.next_capture_time = now + self.interval
+
+        try:
+            slot = self.free_slots.get_nowait()
+        except queue.Empty:
+            self.frames_dropped += 1
+            return False
+
+        self.capture.capture(self.buffers[slot])
+        self.pending.put((self.frames_submitted, now - self.start_time, slot))
+        self.frames_submitted += 1
+        return True
+
+    def writer_loop(self):
+        height, width, _ = self.capture.shape
+        while True:
+            item = self.pending.get()
+            if item is None:
+                break
+            frame_number, timestamp, slot = item
+            buffer = self.buffers[slot]
+            try:
+                if self.fmt == 'png':
+                    image = pygame.image.frombuffer(buffer, (width, height), 'RGB')
+                    pygame.image.save(image, os.path.join(self.directory, f"frame_{frame_number:06d}.png"))
+                else:
+                    self.raw_file.write(buffer.data)
+                self.index_file.write(f"{frame_number},{timestamp:.4f}\n")
+                self.frames_written += 1
+            except Exception as e:
+                self.error = e
+                print(f"Recording stopped after {self.frames_written} frames: {e}")
+                break
+            finally:
+                self.free_slots.put(slot)
+
+    def close(self):
+        self.pending.put(None)
+        self.thread.join()
+        self.index_file.close()
+        if self.raw_file:
+            self.raw_file.close()
+        print(f"Recording saved to {self.directory}: {self.frames_written} frames written, "
+              f"{self.frames_dropped} dropped")
@@ -0,0 +1,233 @@
+import os
+import struct
+import threading
+import zlib
+
+SNAPSHOT_MAGIC = b'CTAS'
+SNAPSHOT_VERSION = 4
+
+DIRECTIONS = ('down', 'up', 'left', 'right')
+ENTITY_GROUPS = (
+    ('bushes', 'picked'),
+    ('trunks', 'cut'),
+    ('flowers', 'watered'),
+    ('mushrooms', 'removed'),
+)
+COUNTERS = ('fruits_picked', 'trunks_cut', 'flowers_watered', 'mushrooms_removed')
+
+HEADER = struct.Struct('<4sBI')
+HEADER_V2 = struct.Struct('<4sBH')
+COUNT = struct.Struct('<I')
+LEGACY_COUNT = struct.Struct('<B')
+COUNTER_VALUES = struct.Struct('<' + 'I' * len(COUNTERS))
+PLAYER = struct.Struct('<ffBff')
+FOOTER = struct.Struct('<I')
+
+
+class SnapshotError(ValueError):
+    pass
+
+
+def pack_flags(flags, count_format=COUNT):
+    data = bytearray((len(flags) + 7) // 8)
+    for i, flag in enumerate(flags):
+        if flag:
+            data[i // 8] |= 1 << (i % 8)
+    return count_format.pack(len(flags)) + bytes(data)
+
+
+def unpack_flags(data, offset, count_format=COUNT):
+    (count,) = count_format.unpack_from(data, offset)
+    offset += count_format.size
+    size = (count + 7) // 8
+    raw = data[offset:offset + size]
+    if len(raw) != size:
+        raise SnapshotError("Truncated entity flags")
+    flags = [bool(raw[i // 8] & (1 << (i % 8))) for i in range(count)]
+    return flags, offset + size
+
+
+def pack_scene(name, scene):
+    encoded = name.encode('utf-8')[:255]
+    data = bytearray([len(encoded)]) + encoded
+    for group, _ in ENTITY_GROUPS:
+        data += pack_flags(scene[group])
+    stages = scene.get('stages', [])
+    data += COUNT.pack(len(stages)) + bytes(stages)
+    return bytes(data)
+
+
+def unpack_scene(data, offset):
+    length = data[offset]
+    name = data[offset + 1:offset + 1 + length].decode('utf-8')
+    offset += 1 + length
+    scene = {}
+    for group, _ in ENTITY_GROUPS:
+        scene[group], offset = unpack_flags(data, offset)
+    (count,) = COUNT.unpack_from(data, offset)
+    offset += COUNT.size
+    scene['stages'] = list(data[offset:offset + count])
+    if len(scene['stages']) != count:
+        raise SnapshotError("Truncated flower stages")
+    return name, scene, offset + count
+
+
+def pack_snapshot(state):
+    player = state['player']
+    payload = bytearray(PLAYER.pack(
+        player['x'], player['y'], DIRECTIONS.index(player['direction']),
+        state['hour_angle'], state['minute_angle'],
+    ))
+    scene = state['scene'].encode('utf-8')[:255]
+    payload += bytes([len(scene)]) + scene
+    payload += COUNTER_VALUES.pack(*(state[name] for name in COUNTERS))
+
+    missions = state['missions']
+    payload.append(len(missions))
+    for required_hour, completed in missions:
+        payload += bytes((required_hour, int(completed)))
+
+    scenes = state['scenes']
+    payload.append(len(scenes))
+    for name, scene in scenes.items():
+        payload += pack_scene(name, scene)
+
+    header = HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(payload))
+    return header + payload + FOOTER.pack(zlib.crc32(header + payload))
+
+
+def read_header(data):
+    """(version, payload offset, payload length); version 1 and 2 files use a 16-bit length."""
+    if len(data) < HEADER_V2.size + FOOTER.size:
+        raise SnapshotError("Snapshot too short")
+    magic, version = data[:4], data[4]
+    if magic != SNAPSHOT_MAGIC:
+        raise SnapshotError("Not a save snapshot")
+    if not 1 <= version <= SNAPSHOT_VERSION:
+        raise SnapshotError(f"Unsupported snapshot version {version}")
+    header = HEADER if version >= 3 else HEADER_V2
+    if len(data) < header.size:
+        raise SnapshotError("Snapshot too short")
+    return version, header.size, header.unpack_from(data)[2]
+
+
+def snapshot_size(data):
+    _, start, length = read_header(data)
+    return start + length + FOOTER.size
+
+
+def unpack_snapshot(data):
+    """Decode a snapshot. Entity flags are returned per scene under 'scenes'; files
+    from before version 3 only stored the home scene, which is keyed as None.
+
+    Any malformed or truncated snapshot raises SnapshotError.
+    """
+    try:
+        return decode_snapshot(data)
+    except (IndexError, UnicodeDecodeError, struct.error) as e:
+        raise SnapshotError(f"Malformed snapshot: {e}") from e
+
+
+def decode_snapshot(data):
+    version, start, length = read_header(data)
+    end = start + length
+    if len(data) < end + FOOTER.size:
+        raise SnapshotError("Truncated snapshot")
+    (crc,) = FOOTER.unpack_from(data, end)
+    if crc != zlib.crc32(data[:end]):
+        raise SnapshotError("Snapshot checksum mismatch")
+
+    x, y, direction, hour_angle, minute_angle = PLAYER.unpack_from(data, start)
+    offset = start + PLAYER.size
+    state = {
+        'player': {'x': x, 'y': y, 'direction': DIRECTIONS[direction]},
+        'hour_angle': hour_angle,
+        'minute_angle': minute_angle,
+        'scene': None,
+    }
+    if version >= 2:
+        length = data[offset]
+        state['scene'] = data[offset + 1:offset + 1 + length].decode('utf-8')
+        offset += 1 + length
+    if version >= 4:
+        state.update(zip(COUNTERS, COUNTER_VALUES.unpack_from(data, offset)))
+        offset += COUNTER_VALUES.size
+    else:
+        for name in COUNTERS:
+            state[name] = data[offset]
+            offset += 1
+
+    count = data[offset]
+    offset += 1
+    state['missions'] = [(data[offset + 2 * i], bool(data[offset + 2 * i + 1])) for i in range(count)]
+    offset += 2 * count
+
+    state['scenes'] = {}
+    if version < 3:
+        home = {}
+        for group, _ in ENTITY_GROUPS:
+            home[group], offset = unpack_flags(data, offset, LEGACY_COUNT)
+        state['scenes'][None] = home
+        return state
+    count = data[offset]
+    offset += 1
+    for _ in range(count):
+        name, scene, offset = unpack_scene(data, offset)
+        state['scenes'][name] = scene
+    return state
+
+
+def write_atomic(path, data):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    if hasattr(os, 'O_DIRECTORY'):
+        dir_fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+def read_snapshot(path):
+    with open(path, 'rb') as f:
+        return unpack_snapshot(f.read())
+
+
+class Autosaver:
+    def __init__(self, path):
+        self.path = path
+        self.pending = None
+        self.saves_written = 0
+        self.condition = threading.Condition()
+        self.closing = False
+        self.thread = threading.Thread(target=self.writer_loop, name='autosave', daemon=True)
+        self.thread.start()
+
+    def save(self, data):
+        with self.condition:
+            self.pending = data
+            self.condition.notify()
+
+    def writer_loop(self):
+        while True:
+            with self.condition:
+                while self.pending is None and not self.closing:
+                    self.condition.wait()
+                data, self.pending = self.pending, None
+                if data is None:
+                    return
+            try:
+                write_atomic(self.path, data)
+                self.saves_written += 1
+            except OSError as e:
+                print(f"Autosave failed: {e}")
+
+    def close(self):
+        with self.condition:
+            self.closing = True
+            self.condition.notify()
+        self.thread.join()
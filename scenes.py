@@ -0,0 +1,288 @@
+import os
+import queue
+import sys
+import threading
+from collections import OrderedDict
+
+import worldgen
+from settings import WORLD_SEED, WORLD_TILES
+
+HOME_SCENE = 'backyard'
+
+SCENES = {
+    'backyard': {
+        'maps': [os.path.join('char', 'backyard.png'), 'map.png'],
+        'palette': ((51, 153, 51), (41, 143, 41)),
+        'exits': [
+            {'edge': 'right', 'to': 'meadow'},
+            {'edge': 'bottom', 'to': 'orchard'},
+        ],
+        'entities': {
+            'trees': [
+                {'x': 2, 'y': 50},
+                {'x': 100, 'y': 230},
+                {'x': 350, 'y': 150},
+                {'x': 350, 'y': 250},
+            ],
+            'bushes': [
+                {'x': 220, 'y': 270, 'picked': False},
+                {'x': 280, 'y': 270, 'picked': False},
+                {'x': 250, 'y': 270, 'picked': False},
+            ],
+            'trunks': [
+                {'x': 400, 'y': 100, 'cut': False},
+                {'x': 50, 'y': 150, 'cut': False},
+            ],
+            'flowers': [
+                {'x': 120, 'y': 100, 'watered': False},
+                {'x': 120, 'y': 70, 'watered': False},
+                {'x': 150, 'y': 70, 'watered': False},
+                {'x': 150, 'y': 100, 'watered': False},
+                {'x': 180, 'y': 70, 'watered': False},
+                {'x': 180, 'y': 100, 'watered': False},
+            ],
+            'mushrooms': [
+                {'x': 160, 'y': 180, 'removed': False},
+                {'x': 450, 'y': 180, 'removed': False},
+                {'x': 20, 'y': 280, 'removed': False},
+                {'x': 350, 'y': 80, 'removed': False},
+            ],
+        },
+    },
+    'meadow': {
+        'maps': [os.path.join('char', 'meadow.png')],
+        'palette': ((96, 168, 64), (86, 158, 58)),
+        'exits': [
+            {'edge': 'left', 'to': 'backyard'},
+            {'edge': 'right', 'to': 'wilds'},
+        ],
+        'entities': {
+            'trees': [
+                {'x': 60, 'y': 40},
+                {'x': 220, 'y': 120},
+                {'x': 380, 'y': 60},
+                {'x': 300, 'y': 230},
+            ],
+        },
+    },
+    'orchard': {
+        'maps': [os.path.join('char', 'orchard.png')],
+        'palette': ((60, 140, 70), (52, 130, 62)),
+        'exits': [
+            {'edge': 'top', 'to': 'backyard'},
+        ],
+        'entities': {
+            'trees': [
+                {'x': 40, 'y': 60},
+                {'x': 140, 'y': 60},
+                {'x': 240, 'y': 60},
+                {'x': 340, 'y': 60},
+                {'x': 40, 'y': 200},
+                {'x': 140, 'y': 200},
+                {'x': 240, 'y': 200},
+                {'x': 340, 'y': 200},
+            ],
+        },
+    },
+    'wilds': {
+        'maps': [],
+        'palette': ((88, 160, 60), (78, 150, 54)),
+        'generate': {'seed': WORLD_SEED, 'tiles': WORLD_TILES},
+        'exits': [
+            {'edge': 'left', 'to': 'meadow'},
+        ],
+    },
+}
+
+ENTITY_KINDS = ('trees', 'bushes', 'trunks', 'flowers', 'mushrooms')
+OPPOSITE_EDGE = {'left': 'right', 'right': 'left', 'top': 'bottom', 'bottom': 'top'}
+
+
+def surface_bytes(surface):
+    return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+
+def layout_bytes(layout):
+    return sum(sys.getsizeof(items) + sum(sys.getsizeof(entity) for entity in items) for items in layout.values())
+
+
+def map_bytes(scene_map):
+    """Memory held by a cached map: its surfaces or terrain, minimap levels and, for
+    generated scenes, the entity layout built with the terrain."""
+    terrain = scene_map.get('terrain')
+    total = terrain.nbytes if terrain else surface_bytes(scene_map['surface'])
+    if 'entities' in scene_map:
+        if 'entities_bytes' not in scene_map:
+            scene_map['entities_bytes'] = layout_bytes(scene_map['entities'])
+        total += scene_map['entities_bytes']
+    return total + sum(surface_bytes(level) for level in scene_map.get('pyramid', ()))
+
+
+def generate_scene(scene):
+    spec = scene['generate']
+    width, height = spec['tiles']
+    return worldgen.generate_world(spec['seed'], width, height, scene['palette'])
+
+
+class EntityIndex:
+    """Buckets a scene's entities into square cells so that drawing, proximity and
+    collision checks only visit entities near a point instead of the whole scene.
+
+    Entities are static; their flags change in place, so the index stays valid until
+    the scene's entity lists are replaced.
+    """
+
+    def __init__(self, entities, cell=128):
+        self.cell = cell
+        self.cells = {}
+        for kind, items in entities.items():
+            for order, entity in enumerate(items):
+                key = (int(entity['x']) // cell, int(entity['y']) // cell)
+                self.cells.setdefault(key, {}).setdefault(kind, []).append((order, entity))
+
+    def query(self, kind, left, top, right, bottom):
+        """Entities of `kind` whose position lies in the rectangle, in list order."""
+        cell = self.cell
+        found = []
+        for cx in range(int(left) // cell, int(right) // cell + 1):
+            for cy in range(int(top) // cell, int(bottom) // cell + 1):
+                bucket = self.cells.get((cx, cy))
+                if bucket and kind in bucket:
+                    found.extend(item for item in bucket[kind]
+                                 if left <= item[1]['x'] <= right and top <= item[1]['y'] <= bottom)
+        found.sort(key=lambda item: item[0])
+        return [entity for _, entity in found]
+
+    def near(self, kind, x, y, radius):
+        return self.query(kind, x - radius, y - radius, x + radius, y + radius)
+
+
+class SceneManager:
+    def __init__(self, build_map, scenes=SCENES, memory_cap=64 * 1024 * 1024):
+        self.scenes = scenes
+        self.build_map = build_map
+        self.memory_cap = memory_cap
+        self.current = None
+
+        self.states = {}
+        self.maps = OrderedDict()
+        self.lock = threading.Lock()
+        self.loads = 0
+        self.evictions = 0
+
+        self.requests = queue.Queue()
+        self.queued = set()
+        self.building = {}
+        self.thread = threading.Thread(target=self.preload_loop, name='scene-preload', daemon=True)
+        self.thread.start()
+
+    def initial_entities(self, name):
+        """Fresh copies of the scene's entities. A generated scene's layout comes from
+        its cached map, which is built (or waited for) if needed."""
+        scene = self.scenes[name]
+        entities = self.load(name)['entities'] if 'generate' in scene else scene.get('entities', {})
+        return {kind: [dict(entity) for entity in entities.get(kind, [])] for kind in ENTITY_KINDS}
+
+    def entities(self, name):
+        """The scene's live entity lists, created on first use. Generated scenes are
+        usually filled in by the preload thread before the player gets there."""
+        with self.lock:
+            if name in self.states:
+                return self.states[name]
+        entities = self.initial_entities(name)
+        with self.lock:
+            return self.states.setdefault(name, entities)
+
+    def generated(self):
+        """(name, entities) for every scene whose entities exist so far."""
+        with self.lock:
+            return list(self.states.items())
+
+    def reset_entities(self):
+        for name, entities in self.generated():
+            fresh = self.initial_entities(name)
+            for kind in ENTITY_KINDS:
+                entities[kind][:] = fresh[kind]
+
+    def neighbors(self, name):
+        return [scene_exit['to'] for scene_exit in self.scenes[name].get('exits', [])]
+
+    def find_exit(self, name, edge):
+        for scene_exit in self.scenes[name].get('exits', []):
+            if scene_exit['edge'] == edge:
+                return scene_exit
+        return None
+
+    def preload(self, names):
+        for name in names:
+            with self.lock:
+                if name in self.maps or name in self.queued:
+                    continue
+                self.queued.add(name)
+            self.requests.put(name)
+
+    def preload_loop(self):
+        while True:
+            name = self.requests.get()
+            if name is None:
+                return
+            try:
+                self.load(name)
+                self.entities(name)
+            except Exception as e:
+                print(f"Could not preload scene {name}: {e}")
+            finally:
+                with self.lock:
+                    self.queued.discard(name)
+
+    def load(self, name):
+        """Return the scene's map, building it if needed. A map already being built
+        on another thread is waited for rather than built a second time."""
+        while True:
+            with self.lock:
+                if name in self.maps:
+                    self.maps.move_to_end(name)
+                    return self.maps[name]
+                done = self.building.get(name)
+                if done is None:
+                    done = self.building[name] = threading.Event()
+                    break
+            done.wait()
+        try:
+            scene_map = self.build_map(self.scenes[name])
+            with self.lock:
+                scene_map = self.maps.setdefault(name, scene_map)
+                self.maps.move_to_end(name)
+                self.loads += 1
+                self.evict()
+        finally:
+            with self.lock:
+                del self.building[name]
+            done.set()
+        return scene_map
+
+    def invalidate(self, name):
+        with self.lock:
+            self.maps.pop(name, None)
+
+    def evict(self):
+        protected = {self.current, *self.neighbors(self.current)} if self.current else set()
+        while self.memory_used() > self.memory_cap:
+            victim = next((name for name in self.maps if name not in protected), None)
+            if victim is None:
+                break
+            del self.maps[victim]
+            self.evictions += 1
+
+    def memory_used(self):
+        return sum(map_bytes(scene_map) for scene_map in self.maps.values())
+
+    def enter(self, name):
+        self.current = name
+        scene_map = self.load(name)
+        self.preload(self.neighbors(name))
+        return scene_map, self.entities(name)
+
+    def close(self):
+        self.requests.put(None)
+        self.thread.join()
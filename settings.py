@@ -0,0 +1,122 @@
+import os
+
+SCREEN_WIDTH = 800
+SCREEN_HEIGHT = 600
+TILE_SIZE = 16
+SCALE = 2
+FPS = 60
+
+CLOCK_ICON_SIZE = 128
+CLOCK_DISPLAY_SIZE = 800
+CLOCK_CENTER_X = SCREEN_WIDTH // 2
+CLOCK_CENTER_Y = SCREEN_HEIGHT // 2
+
+NATIVE_RENDER = os.environ.get('GAME_NATIVE_RENDER') == '1'
+LOW_MEMORY = os.environ.get('GAME_LOW_MEMORY') == '1'
+DAY_NIGHT_LIGHTING = os.environ.get('GAME_LIGHTING', '1') == '1'
+
+THREADED_SIM = os.environ.get('GAME_THREADED_SIM') == '1'
+SIM_RATE = int(os.environ.get('GAME_SIM_RATE', '60'))
+
+KEY_BINDINGS = os.environ.get('GAME_KEYS', '')
+
+ADMIN_ADDRESS = os.environ.get('GAME_ADMIN')
+ADMIN_COMMANDS_PER_TICK = int(os.environ.get('GAME_ADMIN_COMMANDS_PER_TICK', '4'))
+ASYNC_LOOP = os.environ.get('GAME_ASYNC') == '1' or bool(ADMIN_ADDRESS)
+
+GC_MONITOR = os.environ.get('GAME_GC_MONITOR') == '1'
+GC_FRAME_COLLECT = os.environ.get('GAME_GC_FRAME_COLLECT') == '1'
+
+PROFILE = os.environ.get('GAME_PROFILE') == '1'
+PROFILE_DIR = os.environ.get('GAME_PROFILE_DIR', 'profiles')
+PROFILE_INTERVAL = float(os.environ.get('GAME_PROFILE_INTERVAL', '0.01'))
+PROFILE_SAMPLES = int(os.environ.get('GAME_PROFILE_SAMPLES', '30000'))
+
+QUALITY = os.environ.get('GAME_QUALITY', 'auto')
+QUALITY_PROFILE = os.environ.get('GAME_QUALITY_PROFILE', 'quality.json')
+QUALITY_MIN = os.environ.get('GAME_QUALITY_MIN', 'low')
+QUALITY_MAX = os.environ.get('GAME_QUALITY_MAX', 'high')
+
+PARTICLE_CAPACITY = 4096
+WATER_PARTICLES_PER_SECOND = 120
+
+SCENE_CACHE_MB = int(os.environ.get('GAME_SCENE_CACHE_MB', '64'))
+WORLD_SEED = int(os.environ.get('GAME_WORLD_SEED', '1337'))
+WORLD_TILES = tuple(int(n) for n in os.environ.get('GAME_WORLD_TILES', '256x192').lower().split('x'))
+
+MINIMAP = os.environ.get('GAME_MINIMAP', '1') == '1'
+MINIMAP_SIZE = int(os.environ.get('GAME_MINIMAP_SIZE', '160'))
+MINIMAP_MARKER_COLOR = (255, 215, 0)
+MISSION_TARGETS = {
+    'pohon': ('trees', None),
+    'buah': ('bushes', 'picked'),
+    'kayu': ('trunks', 'cut'),
+    'bunga': ('flowers', 'watered'),
+    'jamur': ('mushrooms', 'removed'),
+}
+
+GARDEN_HOURS_PER_SECOND = float(os.environ.get('GAME_GARDEN_SPEED', str(1 / 120)))
+GARDEN_TICK = float(os.environ.get('GAME_GARDEN_TICK', '1.0'))
+GARDEN_WILT_HOURS = 1.0
+GARDEN_GROW_HOURS = 0.5
+GARDEN_REGROW_HOURS = 1.0
+
+NPC_DENSITY = float(os.environ.get('GAME_NPC_DENSITY', '3'))
+
+SAVE_FILE = os.environ.get('GAME_SAVE_FILE', 'savegame.bin')
+
+TELEMETRY_DIR = os.environ.get('GAME_TELEMETRY_DIR')
+STUDENT_ID = os.environ.get('GAME_STUDENT_ID')
+
+COOP_HOST = os.environ.get('GAME_COOP_HOST')
+COOP_JOIN = os.environ.get('GAME_COOP_JOIN')
+COOP_TICK_RATE = int(os.environ.get('GAME_COOP_TICK_RATE', '20'))
+
+HEARTBEAT_ADDR = os.environ.get('GAME_HEARTBEAT')
+HEARTBEAT_INTERVAL = float(os.environ.get('GAME_HEARTBEAT_INTERVAL', '2'))
+KIOSK_ID = os.environ.get('GAME_KIOSK_ID', STUDENT_ID)
+
+HOT_RELOAD = os.environ.get('GAME_HOT_RELOAD') == '1'
+
+RECORD_DIR = os.environ.get('GAME_RECORD_DIR')
+RECORD_FORMAT = os.environ.get('GAME_RECORD_FORMAT', 'png')
+RECORD_FPS = int(os.environ.get('GAME_RECORD_FPS', '15'))
+RECORD_DOWNSCALE = int(os.environ.get('GAME_RECORD_DOWNSCALE', '2'))
+
+SPRITE_MAPPING = {
+    'idle1.png': 'idle-front1',
+    'idle2.png': 'idle-front2',
+    'idle-back1.png': 'idle-back1',
+    'idle-back2.png': 'idle-back2',
+    'idle-left1.png': 'idle-left1',
+    'idle-left2.png': 'idle-left2',
+    'idle-right1.png': 'idle-right1',
+    'idle-right2.png': 'idle-right2',
+    'walk1.png': 'walk-front1',
+    'walk2.png': 'walk-front2',
+    'walk-back1.png': 'walk-back1',
+    'walk-back2.png': 'walk-back2',
+    'walk-left1.png': 'walk-left1',
+    'walk-left2.png': 'walk-left2',
+    'walk-right1.png': 'walk-right1',
+    'walk-right2.png': 'walk-right2'
+}
+
+WATERING_SPRITE_FILES = ['watering-left1.png', 'watering-left2.png',
+                         'watering-right1.png', 'watering-right2.png']
+
+CUTTING_SPRITE_FILES = [
+    'cut-behind1.png', 'cut-behind2.png',
+    'cut-front1.png', 'cut-front2.png',
+    'cut-left1.png', 'cut-left2.png',
+    'cut-right1.png', 'cut-right2.png'
+]
+
+WHITE = (255, 255, 255)
+BLACK = (0, 0, 0)
+GREEN = (51, 153, 51)
+BROWN = (128, 102, 77)
+BLUE = (51, 102, 204)
+GRAY = (128, 128, 128)
+RED = (200, 50, 50)
+DARK_BLUE = (30, 30, 100)
@@ -0,0 +1,112 @@
+import collections
+import concurrent.futures
+import queue
+import threading
+import time
+
+RenderState = collections.namedtuple('RenderState', [
+    'map_surface', 'map_pos', 'world_blits', 'particle_blits',
+    'lighting', 'hour_angle', 'minute_angle',
+    'mission_box', 'play_again_text', 'clock_ui', 'prompt', 'notification', 'minimap', 'input_time',
+    'world_buffer', 'upscale_target',
+])
+
+
+class DoubleBuffer:
+    """Single-writer double buffer: the writer fills the back slot and flips it to
+    the front, so a reader always sees a complete state."""
+
+    def __init__(self):
+        self.slots = [None, None]
+        self.front = 0
+        self.sequence = 0
+        self.lock = threading.Lock()
+
+    def publish(self, state):
+        back = 1 - self.front
+        self.slots[back] = state
+        with self.lock:
+            self.front = back
+            self.sequence += 1
+
+    def read(self):
+        with self.lock:
+            return self.sequence, self.slots[self.front]
+
+
+class SimulationThread:
+    """Runs input handling and `game.step` at a fixed rate off the main thread and
+    publishes a RenderState after every tick."""
+
+    def __init__(self, game, rate=60, max_lag=0.25):
+        self.game = game
+        self.dt = 1.0 / rate
+        self.max_lag = max_lag
+        self.events = queue.SimpleQueue()
+        self.calls = queue.SimpleQueue()
+        self.buffer = DoubleBuffer()
+        self.buffer.publish(game.capture_render_state())
+        self.stopping = threading.Event()
+        self.error = None
+        self.ticks = 0
+        self.late_ticks = 0
+        self.thread = threading.Thread(target=self.loop, name='simulation', daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def post_events(self, events):
+        for event in events:
+            self.events.put(event)
+
+    def submit(self, function, *args):
+        """Run `function(*args)` on the simulation thread before its next tick."""
+        future = concurrent.futures.Future()
+        self.calls.put((future, function, args))
+        return future
+
+    def latest(self):
+        return self.buffer.read()[1]
+
+    def loop(self):
+        next_tick = time.perf_counter()
+        try:
+            while not self.stopping.is_set():
+                while True:
+                    try:
+                        future, function, args = self.calls.get_nowait()
+                    except queue.Empty:
+                        break
+                    try:
+                        future.set_result(function(*args))
+                    except Exception as e:
+                        future.set_exception(e)
+                while True:
+                    try:
+                        event = self.events.get_nowait()
+                    except queue.Empty:
+                        break
+                    self.game.handle_event(event)
+
+                self.game.step(self.dt)
+                self.buffer.publish(self.game.capture_render_state())
+                self.ticks += 1
+
+                next_tick += self.dt
+                delay = next_tick - time.perf_counter()
+                if delay > 0:
+                    self.stopping.wait(delay)
+                else:
+                    self.late_ticks += 1
+                    if delay < -self.max_lag:
+                        next_tick = time.perf_counter()
+        except BaseException as e:
+            self.error = e
+            self.game.running = False
+
+    def stop(self):
+        self.stopping.set()
+        if self.thread.is_alive():
+            self.thread.join()
+        if self.error is not None:
+            raise self.error
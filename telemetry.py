@@ -0,0 +1,109 @@
+import gzip
+import json
+import os
+import threading
+import time
+import uuid
+
+
+class Telemetry:
+    def __init__(self, directory=None, student_id=None, echo=True, max_buffer=10000,
+                 flush_interval=1.0, max_file_bytes=1024 * 1024, max_files=20):
+        self.directory = directory
+        self.student_id = student_id
+        self.session_id = uuid.uuid4().hex[:12]
+        self.echo = echo
+        self.max_buffer = max_buffer
+        self.flush_interval = flush_interval
+        self.max_file_bytes = max_file_bytes
+        self.max_files = max_files
+
+        self.buffer = []
+        self.lock = threading.Lock()
+        self.events_emitted = 0
+        self.events_dropped = 0
+        self.unreported_drops = 0
+        self.events_written = 0
+
+        self.file = None
+        self.file_bytes = 0
+        self.file_index = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self.flush_loop, name='telemetry', daemon=True)
+        self.thread.start()
+
+    def emit(self, event, message=None, **fields):
+        record = {'t': round(time.time(), 3), 'event': event}
+        record.update(fields)
+        if message is not None:
+            record['message'] = message
+        with self.lock:
+            if len(self.buffer) >= self.max_buffer:
+                self.events_dropped += 1
+                self.unreported_drops += 1
+                return
+            self.buffer.append(record)
+            self.events_emitted += 1
+
+    def flush_loop(self):
+        while not self.stop_event.wait(self.flush_interval):
+            self.flush()
+        self.flush()
+
+    def flush(self):
+        with self.lock:
+            batch, self.buffer = self.buffer, []
+            dropped, self.unreported_drops = self.unreported_drops, 0
+        if dropped:
+            batch.append({'t': round(time.time(), 3), 'event': 'telemetry_dropped', 'count': dropped})
+        if not batch:
+            return
+
+        if self.echo:
+            lines = [record['message'] for record in batch if 'message' in record]
+            if lines:
+                print('\n'.join(lines), flush=True)
+
+        if self.directory:
+            try:
+                self.write_batch(batch)
+            except OSError as e:
+                print(f"Telemetry write failed: {e}")
+
+    def write_batch(self, batch):
+        lines = []
+        for record in batch:
+            record['session'] = self.session_id
+            if self.student_id:
+                record['student'] = self.student_id
+            lines.append(json.dumps(record, ensure_ascii=False, separators=(',', ':')))
+        data = ('\n'.join(lines) + '\n').encode('utf-8')
+
+        if self.file is None or self.file_bytes >= self.max_file_bytes:
+            self.rotate()
+        self.file.write(data)
+        self.file.flush()
+        self.file_bytes += len(data)
+        self.events_written += len(batch)
+
+    def rotate(self):
+        if self.file is not None:
+            self.file.close()
+        name = f"telemetry-{time.strftime('%Y%m%d-%H%M%S')}-{self.session_id}-{self.file_index:03d}.jsonl.gz"
+        self.file = gzip.open(os.path.join(self.directory, name), 'wb')
+        self.file_bytes = 0
+        self.file_index += 1
+
+        files = sorted(f for f in os.listdir(self.directory) if f.startswith('telemetry-') and f.endswith('.jsonl.gz'))
+        for old in files[:-self.max_files]:
+            os.remove(os.path.join(self.directory, old))
+
+    def close(self):
+        self.stop_event.set()
+        self.thread.join()
+        if self.file is not None:
+            self.file.close()
+            self.file = None
@@ -0,0 +1,245 @@
+import numpy as np
+import pygame
+
+GRASS_LIGHT = 0
+GRASS_DARK = 1
+PATH = 2
+HOUSE = 3
+ROOF = 4
+WATER = 5
+DIRT = 6
+
+TERRAIN_COLORS = {
+    PATH: (128, 102, 77),
+    HOUSE: (139, 115, 85),
+    ROOF: (139, 69, 19),
+    WATER: (64, 110, 190),
+    DIRT: (150, 120, 80),
+}
+
+GRASS = (GRASS_LIGHT, GRASS_DARK)
+
+SCATTER_RULES = (
+    {'kind': 'trees', 'spacing': 96, 'density': 0.45, 'size': 4, 'terrain': GRASS, 'flag': None},
+    {'kind': 'trunks', 'spacing': 96, 'density': 0.10, 'size': 2, 'terrain': GRASS, 'flag': 'cut'},
+    {'kind': 'bushes', 'spacing': 64, 'density': 0.15, 'size': 2, 'terrain': GRASS, 'flag': 'picked'},
+    {'kind': 'flowers', 'spacing': 48, 'density': 0.12, 'size': 2, 'terrain': GRASS, 'flag': 'watered'},
+    {'kind': 'mushrooms', 'spacing': 40, 'density': 0.10, 'size': 1, 'terrain': GRASS + (DIRT,), 'flag': 'removed'},
+)
+
+
+class World:
+    """Terrain as a (width, height) grid of tile classes plus one color per class.
+
+    Arrays are indexed [x, y] to match pygame.surfarray.
+    """
+
+    def __init__(self, tiles, colors, tile_size=16, seed=None):
+        self.tiles = tiles
+        self.colors = np.asarray(colors, dtype=np.uint8)
+        self.tile_size = tile_size
+        self.seed = seed
+
+    @property
+    def width(self):
+        return self.tiles.shape[0]
+
+    @property
+    def height(self):
+        return self.tiles.shape[1]
+
+    @property
+    def nbytes(self):
+        return self.tiles.nbytes
+
+    def tile_at(self, x, y):
+        """Tile class under world pixel (x, y)."""
+        return self.tiles[int(x) // self.tile_size, int(y) // self.tile_size]
+
+    def pixels(self, x, y, width, height, indexed=False):
+        """One value per tile: its color, or the tile class itself for palettized surfaces."""
+        tiles = self.tiles[x:x + width, y:y + height]
+        return tiles if indexed else self.colors[tiles]
+
+    def render(self, tile_px=None):
+        tile_px = tile_px or self.tile_size
+        small = pygame.surfarray.make_surface(self.pixels(0, 0, self.width, self.height))
+        return pygame.transform.scale(small, (self.width * tile_px, self.height * tile_px))
+
+
+def terrain_colors(palette):
+    colors = np.zeros((max(TERRAIN_COLORS) + 1, 3), dtype=np.uint8)
+    colors[GRASS_LIGHT], colors[GRASS_DARK] = palette
+    for tile, color in TERRAIN_COLORS.items():
+        colors[tile] = color
+    return colors
+
+
+def checkerboard(width, height):
+    x = np.arange(width)[:, None]
+    y = np.arange(height)[None, :]
+    return ((x + y) % 2).astype(np.uint8)
+
+
+def default_world(palette, width=30, height=20, tile_size=16):
+    tiles = checkerboard(width, height)
+    tiles[3, :] = PATH
+    tiles[10:18, 5:11] = HOUSE
+    tiles[9:19, 4] = ROOF
+    return World(tiles, terrain_colors(palette), tile_size)
+
+
+def value_noise(rng, width, height, cell):
+    """Smooth noise in [0, 1): random values on a coarse grid, interpolated per tile."""
+    grid = rng.random((width // cell + 2, height // cell + 2), dtype=np.float32)
+    gx = np.arange(width, dtype=np.float32) / cell
+    gy = np.arange(height, dtype=np.float32) / cell
+    ix, iy = gx.astype(np.int32), gy.astype(np.int32)
+    fx, fy = gx - ix, gy - iy
+    fx = (fx * fx * (3 - 2 * fx))[:, None]
+    fy = (fy * fy * (3 - 2 * fy))[None, :]
+    ix, iy = ix[:, None], iy[None, :]
+    top = grid[ix, iy] * (1 - fx) + grid[ix + 1, iy] * fx
+    bottom = grid[ix, iy + 1] * (1 - fx) + grid[ix + 1, iy + 1] * fx
+    return top * (1 - fy) + bottom * fy
+
+
+def generate_terrain(rng, width, height):
+    tiles = checkerboard(width, height)
+    elevation = value_noise(rng, width, height, 24) * 0.7 + value_noise(rng, width, height, 6) * 0.3
+    moisture = value_noise(rng, width, height, 16)
+    tiles[(elevation > 0.62) & (moisture < 0.45)] = DIRT
+    tiles[elevation < 0.28] = WATER
+    return tiles
+
+
+def dilate(mask, radius):
+    grown = mask.copy()
+    for dx in range(-radius, radius + 1):
+        for dy in range(-radius, radius + 1):
+            src = mask[max(0, -dx):mask.shape[0] - max(0, dx), max(0, -dy):mask.shape[1] - max(0, dy)]
+            grown[max(0, dx):max(0, dx) + src.shape[0], max(0, dy):max(0, dy) + src.shape[1]] |= src
+    return grown
+
+
+def scatter(rng, tiles, rule, occupied, tile_size=16, border=3):
+    """Jittered-grid placement: at most one candidate per `spacing` cell, jittered
+    by at most half the room a cell has beyond the entity's footprint, so the
+    footprints of neighbors stay at least `(spacing - footprint) // 2` pixels
+    apart. Candidates are then filtered by density, terrain class and tiles
+    already taken by other entities."""
+    width, height = tiles.shape
+    spacing = rule['spacing']
+    footprint = rule['size'] * tile_size
+    jitter = max(spacing - footprint, 0) // 2 + 1
+
+    cx = np.arange(width * tile_size // spacing) * spacing
+    cy = np.arange(height * tile_size // spacing) * spacing
+    xs = (cx[:, None] + rng.integers(0, jitter, (len(cx), len(cy)))).ravel()
+    ys = (cy[None, :] + rng.integers(0, jitter, (len(cx), len(cy)))).ravel()
+    keep = rng.random(xs.shape) < rule['density']
+    xs, ys = xs[keep], ys[keep]
+
+    tx, ty = xs // tile_size, ys // tile_size
+    limit_x, limit_y = width - border - rule['size'], height - border - rule['size']
+    inside = (tx >= border) & (ty >= border) & (tx < limit_x) & (ty < limit_y)
+    xs, ys, tx, ty = xs[inside], ys[inside], tx[inside], ty[inside]
+
+    allowed = np.isin(tiles[tx, ty], rule['terrain']) & ~occupied[tx, ty]
+    for dx in range(rule['size']):
+        for dy in range(rule['size']):
+            allowed &= np.isin(tiles[tx + dx, ty + dy], rule['terrain'])
+    xs, ys, tx, ty = xs[allowed], ys[allowed], tx[allowed], ty[allowed]
+
+    placed = np.zeros_like(occupied)
+    placed[tx, ty] = True
+    occupied |= dilate(placed, rule['size'])
+
+    flag = rule['flag']
+    if flag is None:
+        return [{'x': int(x), 'y': int(y)} for x, y in zip(xs.tolist(), ys.tolist())]
+    return [{'x': int(x), 'y': int(y), flag: False} for x, y in zip(xs.tolist(), ys.tolist())]
+
+
+def generate_world(seed, width, height, palette, tile_size=16, rules=SCATTER_RULES):
+    """Build terrain and entity placements; the same arguments always give the same world."""
+    rng = np.random.default_rng(seed)
+    tiles = generate_terrain(rng, width, height)
+    occupied = np.zeros(tiles.shape, dtype=bool)
+    entities = {rule['kind']: scatter(rng, tiles, rule, occupied, tile_size) for rule in rules}
+    return World(tiles, terrain_colors(palette), tile_size, seed), entities
+
+
+class TerrainView:
+    """Renders the part of a World around the camera into a reusable surface.
+
+    The window covers the view plus `margin` tiles on each side and is only
+    re-rendered when the camera leaves it. Two surfaces alternate so a frame that
+    is still being drawn never sees a half-updated window.
+    """
+
+    def __init__(self, world, scale, view_size, margin=8, indexed=False):
+        self.world = world
+        self.scale = scale
+        self.margin = margin
+        self.indexed = indexed
+        self.tile_px = world.tile_size * scale
+        self.origin = None
+        self.renders = 0
+        self.resize(view_size)
+
+    def resize(self, view_size):
+        tile_size = self.world.tile_size
+        self.view_size = view_size
+        self.span = (min(self.world.width, -(-view_size[0] // tile_size) + 2 * self.margin + 1),
+                     min(self.world.height, -(-view_size[1] // tile_size) + 2 * self.margin + 1))
+        self.tile_surface = self.make_surface(self.span)
+        size = (self.span[0] * self.tile_px, self.span[1] * self.tile_px)
+        self.surfaces = [self.make_surface(size) for _ in range(2)]
+        self.current = 0
+        self.origin = None
+
+    def make_surface(self, size):
+        if not self.indexed:
+            return pygame.Surface(size)
+        surface = pygame.Surface(size, 0, 8)
+        palette = [tuple(color) for color in self.world.colors.tolist()]
+        surface.set_palette(palette + [(0, 0, 0)] * (256 - len(palette)))
+        return surface
+
+    @property
+    def nbytes(self):
+        surfaces = self.surfaces + [self.tile_surface]
+        return self.world.nbytes + sum(s.get_width() * s.get_height() * s.get_bytesize() for s in surfaces)
+
+    @property
+    def surface(self):
+        return self.surfaces[self.current]
+
+    def window(self, camera_x, camera_y, view_width, view_height):
+        """Return (surface, screen position) covering the camera rectangle in world units."""
+        if view_width > self.view_size[0] or view_height > self.view_size[1]:
+            self.resize((max(view_width, self.view_size[0]), max(view_height, self.view_size[1])))
+
+        tile_size = self.world.tile_size
+        tx0, ty0 = int(camera_x // tile_size), int(camera_y // tile_size)
+        tx1 = min(int((camera_x + view_width) // tile_size) + 1, self.world.width)
+        ty1 = min(int((camera_y + view_height) // tile_size) + 1, self.world.height)
+        if (self.origin is None or tx0 < self.origin[0] or ty0 < self.origin[1] or
+                tx1 > self.origin[0] + self.span[0] or ty1 > self.origin[1] + self.span[1]):
+            self.render(tx0 - self.margin, ty0 - self.margin)
+
+        ox, oy = self.origin
+        return self.surface, ((ox * tile_size - camera_x) * self.scale, (oy * tile_size - camera_y) * self.scale)
+
+    def render(self, x, y):
+        """Write one pixel per tile, then let SDL's nearest-neighbor scale expand it."""
+        x = max(0, min(x, self.world.width - self.span[0]))
+        y = max(0, min(y, self.world.height - self.span[1]))
+        pygame.surfarray.blit_array(self.tile_surface,
+                                    self.world.pixels(x, y, self.span[0], self.span[1], self.indexed))
+        target = 1 - self.current
+        pygame.transform.scale(self.tile_surface, self.surfaces[target].get_size(), self.surfaces[target])
+        self.current = target
+        self.origin = (x, y)
+        self.renders += 1